@@ -0,0 +1,54 @@
+"""incremental aggregate state table
+
+Revision ID: 005
+Revises: 004
+Create Date: 2025-10-12 00:00:00.000000
+
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "005"
+down_revision = "004"
+branch_labels = None
+depends_on = None
+
+_DIMENSIONS = ("ei", "sn", "tf", "jp")
+
+
+def _create_aggregate_states_table() -> None:
+    bind = op.get_bind()
+    metadata = sa.MetaData()
+    sa.Table("sessions", metadata, autoload_with=bind)
+
+    moment_columns = [
+        sa.Column(f"{dim}_{suffix}", sa.Float(), nullable=False, server_default=sa.text("0"))
+        for suffix in ("mean", "m2")
+        for dim in _DIMENSIONS
+    ]
+
+    aggregate_states = sa.Table(
+        "aggregate_states",
+        metadata,
+        sa.Column("session_id", sa.String(length=36), primary_key=True),
+        sa.Column("n", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("weight_total", sa.Float(), nullable=False, server_default=sa.text("0")),
+        *moment_columns,
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["session_id"], ["sessions.id"], ondelete="CASCADE"),
+    )
+
+    aggregate_states.create(bind=bind, checkfirst=True)
+
+
+def upgrade() -> None:
+    # Sessions without a state row are rebuilt lazily on their next submission.
+    _create_aggregate_states_table()
+
+
+def downgrade() -> None:
+    op.drop_table("aggregate_states")
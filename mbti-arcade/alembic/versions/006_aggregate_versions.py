@@ -0,0 +1,44 @@
+"""aggregate staleness markers
+
+Revision ID: 006
+Revises: 005
+Create Date: 2025-10-13 00:00:00.000000
+
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "006"
+down_revision = "005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing rows were recomputed on every read, so they start out fresh.
+    with op.batch_alter_table("aggregates") as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "responses_version",
+                sa.Integer(),
+                nullable=False,
+                server_default=sa.text("0"),
+            )
+        )
+        batch_op.add_column(
+            sa.Column(
+                "computed_version",
+                sa.Integer(),
+                nullable=False,
+                server_default=sa.text("0"),
+            )
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("aggregates") as batch_op:
+        batch_op.drop_column("computed_version")
+        batch_op.drop_column("responses_version")
@@ -0,0 +1,52 @@
+"""app metadata key/value table
+
+Revision ID: 007
+Revises: 006
+Create Date: 2025-10-14 00:00:00.000000
+
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "007"
+down_revision = "006"
+branch_labels = None
+depends_on = None
+
+
+def _create_app_metadata_table() -> None:
+    bind = op.get_bind()
+    metadata = sa.MetaData()
+
+    app_metadata = sa.Table(
+        "app_metadata",
+        metadata,
+        sa.Column("key", sa.String(length=64), primary_key=True),
+        sa.Column("value", sa.String(length=255), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+    )
+
+    app_metadata.create(bind=bind, checkfirst=True)
+
+
+def upgrade() -> None:
+    # No stored questionnaire hash means the next startup performs a full sync.
+    _create_app_metadata_table()
+
+
+def downgrade() -> None:
+    op.drop_table("app_metadata")
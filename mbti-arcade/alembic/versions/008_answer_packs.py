@@ -0,0 +1,77 @@
+"""packed per-respondent answer storage
+
+Revision ID: 008
+Revises: 007
+Create Date: 2025-10-15 00:00:00.000000
+
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "008"
+down_revision = "007"
+branch_labels = None
+depends_on = None
+
+
+def _timestamp_columns() -> list[sa.Column]:
+    return [
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+    ]
+
+
+def _create_answer_pack_tables() -> None:
+    bind = op.get_bind()
+    metadata = sa.MetaData()
+    sa.Table("sessions", metadata, autoload_with=bind)
+    sa.Table("participants", metadata, autoload_with=bind)
+
+    questionnaire_versions = sa.Table(
+        "questionnaire_versions",
+        metadata,
+        sa.Column("version", sa.String(length=64), primary_key=True),
+        sa.Column("question_ids", sa.Text(), nullable=False),
+        *_timestamp_columns(),
+    )
+
+    answer_packs = sa.Table(
+        "answer_packs",
+        metadata,
+        sa.Column("session_id", sa.String(length=36), primary_key=True),
+        sa.Column("owner", sa.String(length=64), primary_key=True),
+        sa.Column("participant_id", sa.Integer(), nullable=True),
+        sa.Column("relation_tag", sa.String(length=30), nullable=True),
+        sa.Column("questionnaire_version", sa.String(length=64), nullable=False),
+        sa.Column("answer_values", sa.LargeBinary(), nullable=False),
+        *_timestamp_columns(),
+        sa.ForeignKeyConstraint(["session_id"], ["sessions.id"]),
+        sa.ForeignKeyConstraint(["participant_id"], ["participants.id"]),
+    )
+
+    questionnaire_versions.create(bind=bind, checkfirst=True)
+    answer_packs.create(bind=bind, checkfirst=True)
+
+
+def upgrade() -> None:
+    # Row tables stay authoritative until ANSWER_STORAGE_MODE switches to
+    # "dual"/"packed"; scripts/pack_answers.py converts existing rows.
+    _create_answer_pack_tables()
+
+
+def downgrade() -> None:
+    op.drop_table("answer_packs")
+    op.drop_table("questionnaire_versions")
@@ -0,0 +1,47 @@
+"""indexes for hot-path lookups
+
+Revision ID: 009
+Revises: 008
+Create Date: 2025-10-18 00:00:00.000000
+
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "009"
+down_revision = "008"
+branch_labels = None
+depends_on = None
+
+
+# couple_responses and couple_participants are already served by their
+# unique constraints (session_id, participant_id, ...) and (access_token).
+INDEXES = (
+    ("ix_participants_session_id", "participants", ["session_id"]),
+    ("ix_sessions_updated_at", "sessions", ["updated_at"]),
+    ("ix_audit_events_session_created", "audit_events", ["session_id", "created_at", "id"]),
+)
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+    for name, table, columns in INDEXES:
+        # The couple tables are created by the app at startup, together
+        # with their indexes, so they may not exist yet.
+        if table not in tables:
+            continue
+        if name in {index["name"] for index in inspector.get_indexes(table)}:
+            continue
+        op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+    for name, table, _ in reversed(INDEXES):
+        if table in tables and name in {index["name"] for index in inspector.get_indexes(table)}:
+            op.drop_index(name, table_name=table)
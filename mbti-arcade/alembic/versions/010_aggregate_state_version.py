@@ -0,0 +1,34 @@
+"""aggregate state version counter
+
+Revision ID: 010
+Revises: 009
+Create Date: 2025-10-19 00:00:00.000000
+
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "010"
+down_revision = "009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("aggregate_states") as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "version",
+                sa.Integer(),
+                nullable=False,
+                server_default=sa.text("0"),
+            )
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("aggregate_states") as batch_op:
+        batch_op.drop_column("version")
@@ -1,9 +1,12 @@
-from sqlmodel import SQLModel, create_engine
+from sqlmodel import SQLModel
 from sqlalchemy.orm import sessionmaker
 import os
 
+from app.database import register_engine
+
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./mbti.db")
-engine = create_engine(DATABASE_URL, echo=False, pool_pre_ping=True)
+# Shares the app engine (and its pool) whenever both point at the same database.
+engine = register_engine("core", DATABASE_URL)
 SessionLocal = sessionmaker(engine, expire_on_commit=False)
 
 def get_session():
@@ -11,4 +14,4 @@ def get_session():
         yield session
 
 def init_db() -> None:
-    SQLModel.metadata.create_all(engine) 
\ No newline at end of file
+    SQLModel.metadata.create_all(engine)
@@ -11,6 +11,7 @@ from sqlalchemy import (
     Column,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
     UniqueConstraint,
@@ -134,6 +135,10 @@ class DecisionPacket(Base, TimestampMixin):
 
 class AuditEvent(Base, TimestampMixin):
     __tablename__ = "audit_events"
+    __table_args__ = (
+        # _log_event reads the latest event of a session to chain hashes.
+        Index("ix_audit_events_session_created", "session_id", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     session_id: Mapped[str | None] = mapped_column(
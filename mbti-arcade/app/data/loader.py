@@ -1,10 +1,19 @@
-
 from __future__ import annotations
 
+import json
+from threading import Lock
+
 from sqlalchemy.orm import Session
 
-from app.data.questionnaire_loader import get_question_seeds
-from app.models import Question
+from app.data.question_index import get_question_index
+from app.data.questionnaire_loader import get_question_seeds, get_questionnaire_hash
+from app.models import AppMetadata, Question, QuestionnaireVersion
+
+QUESTIONNAIRE_HASH_KEY = "questionnaire_hash"
+
+# (database url, questionnaire hash) pairs already verified by this process.
+_SEEDED: set[tuple[str, str]] = set()
+_SEED_LOCK = Lock()
 
 
 def seed_questions(db: Session) -> None:
@@ -39,4 +48,47 @@ def seed_questions(db: Session) -> None:
         if record.id != seed.id:
             record.id = seed.id
 
+    content_hash = get_questionnaire_hash()
+    marker = db.get(AppMetadata, QUESTIONNAIRE_HASH_KEY)
+    if marker is None:
+        db.add(AppMetadata(key=QUESTIONNAIRE_HASH_KEY, value=content_hash))
+    else:
+        marker.value = content_hash
+
+    # Answer packs reference this version to recover their question order.
+    if db.get(QuestionnaireVersion, content_hash) is None:
+        db.add(
+            QuestionnaireVersion(
+                version=content_hash,
+                question_ids=json.dumps(list(get_question_index().question_ids)),
+            )
+        )
+
     db.commit()
+
+
+def ensure_questions_seeded(db: Session) -> bool:
+    """Seed questions only if the stored questionnaire hash is out of date.
+
+    The database is consulted once per process (and database); afterwards
+    this is a set lookup. Returns ``True`` when a full sync ran.
+    """
+
+    content_hash = get_questionnaire_hash()
+    key = (str(db.get_bind().url), content_hash)
+    if key in _SEEDED:
+        return False
+
+    with _SEED_LOCK:
+        if key in _SEEDED:
+            return False
+        marker = db.get(AppMetadata, QUESTIONNAIRE_HASH_KEY)
+        synced = (
+            marker is None
+            or marker.value != content_hash
+            or db.get(QuestionnaireVersion, content_hash) is None
+        )
+        if synced:
+            seed_questions(db)
+        _SEEDED.add(key)
+    return synced
@@ -0,0 +1,131 @@
+"""Compiled, immutable question index shared by every scoring path.
+
+Numeric question ids are dense (``PREFIX_BASE`` + dimension offset +
+ordinal stays well under 2400), so the index is a set of flat arrays
+addressed by id rather than a dict. It implements the read-only mapping
+protocol ``{question_id: (dim, sign)}`` expected by
+:func:`app.services.scoring.compute_norms`.
+"""
+from __future__ import annotations
+
+from array import array
+from threading import Lock
+from typing import Dict, Iterator, Mapping, Sequence, Tuple
+
+from app.data.questionnaire_loader import (
+    CONTEXT_SORT_ORDER,
+    QuestionSeed,
+    get_question_seeds,
+    get_questionnaire_hash,
+)
+from app.schemas import DIMENSIONS
+
+CONTEXTS: Tuple[str, ...] = tuple(sorted(CONTEXT_SORT_ORDER, key=CONTEXT_SORT_ORDER.__getitem__))
+_DIM_CODES = {dim: code for code, dim in enumerate(DIMENSIONS)}
+_CONTEXT_CODES = {context: code for code, context in enumerate(CONTEXTS)}
+_MISSING = -1
+
+
+class QuestionIndex(Mapping[int, Tuple[str, int]]):
+    """Array-backed ``question_id -> (dim, sign)`` lookup.
+
+    ``dim_codes``/``context_codes`` hold indexes into :data:`DIMENSIONS` and
+    :data:`CONTEXTS` (``-1`` for unused ids), ``signs`` holds ``+1``/``-1``
+    (``0`` for unused ids) and ``ordinals`` maps an id to its position in
+    the sorted ``question_ids`` tuple.
+    """
+
+    __slots__ = (
+        "content_hash",
+        "question_ids",
+        "dim_codes",
+        "signs",
+        "context_codes",
+        "ordinals",
+        "_entries",
+    )
+
+    def __init__(self, seeds: Sequence[QuestionSeed], content_hash: str) -> None:
+        question_ids = tuple(sorted(seed.id for seed in seeds))
+        if len(set(question_ids)) != len(question_ids):
+            raise ValueError("Duplicate numeric question ids in questionnaire")
+        size = question_ids[-1] + 1 if question_ids else 0
+
+        dim_codes = array("b", [_MISSING]) * size
+        signs = array("b", [0]) * size
+        context_codes = array("b", [_MISSING]) * size
+        ordinals = array("h", [_MISSING]) * size
+        entries: list[Tuple[str, int] | None] = [None] * size
+
+        for seed in seeds:
+            dim_codes[seed.id] = _DIM_CODES[seed.dim]
+            signs[seed.id] = seed.sign
+            context_codes[seed.id] = _CONTEXT_CODES[seed.context]
+            entries[seed.id] = (seed.dim, seed.sign)
+        for ordinal, question_id in enumerate(question_ids):
+            ordinals[question_id] = ordinal
+
+        self.content_hash = content_hash
+        self.question_ids = question_ids
+        self.dim_codes = dim_codes
+        self.signs = signs
+        self.context_codes = context_codes
+        self.ordinals = ordinals
+        self._entries = tuple(entries)
+
+    def __getitem__(self, question_id: int) -> Tuple[str, int]:
+        entry = self.get(question_id)
+        if entry is None:
+            raise KeyError(question_id)
+        return entry
+
+    def get(self, question_id: int, default=None):  # type: ignore[override]
+        if 0 <= question_id < len(self._entries):
+            entry = self._entries[question_id]
+            if entry is not None:
+                return entry
+        return default
+
+    def __contains__(self, question_id: object) -> bool:
+        return isinstance(question_id, int) and self.get(question_id) is not None
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.question_ids)
+
+    def __len__(self) -> int:
+        return len(self.question_ids)
+
+    def __hash__(self) -> int:
+        return hash(self.content_hash)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, QuestionIndex):
+            return self.content_hash == other.content_hash
+        return Mapping.__eq__(self, other)
+
+    def context_of(self, question_id: int) -> str | None:
+        if question_id not in self:
+            return None
+        return CONTEXTS[self.context_codes[question_id]]
+
+    def ids_for_context(self, context: str) -> Tuple[int, ...]:
+        code = _CONTEXT_CODES[context]
+        return tuple(qid for qid in self.question_ids if self.context_codes[qid] == code)
+
+
+_INDEXES: Dict[str, QuestionIndex] = {}
+_LOCK = Lock()
+
+
+def get_question_index() -> QuestionIndex:
+    """Return the process-wide index for the active questionnaire file."""
+
+    content_hash = get_questionnaire_hash()
+    index = _INDEXES.get(content_hash)
+    if index is None:
+        with _LOCK:
+            index = _INDEXES.get(content_hash)
+            if index is None:
+                index = QuestionIndex(get_question_seeds(), content_hash)
+                _INDEXES[content_hash] = index
+    return index
@@ -2,6 +2,7 @@
 """Utilities for loading the questionnaire seed dataset."""
 from __future__ import annotations
 
+import hashlib
 import json
 import os
 from dataclasses import dataclass
@@ -142,6 +143,13 @@ def get_questionnaire(path: Path | None = None) -> QuestionnaireModel:
     return QuestionnaireModel.model_validate(payload)
 
 
+@lru_cache(maxsize=1)
+def get_questionnaire_hash() -> str:
+    """SHA-256 of the questionnaire file backing :func:`get_question_seeds`."""
+
+    return hashlib.sha256(_resolve_questionnaire_path().read_bytes()).hexdigest()
+
+
 def _compute_numeric_id(code: str, dim: str, ordinal: int) -> int:
     prefix = code.split("-", 1)[0]
     base = PREFIX_BASE.get(prefix)
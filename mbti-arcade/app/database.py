@@ -1,23 +1,314 @@
-﻿import os
+﻿"""Engine registry, sessions and connection-pool bookkeeping.
+
+Every engine the service uses is created through :func:`register_engine`,
+which applies the pool settings from :mod:`app.settings` and, for SQLite
+files, the connection pragmas (WAL, ``synchronous=NORMAL``, busy timeout,
+page cache and mmap). Registering a URL that is already registered returns
+the existing engine, so modules pointed at the same database share one
+pool. Checkout waits, timeouts and in-use counts are kept per engine for
+``/metricsz``.
+
+Route bodies are synchronous (ORM, scoring, aggregation) and run off the
+event loop through :func:`run_in_db_thread`. :func:`get_async_db` is for
+async callers whose work is I/O only.
+"""
+
+import asyncio
+import importlib.util
+import logging
+import os
+import threading
+import time
+from collections import deque
 from contextlib import contextmanager
-from typing import Generator
+from typing import Any, AsyncGenerator, Callable, Deque, Dict, Generator, List, Tuple, TypeVar
+
+from anyio import CapacityLimiter, to_thread
+from anyio.lowlevel import RunVar
+from sqlalchemy import create_engine, event, make_url
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app import settings
+from app.session_guard import track_engine
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+log = logging.getLogger("perception_gap.database")
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./perception_gap.db")
 
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {},
-    future=True,
-)
+_SAMPLE_SIZE = 256
+
+T = TypeVar("T")
+
+
+def _async_database_url(url: str) -> str:
+    """``url`` with an asyncio driver: aiosqlite, or asyncpg/psycopg for Postgres."""
+
+    scheme, sep, rest = url.partition("://")
+    if "+" in scheme:
+        return url
+    if scheme == "sqlite":
+        return f"sqlite+aiosqlite{sep}{rest}"
+    if scheme in {"postgres", "postgresql"}:
+        for driver in ("asyncpg", "psycopg"):
+            if importlib.util.find_spec(driver) is not None:
+                return f"postgresql+{driver}{sep}{rest}"
+        raise RuntimeError("Install asyncpg (or psycopg 3) to use the async database layer with Postgres")
+    return url
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or _async_database_url(DATABASE_URL)
+
+
+def _is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def _is_sqlite_file(url: str) -> bool:
+    if not _is_sqlite(url):
+        return False
+    path = url.partition("://")[2].lstrip("/").partition("?")[0]
+    return bool(path) and path != ":memory:" and "mode=memory" not in url
+
+
+class PoolStats:
+    """Checkout waits and timeouts of one engine's pool."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._checkouts = 0
+        self._timeouts = 0
+        self._wait_ms: Deque[float] = deque(maxlen=_SAMPLE_SIZE)
+
+    def record(self, wait_ms: float, timed_out: bool) -> None:
+        with self._lock:
+            if timed_out:
+                self._timeouts += 1
+            else:
+                self._checkouts += 1
+            self._wait_ms.append(wait_ms)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            ordered = sorted(self._wait_ms)
+            checkouts, timeouts = self._checkouts, self._timeouts
+        if ordered:
+            wait = {
+                "avg_ms": round(sum(ordered) / len(ordered), 3),
+                "p95_ms": round(ordered[max(0, int(len(ordered) * 0.95) - 1)], 3),
+                "max_ms": round(ordered[-1], 3),
+            }
+        else:
+            wait = {"avg_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+        return {"checkouts_total": checkouts, "timeouts_total": timeouts, "checkout_wait": wait}
+
+
+def _timed_pool_class(base: type, stats: PoolStats) -> type:
+    # A subclass per engine: Pool.recreate() (dispose) rebuilds the pool from
+    # ``self.__class__``, so the stats survive it.
+    def _do_get(self):
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            return base._do_get(self)
+        except PoolTimeoutError:
+            timed_out = True
+            raise
+        finally:
+            stats.record((time.perf_counter() - started) * 1000, timed_out)
+
+    return type(f"Timed{base.__name__}", (base,), {"_do_get": _do_get})
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        # WAL lets readers run alongside the single writer; NORMAL only
+        # syncs at checkpoints, which is durable enough in WAL mode.
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS:d}")
+        cursor.execute(f"PRAGMA cache_size={-settings.SQLITE_CACHE_SIZE_KIB:d}")
+        cursor.execute(f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE_BYTES:d}")
+    finally:
+        cursor.close()
+
+
+def _engine_options(url: str, stats: PoolStats, pool_class: type, pool_size: int, max_overflow: int) -> Dict[str, Any]:
+    options: Dict[str, Any] = {"future": True}
+    if _is_sqlite(url):
+        options["connect_args"] = {"check_same_thread": False}
+        if not _is_sqlite_file(url):
+            # In-memory databases live in one connection; keep SQLAlchemy's pool.
+            return options
+    else:
+        options["pool_pre_ping"] = True
+    options.update(
+        poolclass=_timed_pool_class(pool_class, stats),
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    )
+    return options
+
+
+_registry_lock = threading.Lock()
+_engines: Dict[str, Engine] = {}
+_pool_stats: Dict[str, PoolStats] = {}
+_async_names: set[str] = set()
+
+
+def _register(name: str, url: str, build, *, is_async: bool = False) -> Engine:
+    with _registry_lock:
+        if name in _engines:
+            return _engines[name]
+        for existing in _engines.values():
+            if existing.url == make_url(url):
+                _engines[name] = existing
+                return existing
+        stats = PoolStats()
+        sync_engine = build(stats)
+        if _is_sqlite_file(url):
+            event.listen(sync_engine, "connect", _set_sqlite_pragmas)
+        track_engine(name, sync_engine)
+        _engines[name] = sync_engine
+        _pool_stats[name] = stats
+        if is_async:
+            _async_names.add(name)
+        return sync_engine
+
+
+def register_engine(
+    name: str,
+    url: str,
+    *,
+    pool_size: int | None = None,
+    max_overflow: int | None = None,
+) -> Engine:
+    """Create (or reuse) the engine for ``url`` under ``name``."""
+
+    def build(stats: PoolStats) -> Engine:
+        return create_engine(
+            url,
+            **_engine_options(
+                url,
+                stats,
+                QueuePool,
+                settings.DB_POOL_SIZE if pool_size is None else pool_size,
+                settings.DB_MAX_OVERFLOW if max_overflow is None else max_overflow,
+            ),
+        )
+
+    return _register(name, url, build)
+
+
+def get_engine(name: str = "default") -> Engine:
+    return _engines[name]
+
+
+engine = register_engine("default", DATABASE_URL)
 
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 
+
+def _register_async_engine(name: str, url: str):
+    created = []
+
+    def build(stats: PoolStats) -> Engine:
+        # Sized like the sync pools: in WAL mode SQLite readers do not block
+        # each other, and the async paths only read.
+        async_engine = create_async_engine(
+            url,
+            **_engine_options(
+                url, stats, AsyncAdaptedQueuePool, settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW
+            ),
+        )
+        created.append(async_engine)
+        return async_engine.sync_engine
+
+    _register(name, url, build, is_async=True)
+    return created[0]
+
+
+# For async callers that only do I/O, so the query never blocks the event
+# loop. Anything that scores or aggregates goes through run_in_db_thread.
+async_engine = _register_async_engine("async", ASYNC_DATABASE_URL)
+
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False)
+
 Base = declarative_base()
 
 
+def _distinct_engines() -> List[Tuple[str, Engine]]:
+    seen: set[int] = set()
+    distinct = []
+    for name, registered in list(_engines.items()):
+        if id(registered) not in seen:
+            seen.add(id(registered))
+            distinct.append((name, registered))
+    return distinct
+
+
+def pool_metrics() -> Dict[str, Dict[str, Any]]:
+    """Per-engine pool size, in-use connections and checkout waits."""
+
+    metrics: Dict[str, Dict[str, Any]] = {}
+    for name, registered in _distinct_engines():
+        pool = registered.pool
+        entry: Dict[str, Any] = {"pool": type(pool).__name__}
+        if isinstance(pool, QueuePool):
+            entry.update(
+                size=pool.size(),
+                in_use=pool.checkedout(),
+                idle=pool.checkedin(),
+                overflow=max(pool.overflow(), 0),
+            )
+        entry.update(_pool_stats[name].snapshot())
+        metrics[name] = entry
+    return metrics
+
+
+def checkpoint_wal(mode: str = "PASSIVE") -> Dict[str, Dict[str, int]]:
+    """Run ``PRAGMA wal_checkpoint`` on every registered SQLite file engine."""
+
+    results: Dict[str, Dict[str, int]] = {}
+    for name, registered in _distinct_engines():
+        # The async engine shares its file with the default engine.
+        if name in _async_names or not _is_sqlite_file(str(registered.url)):
+            continue
+        with registered.connect() as connection:
+            busy, frames, checkpointed = connection.exec_driver_sql(
+                f"PRAGMA wal_checkpoint({mode})"
+            ).one()
+        results[name] = {"busy": busy, "wal_frames": frames, "checkpointed": checkpointed}
+    return results
+
+
+async def run_wal_checkpoints(interval_seconds: float) -> None:
+    """Checkpoint the WAL every ``interval_seconds`` until cancelled."""
+
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            results = await to_thread.run_sync(checkpoint_wal)
+        except Exception:
+            log.warning("WAL checkpoint failed", exc_info=True)
+            continue
+        log.debug("WAL checkpoint", extra={"wal_checkpoint": results})
+
+
+def dispose_engines() -> None:
+    """Close pooled connections of the synchronous engines."""
+
+    for name, registered in _distinct_engines():
+        if name not in _async_names:
+            registered.dispose()
+
+
 def get_db() -> Generator:
     db = SessionLocal()
     try:
@@ -26,6 +317,59 @@ def get_db() -> Generator:
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_thread_db() -> Session:
+    """Session for :func:`run_in_db_thread`, which closes it on its worker.
+
+    Creating a session does not connect, so this stays on the loop; the
+    generator :func:`get_db` would cost a thread hop for setup and another
+    for teardown on every request.
+    """
+    return SessionLocal()
+
+
+# Per event loop, like anyio's default thread limiter.
+_db_threads: RunVar[CapacityLimiter] = RunVar("db_threads")
+_sqlite_writer: RunVar[CapacityLimiter] = RunVar("sqlite_writer")
+
+
+def _limiter(var: RunVar[CapacityLimiter], tokens: int) -> CapacityLimiter:
+    try:
+        return var.get()
+    except LookupError:
+        limiter = CapacityLimiter(tokens)
+        var.set(limiter)
+        return limiter
+
+
+async def run_in_db_thread(fn: Callable[..., T], db: Session, *args: Any, write: bool = False) -> T:
+    """Run ``fn(db, *args)`` on a worker thread and close ``db`` there.
+
+    The ORM work and the scoring/aggregation in route bodies would otherwise
+    hold the event loop. At most pool size + overflow bodies run at once, so
+    a burst queues here instead of timing out on pool checkout. On a SQLite
+    file, ``write`` bodies also take the single writer slot: waiting on it
+    is cheaper than SQLite's busy-handler sleeps.
+    """
+
+    def call() -> T:
+        try:
+            return fn(db, *args)
+        finally:
+            # Return the connection before the thread slot is released.
+            db.close()
+
+    threads = _limiter(_db_threads, settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW)
+    if write and _is_sqlite_file(str(db.get_bind().url)):
+        async with _limiter(_sqlite_writer, 1):
+            return await to_thread.run_sync(call, limiter=threads)
+    return await to_thread.run_sync(call, limiter=threads)
+
+
 @contextmanager
 def session_scope():
     db = SessionLocal()
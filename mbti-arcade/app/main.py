@@ -1,8 +1,9 @@
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import logging
 import time
-from datetime import datetime, timezone
 from email.utils import formatdate
 from http import HTTPStatus
 from pathlib import Path
@@ -115,11 +116,21 @@ class ProblemDetailsTrustedHostMiddleware:
 
 from app import settings
 from app.core.config import REQUEST_ID_HEADER
+from app.core.db import SessionLocal as CoreSessionLocal
 from app.core.db import get_session as get_core_session
-from app.data.loader import seed_questions
-from app.data.questionnaire_loader import get_question_lookup
+from app.data.loader import ensure_questions_seeded
+from app.data.question_index import get_question_index
 from app.data.questions import questions_for_mode
-from app.database import Base, engine, session_scope, get_db
+from app.database import (
+    Base,
+    SessionLocal,
+    async_engine,
+    dispose_engines,
+    engine,
+    get_db,
+    run_wal_checkpoints,
+    session_scope,
+)
 from app.routers import health
 from app.routers import couple as couple_router
 from app.routers import og as og_router
@@ -134,6 +145,7 @@ from app.routers import sessions as sessions_router
 from app.routers import share as share_router
 from app.routers import invites as invites_router
 from app.observability import bind_request_id, configure_observability, reset_request_id
+from app.session_guard import SessionGuardMiddleware
 from app.urling import build_invite_url
 from app.utils.problem_details import (
     ProblemDetailsException,
@@ -143,10 +155,12 @@ from app.utils.problem_details import (
     internal_server_error,
     problem_response,
 )
-from app.models import Session as SessionModel, Participant, ParticipantRelation
+from app.models import Participant, ParticipantRelation
 from app.utils.privacy import apply_noindex_headers, NOINDEX_VALUE
 from app.schemas import DIMENSIONS, ParticipantRegistrationRequest
+from app.services.recompute import flush_pending
 from app.services.scoring import compute_norms, norm_to_radar
+from app.services.session_meta import lookup_session_meta
 from app.routers.participants import register_participant
 
 try:  # pragma: no cover - optional dependency
@@ -213,6 +227,7 @@ if "testserver" not in _allowed_hosts:
 
 app.add_middleware(ProxyHeadersMiddleware)
 app.add_middleware(ProblemDetailsTrustedHostMiddleware, allowed_hosts=_allowed_hosts)
+app.add_middleware(SessionGuardMiddleware)
 
 try:  # pragma: no cover - optional dependency hook
     from opentelemetry import trace  # type: ignore[import]
@@ -242,11 +257,6 @@ def _build_questions(mode: str, *, perspective: str) -> list[dict[str, object]]:
     return questions
 
 
-_QUESTION_LOOKUP = get_question_lookup()
-_QUESTION_DIM_SIGN: Dict[int, Tuple[str, int]] = {
-    question_id: (seed.dim, seed.sign)
-    for question_id, seed in _QUESTION_LOOKUP.items()
-}
 _DIMENSION_LETTERS: Dict[str, Tuple[str, str]] = {
     "EI": ("E", "I"),
     "SN": ("S", "N"),
@@ -285,7 +295,7 @@ def _score_answers(answer_pairs: Iterable[tuple[int, int]]) -> tuple[str, Dict[s
     if not normalized_pairs:
         raise ValueError("No answers submitted")
 
-    norms = compute_norms(normalized_pairs, _QUESTION_DIM_SIGN)
+    norms = compute_norms(normalized_pairs, get_question_index())
     radar = norm_to_radar(norms)
 
     scores: Dict[str, int] = {}
@@ -442,7 +452,27 @@ async def generic_exception_handler(request: Request, exc: Exception):
 async def startup_event():
     Base.metadata.create_all(bind=engine)
     with session_scope() as db:
-        seed_questions(db)
+        ensure_questions_seeded(db)
+    app.state.wal_checkpoints = None
+    if engine.dialect.name == "sqlite" and settings.SQLITE_WAL_CHECKPOINT_SECONDS > 0:
+        app.state.wal_checkpoints = asyncio.create_task(
+            run_wal_checkpoints(settings.SQLITE_WAL_CHECKPOINT_SECONDS)
+        )
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    checkpoints = getattr(app.state, "wal_checkpoints", None)
+    if checkpoints is not None:
+        checkpoints.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await checkpoints
+    if not flush_pending(timeout=10):
+        log.warning("Shutting down with aggregate recomputations still queued")
+    # Pooled aiosqlite/asyncpg connections belong to this event loop.
+    await async_engine.dispose()
+    # Closing the last SQLite connection checkpoints and removes the WAL.
+    dispose_engines()
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -506,12 +536,12 @@ async def submit_friend(request: Request):
             consent_display=False,
         )
 
-        with session_scope() as db:
-            registration = await register_participant(
-                invite_token=invite_token,
-                payload=registration_payload,
-                db=db,
-            )
+        # register_participant closes the session on its worker thread.
+        registration = await register_participant(
+            invite_token=invite_token,
+            payload=registration_payload,
+            db=SessionLocal(),
+        )
 
         responder_name = registration.display_name
 
@@ -647,7 +677,11 @@ async def mbti_result(request: Request):
 
 
 @app.post("/mbti/result/{token}", response_class=HTMLResponse)
-async def mbti_friend_result(request: Request, token: str):
+async def mbti_friend_result(
+    request: Request,
+    token: str,
+    session: OrmSession = Depends(get_core_session),
+):
     """친구 테스트 결과 제출 (토큰 기반)"""
     try:
         from app.core.token import verify_token
@@ -656,9 +690,7 @@ async def mbti_friend_result(request: Request, token: str):
         raise HTTPException(status_code=403, detail="Invalid or expired token")
     
     # 데이터베이스에서 친구 정보 가져오기
-    from app.core.db import get_session
     from app.core.models_db import Pair
-    session = next(get_session())
     pair = session.get(Pair, pair_id)
     if not pair:
         raise HTTPException(status_code=404, detail="Pair not found")
@@ -791,21 +823,12 @@ async def mbti_share_success(
 def invite_public(
     request: Request,
     token: str,
-    session=Depends(get_core_session),
     db: OrmSession = Depends(get_db),
 ):
-    session_record = (
-        db.query(SessionModel)
-        .filter(SessionModel.invite_token == token)
-        .one_or_none()
-    )
+    session_record = lookup_session_meta(db, token)
 
     if session_record is not None:
-        now = datetime.now(timezone.utc)
-        expires_at = session_record.expires_at
-        if expires_at.tzinfo is None:
-            expires_at = expires_at.replace(tzinfo=timezone.utc)
-        if expires_at <= now:
+        if session_record.is_expired():
             owner_name = session_record.snapshot_owner_name or "초대한 분"
             return problem_response(
                 request,
@@ -844,7 +867,9 @@ def invite_public(
         apply_noindex_headers(response)
         return response
 
-    return quiz_router.render_invite_page(request, token, session)
+    # Legacy pair invites live in the core database; only open it for those.
+    with CoreSessionLocal() as session:
+        return quiz_router.render_invite_page(request, token, session)
 
 @app.get("/api", tags=["system"])
 async def api_root():
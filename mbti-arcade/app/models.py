@@ -9,9 +9,12 @@ from sqlalchemy import (
     DateTime,
     Float,
     ForeignKey,
+    Index,
     Integer,
     JSON,
+    LargeBinary,
     String,
+    Text,
     UniqueConstraint,
 )
 from sqlalchemy import Enum as SAEnum
@@ -69,6 +72,10 @@ class OwnerProfile(Base, TimestampMixin):
 
 class Session(Base, TimestampMixin):
     __tablename__ = "sessions"
+    __table_args__ = (
+        # /api/result/preview picks the most recently updated session.
+        Index("ix_sessions_updated_at", "updated_at"),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True)
     owner_id: Mapped[int | None] = mapped_column(Integer, ForeignKey("users.id"))
@@ -91,6 +98,9 @@ class Session(Base, TimestampMixin):
     aggregate: Mapped[Aggregate | None] = relationship(
         back_populates="session", uselist=False, cascade="all, delete-orphan"
     )
+    aggregate_state: Mapped["AggregateState | None"] = relationship(
+        back_populates="session", uselist=False, cascade="all, delete-orphan"
+    )
     participants: Mapped[List["Participant"]] = relationship(
         back_populates="session", cascade="all, delete-orphan"
     )
@@ -154,6 +164,38 @@ class OtherResponse(Base, TimestampMixin):
     )
 
 
+class AnswerPack(Base, TimestampMixin):
+    """One respondent's answers packed into a single row.
+
+    ``answer_values`` holds one byte (0 = unanswered, otherwise 1-5) per
+    question, ordered by the compiled question index of
+    ``questionnaire_version``. ``owner`` is ``"self"`` for the session
+    owner and the rater hash for everyone else.
+    """
+
+    __tablename__ = "answer_packs"
+
+    session_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("sessions.id"), primary_key=True
+    )
+    owner: Mapped[str] = mapped_column(String(64), primary_key=True)
+    participant_id: Mapped[int | None] = mapped_column(
+        Integer, ForeignKey("participants.id"), nullable=True
+    )
+    relation_tag: Mapped[str | None] = mapped_column(String(30))
+    questionnaire_version: Mapped[str] = mapped_column(String(64), nullable=False)
+    answer_values: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+
+
+class QuestionnaireVersion(Base, TimestampMixin):
+    """Question id order used to encode :class:`AnswerPack` rows of one version."""
+
+    __tablename__ = "questionnaire_versions"
+
+    version: Mapped[str] = mapped_column(String(64), primary_key=True)
+    question_ids: Mapped[str] = mapped_column(Text, nullable=False)
+
+
 class Aggregate(Base, TimestampMixin):
     __tablename__ = "aggregates"
 
@@ -178,16 +220,58 @@ class Aggregate(Base, TimestampMixin):
     jp_sigma: Mapped[float | None] = mapped_column(Float)
     n: Mapped[int] = mapped_column(Integer, default=0)
     gap_score: Mapped[float | None] = mapped_column(Float)
+    # Bumped by every response write; the row is fresh while the two match.
+    responses_version: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    computed_version: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
 
     session: Mapped[Session] = relationship(back_populates="aggregate")
 
 
+class AggregateState(Base, TimestampMixin):
+    """Running weighted moments of rater norms for incremental aggregation.
+
+    ``weight_total`` is shared by every dimension because each rater
+    contributes to all four axes. ``*_mean``/``*_m2`` follow the weighted
+    Welford recurrence so that adding or removing one rater is O(1).
+    ``version`` is bumped on every write so concurrent submits can detect
+    that the moments they read have since changed.
+    """
+
+    __tablename__ = "aggregate_states"
+
+    session_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("sessions.id"), primary_key=True
+    )
+    n: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    weight_total: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    ei_mean: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    sn_mean: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    tf_mean: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    jp_mean: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    ei_m2: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    sn_m2: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    tf_m2: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    jp_m2: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    version: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    session: Mapped[Session] = relationship(back_populates="aggregate_state")
+
+
+class AppMetadata(Base, TimestampMixin):
+    """Small key/value store for deployment bookkeeping (e.g. seed versions)."""
+
+    __tablename__ = "app_metadata"
+
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    value: Mapped[str] = mapped_column(String(255), nullable=False)
+
+
 class Participant(Base, TimestampMixin):
     __tablename__ = "participants"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     session_id: Mapped[str] = mapped_column(
-        String(36), ForeignKey("sessions.id"), nullable=False
+        String(36), ForeignKey("sessions.id"), nullable=False, index=True
     )
     invite_token: Mapped[str] = mapped_column(String(60), nullable=False)
     relation: Mapped[ParticipantRelation] = mapped_column(
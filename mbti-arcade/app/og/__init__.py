@@ -1,5 +1,22 @@
 """Minimal OG image rendering utilities."""
 
-from .renderer import render_share_card
+from .cache import OGImageCache, get_og_cache
+from .renderer import (
+    DEFAULT_VARIANT,
+    VARIANTS,
+    CardVariant,
+    render_share_card,
+    render_share_cards,
+    share_card_fingerprint,
+)
 
-__all__ = ["render_share_card"]
+__all__ = [
+    "CardVariant",
+    "DEFAULT_VARIANT",
+    "OGImageCache",
+    "VARIANTS",
+    "get_og_cache",
+    "render_share_card",
+    "render_share_cards",
+    "share_card_fingerprint",
+]
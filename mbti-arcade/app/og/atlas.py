@@ -0,0 +1,180 @@
+"""Compact bitmap font atlas for share-card text.
+
+Binary layout (big-endian)::
+
+    header   b"OGFA" | u8 version | u8 cell_height | u16 range_count | u32 glyph_count
+    ranges   range_count x (u32 first_codepoint | u32 count | u32 first_glyph)
+    glyphs   glyph_count x (u8 advance | u8 height | cell_height x u16 row bits)
+
+Each row's most significant bit is the glyph's leftmost pixel. Ranges are
+contiguous codepoint runs, so the Hangul syllables block is one range and
+a lookup is a bisect over a handful of range starts. The file is mapped
+with ``mmap``; only the glyphs a card actually uses are ever paged in.
+"""
+
+from __future__ import annotations
+
+import mmap
+import struct
+import threading
+from bisect import bisect_right
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+from .font import FONT_5X7
+
+ATLAS_MAGIC = b"OGFA"
+ATLAS_VERSION = 1
+ATLAS_PATH = Path(__file__).resolve().parent / "fonts" / "og_font.atlas"
+MAX_GLYPH_WIDTH = 16
+
+_HEADER = struct.Struct(">4sBBHI")
+_RANGE = struct.Struct(">III")
+
+# (advance, rows) where each row is a string of "#" / " " cells.
+GlyphRows = Tuple[int, Sequence[str]]
+# (row offset, ((x_start, x_end), ...)) relative to the text origin.
+TextSpans = Tuple[Tuple[int, Tuple[Tuple[int, int], ...]], ...]
+
+
+def _row_bits(row: str) -> int:
+    if len(row) > MAX_GLYPH_WIDTH:
+        raise ValueError("Glyph rows are limited to 16 pixels")
+    bits = 0
+    for index, cell in enumerate(row):
+        if cell == "#":
+            bits |= 1 << (MAX_GLYPH_WIDTH - 1 - index)
+    return bits
+
+
+def encode_atlas(glyphs: Mapping[int, GlyphRows], cell_height: int) -> bytes:
+    """Serialise ``{codepoint: (advance, rows)}`` into the atlas format."""
+
+    codepoints = sorted(glyphs)
+    ranges: List[Tuple[int, int, int]] = []
+    for glyph_index, codepoint in enumerate(codepoints):
+        if ranges and ranges[-1][0] + ranges[-1][1] == codepoint:
+            first, count, first_glyph = ranges[-1]
+            ranges[-1] = (first, count + 1, first_glyph)
+        else:
+            ranges.append((codepoint, 1, glyph_index))
+
+    record = struct.Struct(f">BB{cell_height}H")
+    parts = [_HEADER.pack(ATLAS_MAGIC, ATLAS_VERSION, cell_height, len(ranges), len(codepoints))]
+    parts.extend(_RANGE.pack(*entry) for entry in ranges)
+    for codepoint in codepoints:
+        advance, rows = glyphs[codepoint]
+        if len(rows) > cell_height:
+            raise ValueError(f"Glyph U+{codepoint:04X} is taller than the atlas cell")
+        bits = [_row_bits(row) for row in rows] + [0] * (cell_height - len(rows))
+        parts.append(record.pack(advance, len(rows), *bits))
+    return b"".join(parts)
+
+
+def ascii_glyphs() -> Dict[int, GlyphRows]:
+    return {ord(char): (len(rows[0]), rows) for char, rows in FONT_5X7.items()}
+
+
+class FontAtlas:
+    def __init__(self, data: bytes | mmap.mmap) -> None:
+        magic, version, cell_height, range_count, glyph_count = _HEADER.unpack_from(data, 0)
+        if magic != ATLAS_MAGIC or version != ATLAS_VERSION:
+            raise ValueError("Not a share-card font atlas")
+        self._data = data
+        self.cell_height = cell_height
+        self.glyph_count = glyph_count
+        self._record = struct.Struct(f">BB{cell_height}H")
+        self._ranges = [
+            _RANGE.unpack_from(data, _HEADER.size + index * _RANGE.size)
+            for index in range(range_count)
+        ]
+        self._starts = [first for first, _, _ in self._ranges]
+        self._glyph_base = _HEADER.size + range_count * _RANGE.size
+
+    @classmethod
+    def open(cls, path: Path) -> "FontAtlas":
+        with open(path, "rb") as handle:
+            return cls(mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def _glyph_index(self, codepoint: int) -> Optional[int]:
+        position = bisect_right(self._starts, codepoint) - 1
+        if position < 0:
+            return None
+        first, count, first_glyph = self._ranges[position]
+        if codepoint >= first + count:
+            return None
+        return first_glyph + codepoint - first
+
+    def __contains__(self, char: object) -> bool:
+        return isinstance(char, str) and len(char) == 1 and self._glyph_index(ord(char)) is not None
+
+    def glyph(self, char: str) -> Optional[Tuple[int, Tuple[int, ...]]]:
+        """``(advance, row_bits)`` for ``char`` or ``None`` when not covered."""
+
+        index = self._glyph_index(ord(char))
+        if index is None:
+            return None
+        advance, height, *rows = self._record.unpack_from(
+            self._data, self._glyph_base + index * self._record.size
+        )
+        return advance, tuple(rows[:height])
+
+
+def _bit_runs(bits: int) -> List[Tuple[int, int]]:
+    runs = []
+    column = 0
+    while bits and column < MAX_GLYPH_WIDTH:
+        mask = 1 << (MAX_GLYPH_WIDTH - 1 - column)
+        if not bits & mask:
+            column += 1
+            continue
+        start = column
+        while column < MAX_GLYPH_WIDTH and bits & (1 << (MAX_GLYPH_WIDTH - 1 - column)):
+            column += 1
+        runs.append((start, column))
+    return runs
+
+
+_atlas: FontAtlas | None = None
+_atlas_lock = threading.Lock()
+
+
+def get_font_atlas() -> FontAtlas:
+    """The shipped atlas, or an ASCII-only one built in memory if it is missing."""
+
+    global _atlas
+    with _atlas_lock:
+        if _atlas is None:
+            if ATLAS_PATH.exists():
+                _atlas = FontAtlas.open(ATLAS_PATH)
+            else:  # pragma: no cover - only before scripts/build_font_atlas.py ran
+                _atlas = FontAtlas(encode_atlas(ascii_glyphs(), 7))
+        return _atlas
+
+
+@lru_cache(maxsize=1024)
+def text_spans(text: str, scale: int, spacing: int) -> Tuple[TextSpans, int]:
+    """Scaled pixel runs for a whole string plus its total advance.
+
+    Characters missing from the atlas advance like a blank 5-wide glyph.
+    """
+
+    atlas = get_font_atlas()
+    rows: Dict[int, List[Tuple[int, int]]] = {}
+    cursor = 0
+    for char in text:
+        glyph = atlas.glyph(char)
+        if glyph is None:
+            cursor += (5 * scale) + spacing * scale
+            continue
+        advance, bit_rows = glyph
+        for gy, bits in enumerate(bit_rows):
+            runs = [(cursor + start * scale, cursor + end * scale) for start, end in _bit_runs(bits)]
+            if not runs:
+                continue
+            for sy in range(scale):
+                rows.setdefault(gy * scale + sy, []).extend(runs)
+        cursor += (advance * scale) + spacing * scale
+    spans = tuple((dy, tuple(runs)) for dy, runs in sorted(rows.items()))
+    return spans, cursor
@@ -0,0 +1,87 @@
+"""Rendered share cards keyed by their render fingerprint.
+
+Entries are immutable: a fingerprint covers every input that affects the
+card, so a hit never needs revalidation. The memory tier is a bounded LRU;
+the optional disk tier (``OG_CACHE_DIR``) survives restarts and is shared
+by workers on the same host.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from app import settings
+
+
+class OGImageCache:
+    def __init__(self, max_entries: int, disk_dir: str | os.PathLike | None = None) -> None:
+        self.max_entries = max_entries
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, fingerprint: str) -> Path:
+        assert self.disk_dir is not None
+        return self.disk_dir / f"{fingerprint}.png"
+
+    def _remember(self, fingerprint: str, image: bytes) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[fingerprint] = image
+            self._entries.move_to_end(fingerprint)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, fingerprint: str) -> Optional[bytes]:
+        with self._lock:
+            image = self._entries.get(fingerprint)
+            if image is not None:
+                self._entries.move_to_end(fingerprint)
+                return image
+        if self.disk_dir is None:
+            return None
+        try:
+            image = self._path(fingerprint).read_bytes()
+        except OSError:
+            return None
+        self._remember(fingerprint, image)
+        return image
+
+    def put(self, fingerprint: str, image: bytes) -> None:
+        self._remember(fingerprint, image)
+        if self.disk_dir is None:
+            return
+        path = self._path(fingerprint)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_bytes(image)
+            os.replace(tmp_path, path)
+        except OSError:
+            # The disk tier is best effort; the memory tier already has the card.
+            tmp_path.unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+_cache: OGImageCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_og_cache() -> OGImageCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = OGImageCache(settings.OG_CACHE_MAX_ENTRIES, settings.OG_CACHE_DIR or None)
+        return _cache
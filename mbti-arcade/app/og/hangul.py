@@ -0,0 +1,224 @@
+"""Stroke-composed 12x12 Hangul glyphs for the share-card font atlas.
+
+Each jamo is a set of polylines in a unit square. A syllable picks boxes
+for its initial, medial and (optional) final jamo from the vowel's shape
+class and draws the strokes 1 px wide into a 12x12 cell. Only
+``scripts/build_font_atlas.py`` calls this; the renderer reads the
+precompiled atlas.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Sequence, Tuple
+
+CELL = 12
+
+Point = Tuple[float, float]
+Strokes = Sequence[Sequence[Point]]
+Box = Tuple[int, int, int, int]  # x0, y0, x1, y1 (exclusive)
+
+_OCTAGON = ((0.3, 0), (0.7, 0), (1, 0.3), (1, 0.7), (0.7, 1), (0.3, 1), (0, 0.7), (0, 0.3), (0.3, 0))
+
+CONSONANTS: Dict[str, Strokes] = {
+    "ㄱ": (((0, 0), (1, 0), (1, 1)),),
+    "ㄴ": (((0, 0), (0, 1), (1, 1)),),
+    "ㄷ": (((1, 0), (0, 0), (0, 1), (1, 1)),),
+    "ㄹ": (((0, 0), (1, 0), (1, 0.5), (0, 0.5), (0, 1), (1, 1)),),
+    "ㅁ": (((0, 0), (1, 0), (1, 1), (0, 1), (0, 0)),),
+    "ㅂ": (((0, 0), (0, 1), (1, 1), (1, 0)), ((0, 0.5), (1, 0.5))),
+    "ㅅ": (((0.5, 0), (0, 1)), ((0.5, 0), (1, 1))),
+    "ㅇ": (_OCTAGON,),
+    "ㅈ": (((0, 0), (1, 0)), ((0.5, 0), (0, 1)), ((0.5, 0.4), (1, 1))),
+    "ㅊ": (((0.5, 0), (0.5, 0.2)), ((0, 0.3), (1, 0.3)), ((0.5, 0.3), (0, 1)), ((0.5, 0.6), (1, 1))),
+    "ㅋ": (((0, 0), (1, 0), (1, 1)), ((0, 0.5), (1, 0.5))),
+    "ㅌ": (((1, 0), (0, 0), (0, 1), (1, 1)), ((0, 0.5), (1, 0.5))),
+    "ㅍ": (((0, 0), (1, 0)), ((0, 1), (1, 1)), ((0.3, 0), (0.3, 1)), ((0.7, 0), (0.7, 1))),
+    "ㅎ": (
+        ((0.5, 0), (0.5, 0.15)),
+        ((0, 0.25), (1, 0.25)),
+        tuple((0.2 + x * 0.6, 0.45 + y * 0.55) for x, y in _OCTAGON),
+    ),
+}
+
+# Double consonants and final clusters are two jamo side by side.
+PAIRS: Dict[str, Tuple[str, str]] = {
+    "ㄲ": ("ㄱ", "ㄱ"),
+    "ㄸ": ("ㄷ", "ㄷ"),
+    "ㅃ": ("ㅂ", "ㅂ"),
+    "ㅆ": ("ㅅ", "ㅅ"),
+    "ㅉ": ("ㅈ", "ㅈ"),
+    "ㄳ": ("ㄱ", "ㅅ"),
+    "ㄵ": ("ㄴ", "ㅈ"),
+    "ㄶ": ("ㄴ", "ㅎ"),
+    "ㄺ": ("ㄹ", "ㄱ"),
+    "ㄻ": ("ㄹ", "ㅁ"),
+    "ㄼ": ("ㄹ", "ㅂ"),
+    "ㄽ": ("ㄹ", "ㅅ"),
+    "ㄾ": ("ㄹ", "ㅌ"),
+    "ㄿ": ("ㄹ", "ㅍ"),
+    "ㅀ": ("ㄹ", "ㅎ"),
+    "ㅄ": ("ㅂ", "ㅅ"),
+}
+
+# Vowels drawn right of the initial ("vertical") or below it ("horizontal").
+VERTICAL_VOWELS: Dict[str, Strokes] = {
+    "ㅏ": (((0.4, 0), (0.4, 1)), ((0.4, 0.5), (1, 0.5))),
+    "ㅑ": (((0.4, 0), (0.4, 1)), ((0.4, 0.35), (1, 0.35)), ((0.4, 0.65), (1, 0.65))),
+    "ㅓ": (((0.7, 0), (0.7, 1)), ((0, 0.5), (0.7, 0.5))),
+    "ㅕ": (((0.7, 0), (0.7, 1)), ((0, 0.35), (0.7, 0.35)), ((0, 0.65), (0.7, 0.65))),
+    "ㅐ": (((0.2, 0), (0.2, 1)), ((0.9, 0), (0.9, 1)), ((0.2, 0.5), (0.9, 0.5))),
+    "ㅒ": (((0.2, 0), (0.2, 1)), ((0.9, 0), (0.9, 1)), ((0.2, 0.35), (0.9, 0.35)), ((0.2, 0.65), (0.9, 0.65))),
+    "ㅔ": (((0.5, 0), (0.5, 1)), ((0.9, 0), (0.9, 1)), ((0, 0.5), (0.5, 0.5))),
+    "ㅖ": (((0.5, 0), (0.5, 1)), ((0.9, 0), (0.9, 1)), ((0, 0.35), (0.5, 0.35)), ((0, 0.65), (0.5, 0.65))),
+    "ㅣ": (((0.5, 0), (0.5, 1)),),
+}
+HORIZONTAL_VOWELS: Dict[str, Strokes] = {
+    "ㅗ": (((0, 0.8), (1, 0.8)), ((0.5, 0.2), (0.5, 0.8))),
+    "ㅛ": (((0, 0.8), (1, 0.8)), ((0.3, 0.2), (0.3, 0.8)), ((0.7, 0.2), (0.7, 0.8))),
+    "ㅜ": (((0, 0.2), (1, 0.2)), ((0.5, 0.2), (0.5, 1))),
+    "ㅠ": (((0, 0.2), (1, 0.2)), ((0.3, 0.2), (0.3, 1)), ((0.7, 0.2), (0.7, 1))),
+    "ㅡ": (((0, 0.5), (1, 0.5)),),
+}
+MIXED_VOWELS: Dict[str, Tuple[str, str]] = {
+    "ㅘ": ("ㅗ", "ㅏ"),
+    "ㅙ": ("ㅗ", "ㅐ"),
+    "ㅚ": ("ㅗ", "ㅣ"),
+    "ㅝ": ("ㅜ", "ㅓ"),
+    "ㅞ": ("ㅜ", "ㅔ"),
+    "ㅟ": ("ㅜ", "ㅣ"),
+    "ㅢ": ("ㅡ", "ㅣ"),
+}
+
+INITIALS = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+MEDIALS = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+FINALS = ("",) + tuple("ㄱㄲㄳㄴㄵㄶㄷㄹㄺㄻㄼㄽㄾㄿㅀㅁㅂㅄㅅㅆㅇㅈㅊㅋㅌㅍㅎ")
+
+SYLLABLE_FIRST = 0xAC00
+SYLLABLE_COUNT = len(INITIALS) * len(MEDIALS) * len(FINALS)  # 11172
+
+# Boxes per vowel class: (initial, vertical part, horizontal part, final).
+_LAYOUTS: Dict[Tuple[str, bool], Tuple[Box | None, Box | None, Box | None, Box | None]] = {
+    ("vertical", False): ((0, 1, 7, 11), (7, 0, 12, 12), None, None),
+    ("vertical", True): ((0, 0, 7, 6), (7, 0, 12, 7), None, (1, 8, 11, 12)),
+    ("horizontal", False): ((2, 0, 10, 6), None, (0, 6, 12, 12), None),
+    ("horizontal", True): ((2, 0, 10, 4), None, (0, 4, 12, 7), (1, 8, 11, 12)),
+    ("mixed", False): ((0, 0, 7, 5), (8, 0, 12, 12), (0, 5, 9, 11), None),
+    ("mixed", True): ((0, 0, 7, 4), (8, 0, 12, 8), (0, 4, 9, 8), (1, 9, 11, 12)),
+}
+
+
+def _draw_line(grid: List[List[bool]], start: Tuple[int, int], end: Tuple[int, int]) -> None:
+    (x0, y0), (x1, y1) = start, end
+    dx, dy = abs(x1 - x0), -abs(y1 - y0)
+    step_x = 1 if x0 < x1 else -1
+    step_y = 1 if y0 < y1 else -1
+    error = dx + dy
+    while True:
+        grid[y0][x0] = True
+        if (x0, y0) == (x1, y1):
+            return
+        doubled = 2 * error
+        if doubled >= dy:
+            error += dy
+            x0 += step_x
+        if doubled <= dx:
+            error += dx
+            y0 += step_y
+
+
+def _draw_strokes(grid: List[List[bool]], strokes: Strokes, box: Box) -> None:
+    x0, y0, x1, y1 = box
+    width, height = x1 - x0 - 1, y1 - y0 - 1
+
+    def to_pixel(point: Point) -> Tuple[int, int]:
+        return x0 + round(point[0] * width), y0 + round(point[1] * height)
+
+    for stroke in strokes:
+        points = [to_pixel(point) for point in stroke]
+        if len(points) == 1:
+            points.append(points[0])
+        for start, end in zip(points, points[1:]):
+            _draw_line(grid, start, end)
+
+
+def _draw_consonant(grid: List[List[bool]], jamo: str, box: Box) -> None:
+    pair = PAIRS.get(jamo)
+    if pair is None:
+        _draw_strokes(grid, CONSONANTS[jamo], box)
+        return
+    x0, y0, x1, y1 = box
+    middle = x0 + (x1 - x0) // 2
+    _draw_strokes(grid, CONSONANTS[pair[0]], (x0, y0, middle, y1))
+    _draw_strokes(grid, CONSONANTS[pair[1]], (middle + 1, y0, x1, y1))
+
+
+def _vowel_class(medial: str) -> str:
+    if medial in VERTICAL_VOWELS:
+        return "vertical"
+    if medial in HORIZONTAL_VOWELS:
+        return "horizontal"
+    return "mixed"
+
+
+def _rows(grid: List[List[bool]]) -> List[str]:
+    return ["".join("#" if cell else " " for cell in row) for row in grid]
+
+
+def _blank() -> List[List[bool]]:
+    return [[False] * CELL for _ in range(CELL)]
+
+
+def compose_syllable(codepoint: int) -> List[str]:
+    """Rows of the 12x12 glyph for a precomposed Hangul syllable."""
+
+    offset = codepoint - SYLLABLE_FIRST
+    if not 0 <= offset < SYLLABLE_COUNT:
+        raise ValueError(f"U+{codepoint:04X} is not a Hangul syllable")
+    initial = INITIALS[offset // (len(MEDIALS) * len(FINALS))]
+    medial = MEDIALS[(offset // len(FINALS)) % len(MEDIALS)]
+    final = FINALS[offset % len(FINALS)]
+
+    vowel_class = _vowel_class(medial)
+    initial_box, vertical_box, horizontal_box, final_box = _LAYOUTS[(vowel_class, bool(final))]
+    grid = _blank()
+    _draw_consonant(grid, initial, initial_box)
+    if vowel_class == "vertical":
+        _draw_strokes(grid, VERTICAL_VOWELS[medial], vertical_box)
+    elif vowel_class == "horizontal":
+        _draw_strokes(grid, HORIZONTAL_VOWELS[medial], horizontal_box)
+    else:
+        horizontal, vertical = MIXED_VOWELS[medial]
+        _draw_strokes(grid, HORIZONTAL_VOWELS[horizontal], horizontal_box)
+        _draw_strokes(grid, VERTICAL_VOWELS[vertical], vertical_box)
+    if final:
+        _draw_consonant(grid, final, final_box)
+    return _rows(grid)
+
+
+def compose_jamo(jamo: str) -> List[str]:
+    """Rows for a standalone compatibility jamo (e.g. ``ㅋ``)."""
+
+    grid = _blank()
+    if jamo in CONSONANTS or jamo in PAIRS:
+        _draw_consonant(grid, jamo, (1, 1, 11, 11))
+    elif jamo in VERTICAL_VOWELS:
+        _draw_strokes(grid, VERTICAL_VOWELS[jamo], (2, 0, 10, 12))
+    elif jamo in HORIZONTAL_VOWELS:
+        _draw_strokes(grid, HORIZONTAL_VOWELS[jamo], (0, 2, 12, 10))
+    else:
+        horizontal, vertical = MIXED_VOWELS[jamo]
+        _draw_strokes(grid, HORIZONTAL_VOWELS[horizontal], (0, 2, 8, 10))
+        _draw_strokes(grid, VERTICAL_VOWELS[vertical], (8, 0, 12, 12))
+    return _rows(grid)
+
+
+def hangul_glyphs() -> Dict[int, Tuple[int, List[str]]]:
+    """``{codepoint: (advance, rows)}`` for syllables and compatibility jamo."""
+
+    glyphs: Dict[int, Tuple[int, List[str]]] = {}
+    for offset in range(SYLLABLE_COUNT):
+        glyphs[SYLLABLE_FIRST + offset] = (CELL, compose_syllable(SYLLABLE_FIRST + offset))
+    # Hangul Compatibility Jamo U+3131..U+3163 (ㄱ..ㅣ).
+    for codepoint in range(0x3131, 0x3164):
+        glyphs[codepoint] = (CELL, compose_jamo(chr(codepoint)))
+    return glyphs
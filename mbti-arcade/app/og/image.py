@@ -1,14 +1,65 @@
 from __future__ import annotations
 
+import math
 import zlib
-from typing import Iterable, Sequence, Tuple
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
 
-from .font import FONT_5X7
+from .atlas import TextSpans, text_spans
 
 Color = Tuple[int, int, int, int]
+Point = Tuple[float, float]
+MAX_PALETTE = 256
+# Maps each index byte to the high nibble of a packed 4-bit pixel pair.
+_HIGH_NIBBLE = bytes((value << 4) & 0xFF for value in range(256))
+# zlib header for deflate with a 32K window at the default level, as
+# zlib.compress writes it.
+_ZLIB_HEADER = b"\x78\x9c"
+# A final, empty fixed-Huffman block: terminates a raw deflate stream.
+_DEFLATE_END = b"\x03\x00"
+_ADLER_BASE = 65521
+BAND_HEIGHT = 16
+
+
+def _adler32_combine(adler1: int, adler2: int, length2: int) -> int:
+    """Adler-32 of ``a + b`` from the checksums of ``a`` and ``b`` (zlib's adler32_combine)."""
+
+    low1, high1 = adler1 & 0xFFFF, adler1 >> 16
+    low2, high2 = adler2 & 0xFFFF, adler2 >> 16
+    low = (low1 + low2 - 1) % _ADLER_BASE
+    high = (high1 + high2 + (length2 % _ADLER_BASE) * (low1 - 1)) % _ADLER_BASE
+    return (high << 16) | low
+
+
+def _deflate_segment(raw: bytes) -> bytes:
+    """Raw deflate ending on a full-flush boundary, so segments concatenate."""
+
+    compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    return compressor.compress(raw) + compressor.flush(zlib.Z_FULL_FLUSH)
+
+
+class _Band(NamedTuple):
+    start: int
+    end: int
+    rows: Tuple[bytes, ...]
+    deflated: bytes
+    adler: int
+    length: int
+
+
+class _PrecompressedBands(NamedTuple):
+    bit_depth: int
+    bands: Tuple[_Band, ...]
 
 
 class Canvas:
+    """RGBA raster, or palette-indexed when ``palette`` is given.
+
+    Indexed canvases store one palette index byte per pixel (a quarter of
+    the RGBA buffer) and encode as PNG colour type 3 at bit depth 4 when
+    the palette has at most 16 entries, 8 otherwise. Colours missing from
+    the palette are appended on first use, up to 256 entries.
+    """
+
     def __init__(
         self,
         width: int,
@@ -16,11 +67,20 @@ class Canvas:
         bg: Color | None = None,
         *,
         rows: Sequence[bytes] | None = None,
+        palette: Sequence[Color] | None = None,
     ) -> None:
         if width <= 0 or height <= 0:
             raise ValueError("Canvas dimensions must be positive")
         self.width = width
         self.height = height
+        self.palette: List[Color] | None = None
+        self._palette_index: Dict[Color, int] = {}
+        self._bpp = 4
+        if palette is not None:
+            self.palette = []
+            self._bpp = 1
+            for color in palette:
+                self._pixel(color)
         if rows is not None:
             if len(rows) != height:
                 raise ValueError("Row template height mismatch")
@@ -28,50 +88,261 @@ class Canvas:
         else:
             if bg is None:
                 raise ValueError("Background color required when rows not provided")
-            self.rows = [bytearray(bg * width) for _ in range(height)]
+            blank = self._pixel(bg) * width
+            self.rows = [bytearray(blank) for _ in range(height)]
+        self._bands: Optional[_PrecompressedBands] = None
+
+    def _pixel(self, color: Color) -> bytes:
+        """Bytes stored for one pixel of ``color`` (RGBA or a palette index)."""
+
+        if self.palette is None:
+            return bytes(color)
+        color = tuple(color)
+        index = self._palette_index.get(color)
+        if index is None:
+            if len(self.palette) >= MAX_PALETTE:
+                raise ValueError("Palette is limited to 256 colors")
+            index = self._palette_index[color] = len(self.palette)
+            self.palette.append(color)
+        return bytes((index,))
 
     def set_pixel(self, x: int, y: int, color: Color) -> None:
         if not (0 <= x < self.width and 0 <= y < self.height):
             return
         row = self.rows[y]
-        idx = x * 4
-        row[idx : idx + 4] = bytes(color)
+        idx = x * self._bpp
+        row[idx : idx + self._bpp] = self._pixel(color)
 
     def fill_rect(self, x: int, y: int, w: int, h: int, color: Color) -> None:
-        for yy in range(y, y + h):
-            if yy < 0 or yy >= self.height:
+        start = max(x, 0)
+        end = min(x + w, self.width)
+        if start >= end:
+            return
+        bpp = self._bpp
+        span = self._pixel(color) * (end - start)
+        rows = self.rows
+        for yy in range(max(y, 0), min(y + h, self.height)):
+            rows[yy][start * bpp : end * bpp] = span
+
+    def _fill_span(self, y: int, start: int, end: int, pixel: bytes) -> None:
+        start = max(start, 0)
+        end = min(end, self.width)
+        if start < end and 0 <= y < self.height:
+            self.rows[y][start * self._bpp : end * self._bpp] = pixel * (end - start)
+
+    def fill_polygon(self, points: Sequence[Point], color: Color) -> None:
+        """Fill a polygon (even-odd rule) one horizontal span at a time.
+
+        Scanlines sample pixel centres; an edge table sorted by top y feeds
+        an active edge list, so cost is proportional to edges x rows rather
+        than to the pixel area. Pixels whose centre lies on a left edge are
+        filled, on a right edge are not, so adjacent polygons never overlap.
+        """
+
+        edges = []
+        count = len(points)
+        for index in range(count):
+            x0, y0 = points[index]
+            x1, y1 = points[(index + 1) % count]
+            if y0 == y1:
                 continue
-            row = self.rows[yy]
-            start = max(x, 0)
-            end = min(x + w, self.width)
-            for xx in range(start, end):
-                idx = xx * 4
-                row[idx : idx + 4] = bytes(color)
+            if y0 > y1:
+                x0, y0, x1, y1 = x1, y1, x0, y0
+            edges.append((y0, y1, x0, (x1 - x0) / (y1 - y0)))
+        if not edges:
+            return
+        edges.sort()
+
+        pixel = self._pixel(color)
+        first_row = max(math.ceil(edges[0][0] - 0.5), 0)
+        last_row = min(math.ceil(max(edge[1] for edge in edges) - 0.5), self.height)
+        active: List[Tuple[float, float, float, float]] = []
+        pending = 0
+        for y in range(first_row, last_row):
+            sample = y + 0.5
+            while pending < len(edges) and edges[pending][0] <= sample:
+                active.append(edges[pending])
+                pending += 1
+            active = [edge for edge in active if edge[1] > sample]
+            crossings = sorted(x0 + (sample - y0) * slope for y0, _, x0, slope in active)
+            for left, right in zip(crossings[0::2], crossings[1::2]):
+                self._fill_span(y, math.ceil(left - 0.5), math.ceil(right - 0.5), pixel)
+
+    def draw_line(self, x0: float, y0: float, x1: float, y1: float, color: Color, width: int = 1) -> None:
+        """Aliased line; 1 px lines walk Bresenham and blit each row's run."""
+
+        if width > 1:
+            length = math.hypot(x1 - x0, y1 - y0)
+            if length == 0:
+                half = width / 2
+                self.fill_polygon(
+                    [(x0 - half, y0 - half), (x0 + half, y0 - half), (x0 + half, y0 + half), (x0 - half, y0 + half)],
+                    color,
+                )
+                return
+            # Offset both ends along the normal to get the stroke's quad.
+            nx = -(y1 - y0) / length * width / 2
+            ny = (x1 - x0) / length * width / 2
+            self.fill_polygon(
+                [(x0 + nx, y0 + ny), (x1 + nx, y1 + ny), (x1 - nx, y1 - ny), (x0 - nx, y0 - ny)],
+                color,
+            )
+            return
+
+        pixel = self._pixel(color)
+        x, y = round(x0), round(y0)
+        end_x, end_y = round(x1), round(y1)
+        dx, dy = abs(end_x - x), -abs(end_y - y)
+        step_x = 1 if x < end_x else -1
+        step_y = 1 if y < end_y else -1
+        error = dx + dy
+        run_start = x
+        while True:
+            if (x, y) == (end_x, end_y):
+                self._fill_span(y, min(run_start, x), max(run_start, x) + 1, pixel)
+                return
+            doubled = 2 * error
+            if doubled <= dx:
+                # Leaving this row: flush the run walked on it.
+                self._fill_span(y, min(run_start, x), max(run_start, x) + 1, pixel)
+                if doubled >= dy:
+                    error += dy
+                    x += step_x
+                error += dx
+                y += step_y
+                run_start = x
+            else:
+                error += dy
+                x += step_x
+
+    def draw_polygon(self, points: Sequence[Point], color: Color, width: int = 1) -> None:
+        """Outline a closed polygon."""
+
+        for index, (x0, y0) in enumerate(points):
+            x1, y1 = points[(index + 1) % len(points)]
+            self.draw_line(x0, y0, x1, y1, color, width)
 
     def draw_text(self, x: int, y: int, text: str, color: Color, scale: int = 2, spacing: int = 1) -> None:
-        cursor_x = x
-        upper_text = text.upper()
-        for char in upper_text:
-            glyph = FONT_5X7.get(char)
-            if glyph is None:
-                cursor_x += (5 * scale) + spacing * scale
+        """Draw ``text`` (upper-cased) from the font atlas.
+
+        Glyph runs for the whole string are cached per (text, scale,
+        spacing), so repeated labels are a straight span blit.
+        """
+
+        spans, _ = text_spans(text.upper(), scale, spacing)
+        self.blit_spans(x, y, spans, color)
+
+    def blit_spans(self, x: int, y: int, spans: TextSpans, color: Color) -> None:
+        """Paint pre-measured runs (see :func:`text_spans`) at ``(x, y)``."""
+
+        pixel = self._pixel(color)
+        bpp = self._bpp
+        width = self.width
+        for dy, runs in spans:
+            yy = y + dy
+            if yy < 0 or yy >= self.height:
                 continue
-            self._draw_glyph(cursor_x, y, glyph, color, scale)
-            cursor_x += (len(glyph[0]) * scale) + spacing * scale
-
-    def _draw_glyph(self, x: int, y: int, glyph: Iterable[str], color: Color, scale: int) -> None:
-        for gy, line in enumerate(glyph):
-            for gx, ch in enumerate(line):
-                if ch != "#":
-                    continue
-                for sy in range(scale):
-                    for sx in range(scale):
-                        self.set_pixel(x + gx * scale + sx, y + gy * scale + sy, color)
+            row = self.rows[yy]
+            for run_start, run_end in runs:
+                start = max(x + run_start, 0)
+                end = min(x + run_end, width)
+                if start < end:
+                    row[start * bpp : end * bpp] = pixel * (end - start)
+
+    def _bit_depth(self) -> int:
+        if self.palette is None:
+            return 8
+        return 4 if len(self.palette) <= 16 else 8
+
+    def _scanlines(self, rows: Sequence[bytearray], bit_depth: int) -> bytes:
+        """Filter-type-0 scanlines for ``rows`` at the PNG bit depth."""
+
+        if bit_depth == 8:
+            return b"".join(b"\x00" + bytes(row) for row in rows)
+
+        # Two pixels per byte: OR the shifted even pixels with the odd ones
+        # as big integers so the packing stays in C.
+        packed_width = (self.width + 1) // 2
+        lines = []
+        for row in rows:
+            high = bytes(row[0::2]).translate(_HIGH_NIBBLE)
+            low = bytes(row[1::2]).ljust(packed_width, b"\x00")
+            packed = int.from_bytes(high, "big") | int.from_bytes(low, "big")
+            lines.append(b"\x00" + packed.to_bytes(packed_width, "big"))
+        return b"".join(lines)
+
+    def precompress_bands(self, band_height: int = BAND_HEIGHT) -> None:
+        """Deflate this canvas once in row bands for reuse by its clones.
+
+        A clone's :meth:`to_png` copies the stored deflate blocks for every
+        band whose rows are still identical to this canvas and compresses
+        only the bands that were drawn on, so a template's static regions
+        are never re-filtered or re-compressed.
+        """
+
+        bit_depth = self._bit_depth()
+        bands = []
+        for start in range(0, self.height, band_height):
+            end = min(start + band_height, self.height)
+            raw = self._scanlines(self.rows[start:end], bit_depth)
+            bands.append(
+                _Band(
+                    start,
+                    end,
+                    tuple(bytes(row) for row in self.rows[start:end]),
+                    _deflate_segment(raw),
+                    zlib.adler32(raw),
+                    len(raw),
+                )
+            )
+        self._bands = _PrecompressedBands(bit_depth, tuple(bands))
+
+    def _idat(self, bit_depth: int) -> bytes:
+        bands = self._bands
+        if bands is None or bands.bit_depth != bit_depth:
+            return zlib.compress(self._scanlines(self.rows, bit_depth))
+
+        # Stitch stored blocks for unchanged bands with freshly deflated
+        # runs of changed ones; every segment ends on a full flush, so the
+        # concatenation is one valid deflate stream.
+        segments = [_ZLIB_HEADER]
+        adler = 1
+        dirty_start: Optional[int] = None
+
+        def flush_dirty(end: int) -> None:
+            nonlocal adler
+            raw = self._scanlines(self.rows[dirty_start:end], bit_depth)
+            segments.append(_deflate_segment(raw))
+            adler = zlib.adler32(raw, adler)
+
+        for band in bands.bands:
+            if self.rows[band.start : band.end] == list(band.rows):
+                if dirty_start is not None:
+                    flush_dirty(band.start)
+                    dirty_start = None
+                segments.append(band.deflated)
+                adler = _adler32_combine(adler, band.adler, band.length)
+            elif dirty_start is None:
+                dirty_start = band.start
+        if dirty_start is not None:
+            flush_dirty(self.height)
+        segments.append(_DEFLATE_END)
+        segments.append(adler.to_bytes(4, "big"))
+        return b"".join(segments)
 
     def to_png(self) -> bytes:
-        raw = b"".join(b"\x00" + bytes(row) for row in self.rows)
-        compressor = zlib.compressobj()
-        compressed = compressor.compress(raw) + compressor.flush()
+        bit_depth = self._bit_depth()
+        if self.palette is None:
+            header = bytes([bit_depth, 6, 0, 0, 0])
+            extra_chunks: List[Tuple[bytes, bytes]] = []
+        else:
+            header = bytes([bit_depth, 3, 0, 0, 0])
+            extra_chunks = [(b"PLTE", b"".join(bytes(color[:3]) for color in self.palette))]
+            alphas = bytes(color[3] for color in self.palette)
+            if alphas.rstrip(b"\xff"):
+                extra_chunks.append((b"tRNS", alphas.rstrip(b"\xff")))
+
+        compressed = self._idat(bit_depth)
 
         def chunk(chunk_type: bytes, data: bytes) -> bytes:
             length = len(data).to_bytes(4, "big")
@@ -81,10 +352,14 @@ class Canvas:
         ihdr = (
             self.width.to_bytes(4, "big")
             + self.height.to_bytes(4, "big")
-            + bytes([8, 6, 0, 0, 0])
+            + header
         )
-        png = [b"\x89PNG\r\n\x1a\n", chunk(b"IHDR", ihdr), chunk(b"IDAT", compressed), chunk(b"IEND", b"")]
+        png = [b"\x89PNG\r\n\x1a\n", chunk(b"IHDR", ihdr)]
+        png.extend(chunk(chunk_type, data) for chunk_type, data in extra_chunks)
+        png.extend([chunk(b"IDAT", compressed), chunk(b"IEND", b"")])
         return b"".join(png)
 
     def clone(self) -> "Canvas":
-        return Canvas(self.width, self.height, rows=self.rows)
+        copy = type(self)(self.width, self.height, rows=self.rows, palette=self.palette)
+        copy._bands = self._bands
+        return copy
@@ -0,0 +1,137 @@
+"""Bounded worker pool that keeps share-card rendering off the event loop.
+
+At most ``workers`` renders run at once and at most ``queue_limit`` more
+wait for a worker; anything beyond that is rejected immediately with
+:class:`RenderPoolSaturated` so a crawler burst cannot pile up behind the
+API. Queue wait and render time are recorded for ``/metricsz``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, TypeVar
+
+from app import settings
+
+T = TypeVar("T")
+
+_SAMPLE_SIZE = 256
+
+
+class RenderPoolSaturated(RuntimeError):
+    """Raised when every worker is busy and the queue is full."""
+
+
+def _summary(samples: Deque[float]) -> Dict[str, float]:
+    if not samples:
+        return {"avg_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+    ordered = sorted(samples)
+    return {
+        "avg_ms": round(sum(ordered) / len(ordered), 3),
+        "p95_ms": round(ordered[max(0, int(len(ordered) * 0.95) - 1)], 3),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+
+class RenderPool:
+    def __init__(self, workers: int, queue_limit: int) -> None:
+        if workers <= 0:
+            raise ValueError("Render pool needs at least one worker")
+        self.workers = workers
+        self.queue_limit = max(queue_limit, 0)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="og-render")
+        self._lock = threading.Lock()
+        self._admitted = 0
+        self._active = 0
+        self._completed = 0
+        self._rejected = 0
+        self._queue_wait_ms: Deque[float] = deque(maxlen=_SAMPLE_SIZE)
+        self._render_ms: Deque[float] = deque(maxlen=_SAMPLE_SIZE)
+
+    def _admit(self) -> None:
+        with self._lock:
+            if self._admitted >= self.workers + self.queue_limit:
+                self._rejected += 1
+                raise RenderPoolSaturated("OG render pool is saturated")
+            self._admitted += 1
+
+    def _run(self, submitted: float, fn: Callable[..., T], args: tuple) -> T:
+        started = time.perf_counter()
+        with self._lock:
+            self._active += 1
+            self._queue_wait_ms.append((started - submitted) * 1000)
+        try:
+            return fn(*args)
+        finally:
+            finished = time.perf_counter()
+            with self._lock:
+                self._active -= 1
+                self._admitted -= 1
+                self._completed += 1
+                self._render_ms.append((finished - started) * 1000)
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run ``fn(*args)`` on a pool thread, or raise if the pool is full."""
+
+        self._admit()
+        try:
+            future = self._executor.submit(self._run, time.perf_counter(), fn, args)
+        except BaseException:
+            with self._lock:
+                self._admitted -= 1
+            raise
+        return await asyncio.wrap_future(future)
+
+    def submit_background(self, fn: Callable[..., Any], *args: Any) -> bool:
+        """Best-effort fire-and-forget work; dropped (``False``) when saturated."""
+
+        try:
+            self._admit()
+        except RenderPoolSaturated:
+            return False
+        try:
+            self._executor.submit(self._run, time.perf_counter(), fn, args)
+        except BaseException:
+            with self._lock:
+                self._admitted -= 1
+            raise
+        return True
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_limit": self.queue_limit,
+                "active": self._active,
+                "queued": self._admitted - self._active,
+                "utilization": round(self._active / self.workers, 3),
+                "completed_total": self._completed,
+                "rejected_total": self._rejected,
+                "queue_wait": _summary(self._queue_wait_ms),
+                "render": _summary(self._render_ms),
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+
+_pool: RenderPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_render_pool() -> RenderPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = RenderPool(settings.OG_RENDER_WORKERS, settings.OG_RENDER_QUEUE_LIMIT)
+        return _pool
+
+
+def render_pool_metrics() -> Dict[str, Any] | None:
+    """Pool metrics, or ``None`` before the first render created the pool."""
+
+    return None if _pool is None else _pool.snapshot()
@@ -0,0 +1,71 @@
+"""Render share cards into the OG cache when a session's aggregate changes.
+
+Crawlers fetch a card right after its link is posted; rendering it as soon
+as the aggregate is committed means those requests hit the cache. Every
+entry point here is best effort: failures are logged and the OG route
+still renders on a miss.
+"""
+
+from __future__ import annotations
+
+import logging
+
+from sqlalchemy.orm import Session
+
+from app import settings
+from app.database import SessionLocal
+from app.models import Session as SessionModel
+from app.services.aggregator import load_aggregate
+from app.services.scoring import ScoringError
+
+from .cache import OGImageCache, get_og_cache
+from .pool import get_render_pool
+from .renderer import VARIANTS, render_share_cards, share_card_fingerprint
+
+log = logging.getLogger("perception_gap.og")
+
+
+def prerender_share_card(
+    db: Session, session: SessionModel, cache: OGImageCache | None = None
+) -> bool:
+    """Render ``session``'s current cards into ``cache``; ``False`` if all were cached.
+
+    Missing variants are rendered together so they share one layout pass.
+    """
+
+    if cache is None:
+        cache = get_og_cache()
+    aggregate = load_aggregate(db, session)
+    fingerprints = {name: share_card_fingerprint(session, aggregate, name) for name in VARIANTS}
+    missing = [name for name, fingerprint in fingerprints.items() if cache.get(fingerprint) is None]
+    if not missing:
+        return False
+    for name, image in render_share_cards(session, aggregate, missing).items():
+        cache.put(fingerprints[name], image)
+    return True
+
+
+def prerender_session(session_id: str) -> None:
+    """Prerender with a short-lived DB session (background threads, workers)."""
+
+    db = SessionLocal()
+    try:
+        session = db.get(SessionModel, session_id)
+        if session is not None:
+            prerender_share_card(db, session)
+    except ScoringError:
+        # No self answers yet; there is no card to show.
+        pass
+    except Exception:
+        log.exception("Share card prerender failed", extra={"session_id": session_id})
+    finally:
+        db.close()
+
+
+def schedule_prerender(session_id: str) -> None:
+    """Queue a prerender on the render pool; call after the aggregate commits."""
+
+    if not settings.OG_PRERENDER:
+        return
+    if not get_render_pool().submit_background(prerender_session, session_id):
+        log.debug("Render pool saturated; skipping prerender", extra={"session_id": session_id})
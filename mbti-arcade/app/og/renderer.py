@@ -1,13 +1,16 @@
 from __future__ import annotations
 
+import hashlib
 import logging
 import time
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
 
 from app.services.aggregator import AggregateResult
 from app.models import Session
 
+from .atlas import TextSpans, text_spans
 from .image import Canvas
 
 BACKGROUND = (15, 23, 42, 255)
@@ -17,47 +20,254 @@ TEXT_PRIMARY = (236, 252, 255, 255)
 TEXT_SECONDARY = (148, 163, 184, 255)
 LOCK_BG = (71, 85, 105, 255)
 LOCK_TEXT = (226, 232, 240, 255)
+# Every colour the card uses, so it encodes as a 4-bit indexed PNG.
+PALETTE = (BACKGROUND, CARD, ACCENT, TEXT_PRIMARY, TEXT_SECONDARY, LOCK_BG, LOCK_TEXT)
+
+# Bump whenever the card layout, palette or encoding changes so cached
+# cards and client ETags are invalidated.
+RENDERER_VERSION = "4"
 
 log = logging.getLogger("perception_gap.og")
 
 
-def _build_template() -> Canvas:
-    template = Canvas(1200, 630, BACKGROUND)
-    template.fill_rect(60, 90, 1080, 360, CARD)
+Box = Tuple[int, int, int, int]
+
+# Axis order clockwise from the top; each value is 0..100 (norm_to_radar).
+RADAR_AXES = (("EI", (0, -1)), ("SN", (1, 0)), ("TF", (0, 1)), ("JP", (-1, 0)))
+TITLE_MAX_WIDTH = 720
+HEADER_TEXT = "360ME — PERCEPTION GAP"
+FOOTER_TEXT = "SHARE SAFELY AT 360ME"
+
+
+@dataclass(frozen=True)
+class CardVariant:
+    """Where one output size places the blocks of a :class:`ShareCardLayout`."""
+
+    name: str
+    width: int
+    height: int
+    panel: Box
+    lock_box: Box
+    # Top-left corner of each text block, keyed by its layout role.
+    positions: Mapping[str, Tuple[int, int]]
+    radar_center: Tuple[int, int]
+    radar_radius: int
+
+
+VARIANTS: Dict[str, CardVariant] = {
+    "og": CardVariant(
+        name="og",
+        width=1200,
+        height=630,
+        panel=(60, 90, 1080, 360),
+        lock_box=(80, 360, 1040, 120),
+        positions={
+            "header": (80, 40),
+            "title": (80, 120),
+            "updated": (80, 210),
+            "mode": (80, 270),
+            "k": (80, 330),
+            "gap": (80, 390),
+            "lock": (120, 400),
+            "footer": (80, 520),
+        },
+        radar_center=(960, 225),
+        radar_radius=100,
+    ),
+    "twitter": CardVariant(
+        name="twitter",
+        width=1200,
+        height=600,
+        panel=(60, 75, 1080, 360),
+        lock_box=(80, 345, 1040, 120),
+        positions={
+            "header": (80, 30),
+            "title": (80, 105),
+            "updated": (80, 195),
+            "mode": (80, 255),
+            "k": (80, 315),
+            "gap": (80, 375),
+            "lock": (120, 385),
+            "footer": (80, 500),
+        },
+        radar_center=(960, 210),
+        radar_radius=100,
+    ),
+    "square": CardVariant(
+        name="square",
+        width=1080,
+        height=1080,
+        panel=(40, 110, 1000, 780),
+        lock_box=(60, 400, 960, 90),
+        positions={
+            "header": (60, 50),
+            "title": (60, 140),
+            "updated": (60, 230),
+            "mode": (60, 290),
+            "k": (60, 350),
+            "gap": (60, 420),
+            "lock": (100, 431),
+            "footer": (60, 960),
+        },
+        radar_center=(540, 680),
+        radar_radius=150,
+    ),
+}
+DEFAULT_VARIANT = "og"
+
+
+@dataclass(frozen=True)
+class ShareCardLayout:
+    """Size-independent card content: measured text runs and radar shape.
+
+    Built once per aggregate; every variant reuses the same glyph runs and
+    only differs in where blocks are placed.
+    """
+
+    # (role, glyph runs, colour); the role keys CardVariant.positions.
+    texts: Tuple[Tuple[str, TextSpans, Tuple[int, int, int, int]], ...]
+    locked: bool
+    # Per-axis reach in 0..1, in RADAR_AXES order.
+    radar_self: Optional[Tuple[float, ...]]
+    radar_other: Optional[Tuple[float, ...]]
+
+
+def _build_template(variant: CardVariant) -> Canvas:
+    # Everything that is the same on every card; its row bands are deflated
+    # once and reused by each render's PNG encoder.
+    template = Canvas(variant.width, variant.height, BACKGROUND, palette=PALETTE)
+    template.fill_rect(*variant.panel, CARD)
+    template.draw_text(*variant.positions["header"], HEADER_TEXT, TEXT_SECONDARY, scale=3)
+    template.draw_text(*variant.positions["footer"], FOOTER_TEXT, TEXT_SECONDARY, scale=2)
+    template.precompress_bands()
     return template
 
 
-_BASE_TEMPLATE = _build_template()
+_TEMPLATES = {name: _build_template(variant) for name, variant in VARIANTS.items()}
+_AXIS_LABELS = {dim: text_spans(dim, 2, 1)[0] for dim, _ in RADAR_AXES}
 
 
-def render_share_card(session: Session, aggregate: AggregateResult) -> bytes:
-    started = time.perf_counter()
-    canvas = _BASE_TEMPLATE.clone()
+def _radar_key(radar: Optional[Dict[str, float]]) -> str:
+    if radar is None:
+        return ""
+    return ",".join(str(round(radar.get(dim, 0.0))) for dim, _ in RADAR_AXES)
+
+
+def _radar_reach(radar: Optional[Dict[str, float]]) -> Optional[Tuple[float, ...]]:
+    if not radar:
+        return None
+    # Whole radar units keep the card (and its fingerprint) stable.
+    return tuple(max(0, min(100, round(radar.get(dim, 0.0)))) / 100 for dim, _ in RADAR_AXES)
+
+
+def _radar_points(variant: CardVariant, reach: Iterable[float]) -> List[Tuple[float, float]]:
+    cx, cy = variant.radar_center
+    radius = variant.radar_radius
+    return [(cx + dx * radius * r, cy + dy * radius * r) for (_, (dx, dy)), r in zip(RADAR_AXES, reach)]
+
 
-    canvas.draw_text(80, 40, "360ME — PERCEPTION GAP", TEXT_SECONDARY, scale=3)
-    canvas.draw_text(80, 120, f"SESSION: {session.id[:8]}", TEXT_PRIMARY, scale=4)
+def _draw_radar(canvas: Canvas, layout: ShareCardLayout, variant: CardVariant) -> None:
+    cx, cy = variant.radar_center
+    radius = variant.radar_radius
+    canvas.draw_polygon(_radar_points(variant, (1, 1, 1, 1)), TEXT_SECONDARY)
+    canvas.draw_line(cx, cy - radius, cx, cy + radius, TEXT_SECONDARY)
+    canvas.draw_line(cx - radius, cy, cx + radius, cy, TEXT_SECONDARY)
+    for dim, (dx, dy) in RADAR_AXES:
+        label_x = cx + dx * (radius + 22) - 11
+        label_y = cy + dy * (radius + 18) - 7
+        canvas.blit_spans(round(label_x), round(label_y), _AXIS_LABELS[dim], TEXT_SECONDARY)
 
+    if layout.radar_other is not None:
+        canvas.fill_polygon(_radar_points(variant, layout.radar_other), ACCENT)
+    if layout.radar_self is not None:
+        canvas.draw_polygon(_radar_points(variant, layout.radar_self), TEXT_PRIMARY, width=3)
+
+
+def _fit_text(text: str, scale: int, max_width: int) -> str:
+    while text and text_spans(text.upper(), scale, 1)[1] > max_width:
+        text = text[:-1]
+    return text
+
+
+def share_card_fingerprint(
+    session: Session, aggregate: AggregateResult, variant: str = DEFAULT_VARIANT
+) -> str:
+    """Digest of every input the card depends on (cache key and ETag)."""
+
+    gap_score = None if aggregate.gap_score is None else round(aggregate.gap_score, 1)
+    updated_at = session.updated_at.isoformat() if session.updated_at else ""
+    key = "|".join(
+        (
+            RENDERER_VERSION,
+            variant,
+            session.id,
+            session.mode,
+            session.snapshot_owner_name or "",
+            updated_at,
+            str(aggregate.n),
+            str(gap_score),
+            _radar_key(aggregate.radar_self),
+            _radar_key(aggregate.radar_other if aggregate.gap_score is not None else None),
+        )
+    )
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def build_share_card_layout(session: Session, aggregate: AggregateResult) -> ShareCardLayout:
+    """Measure every text block once; positions come from the variant."""
+
+    def block(role: str, text: str, color, scale: int):
+        return role, text_spans(text.upper(), scale, 1)[0], color
+
+    # The atlas covers Hangul, so owner names render as typed.
+    title = (session.snapshot_owner_name or "").strip() or f"SESSION: {session.id[:8]}"
     timestamp = (
         session.updated_at or datetime.now(timezone.utc)
     ).strftime("%Y-%m-%d %H:%M")
-    canvas.draw_text(80, 210, f"UPDATED: {timestamp}", TEXT_PRIMARY, scale=3)
-    canvas.draw_text(80, 270, f"MODE: {session.mode.upper()}", TEXT_PRIMARY, scale=3)
-    canvas.draw_text(80, 330, f"K: {aggregate.n}", TEXT_PRIMARY, scale=3)
-
-    if aggregate.gap_score is not None:
-        gap_str = f"GAP SCORE: {aggregate.gap_score:.1f}"
-        canvas.draw_text(80, 390, gap_str, ACCENT, scale=4)
+    texts = [
+        block("title", _fit_text(title, 4, TITLE_MAX_WIDTH), TEXT_PRIMARY, 4),
+        block("updated", f"UPDATED: {timestamp}", TEXT_PRIMARY, 3),
+        block("mode", f"MODE: {session.mode.upper()}", TEXT_PRIMARY, 3),
+        block("k", f"K: {aggregate.n}", TEXT_PRIMARY, 3),
+    ]
+    locked = aggregate.gap_score is None
+    if locked:
+        texts.append(block("lock", "RESULTS LOCKED (K < 3)", LOCK_TEXT, 4))
     else:
-        canvas.fill_rect(80, 360, 1040, 120, LOCK_BG)
-        canvas.draw_text(120, 400, "RESULTS LOCKED (K < 3)", LOCK_TEXT, scale=4)
+        texts.append(block("gap", f"GAP SCORE: {aggregate.gap_score:.1f}", ACCENT, 4))
+
+    return ShareCardLayout(
+        texts=tuple(texts),
+        locked=locked,
+        radar_self=_radar_reach(aggregate.radar_self),
+        radar_other=None if locked else _radar_reach(aggregate.radar_other),
+    )
+
+
+def rasterize_share_card(layout: ShareCardLayout, variant: CardVariant) -> Canvas:
+    canvas = _TEMPLATES[variant.name].clone()
+    if layout.locked:
+        canvas.fill_rect(*variant.lock_box, LOCK_BG)
+    _draw_radar(canvas, layout, variant)
+    for role, spans, color in layout.texts:
+        x, y = variant.positions[role]
+        canvas.blit_spans(x, y, spans, color)
+    return canvas
 
-    footer = "share safely at 360me"
-    canvas.draw_text(80, 520, footer.upper(), TEXT_SECONDARY, scale=2)
 
-    image = canvas.to_png()
+def render_share_cards(
+    session: Session, aggregate: AggregateResult, variants: Iterable[str] = tuple(VARIANTS)
+) -> Dict[str, bytes]:
+    """Render several card sizes from a single layout pass."""
+
+    started = time.perf_counter()
+    names = list(variants)
+    layout = build_share_card_layout(session, aggregate)
+    images = {name: rasterize_share_card(layout, VARIANTS[name]).to_png() for name in names}
 
     duration_ms = (time.perf_counter() - started) * 1000
-    if duration_ms >= 150:
+    # The budget is per card; several variants share one call.
+    if duration_ms >= 150 * max(len(names), 1):
         log.warning(
             "OG card rendering slow",
             extra={
@@ -65,6 +275,7 @@ def render_share_card(session: Session, aggregate: AggregateResult) -> bytes:
                 "duration_ms": round(duration_ms, 2),
                 "mode": session.mode,
                 "k": aggregate.n,
+                "variants": names,
             },
         )
     else:
@@ -73,7 +284,14 @@ def render_share_card(session: Session, aggregate: AggregateResult) -> bytes:
             extra={
                 "session_id": session.id,
                 "duration_ms": round(duration_ms, 2),
+                "variants": names,
             },
         )
 
-    return image
+    return images
+
+
+def render_share_card(
+    session: Session, aggregate: AggregateResult, variant: str = DEFAULT_VARIANT
+) -> bytes:
+    return render_share_cards(session, aggregate, (variant,))[variant]
@@ -2,7 +2,10 @@
 
 from __future__ import annotations
 
+from typing import Callable, TypeVar
+
 from fastapi import APIRouter, Depends, Request
+from sqlalchemy.orm import Session
 
 from app.couple.schemas import (
     ComputeRequest,
@@ -15,51 +18,68 @@ from app.couple.schemas import (
     StageOneSnapshot,
 )
 from app.couple.services import CoupleService
-from app.database import get_db
+from app.database import get_thread_db, run_in_db_thread
 
 router = APIRouter(prefix="/api/couples", tags=["couples"])
 
+T = TypeVar("T")
+
+
+class AsyncCoupleService:
+    """Runs :class:`CoupleService` calls on a worker thread (see run_in_db_thread)."""
+
+    def __init__(self, db: Session, request_id: str | None) -> None:
+        self.db = db
+        self.request_id = request_id
 
-def get_couple_service(request: Request, db=Depends(get_db)) -> CoupleService:
+    async def call(self, operation: Callable[[CoupleService], T], *, commit: bool = False) -> T:
+        def run(sync_db: Session) -> T:
+            service = CoupleService(sync_db, request_id=self.request_id)
+            if not commit:
+                return operation(service)
+            try:
+                result = operation(service)
+                sync_db.commit()
+            except Exception:
+                sync_db.rollback()
+                raise
+            return result
+
+        return await run_in_db_thread(run, self.db, write=commit)
+
+
+async def get_couple_service(
+    request: Request, db: Session = Depends(get_thread_db)
+) -> AsyncCoupleService:
     request_id = getattr(request.state, "request_id", None)
-    return CoupleService(db, request_id=request_id)
+    return AsyncCoupleService(db, request_id=request_id)
 
 
 @router.post("/sessions", response_model=CoupleSessionEnvelope, status_code=201)
 async def create_session(
     payload: CoupleSessionCreate,
-    service: CoupleService = Depends(get_couple_service),
+    service: AsyncCoupleService = Depends(get_couple_service),
 ) -> CoupleSessionEnvelope:
-    try:
-        envelope = service.create_session(payload)
-        service.db.commit()
-    except Exception:
-        service.db.rollback()
-        raise
-    return envelope
+    return await service.call(lambda couples: couples.create_session(payload), commit=True)
 
 
 @router.patch("/sessions/{session_id}/stage1", response_model=CoupleSessionEnvelope)
 async def update_stage_one(
     session_id: str,
     payload: StageOneSnapshot,
-    service: CoupleService = Depends(get_couple_service),
+    service: AsyncCoupleService = Depends(get_couple_service),
 ) -> CoupleSessionEnvelope:
-    try:
-        envelope = service.update_stage_one(session_id, payload)
-        service.db.commit()
-    except Exception:
-        service.db.rollback()
-        raise
-    return envelope
+    return await service.call(
+        lambda couples: couples.update_stage_one(session_id, payload), commit=True
+    )
 
 
 @router.get("/sessions/{session_id}", response_model=CoupleSessionEnvelope)
 async def fetch_session(
     session_id: str,
-    service: CoupleService = Depends(get_couple_service),
+    service: AsyncCoupleService = Depends(get_couple_service),
 ) -> CoupleSessionEnvelope:
-    return service.get_session_envelope(session_id)
+    return await service.call(lambda couples: couples.get_session_envelope(session_id))
 
 
 @router.put(
@@ -69,15 +89,11 @@ async def fetch_session(
 async def upsert_responses(
     session_id: str,
     payload: ResponseUpsertRequest,
-    service: CoupleService = Depends(get_couple_service),
+    service: AsyncCoupleService = Depends(get_couple_service),
 ) -> ResponseUpsertResponse:
-    try:
-        response = service.upsert_responses(session_id, payload)
-        service.db.commit()
-    except Exception:
-        service.db.rollback()
-        raise
-    return response
+    return await service.call(
+        lambda couples: couples.upsert_responses(session_id, payload), commit=True
+    )
 
 
 @router.get(
@@ -87,9 +103,9 @@ async def upsert_responses(
 async def get_saved_responses(
     session_id: str,
     access_token: str,
-    service: CoupleService = Depends(get_couple_service),
+    service: AsyncCoupleService = Depends(get_couple_service),
 ) -> SavedResponses:
-    return service.fetch_responses(session_id, access_token)
+    return await service.call(lambda couples: couples.fetch_responses(session_id, access_token))
 
 
 @router.post(
@@ -99,16 +115,13 @@ async def get_saved_responses(
 async def compute_result(
     session_id: str,
     payload: ComputeRequest,
-    service: CoupleService = Depends(get_couple_service),
+    service: AsyncCoupleService = Depends(get_couple_service),
 ) -> CoupleResultEnvelope:
     # Ensure token is valid even though compute_result currently only
     # requires stage completion. This prevents arbitrary callers from
     # recomputing someone else's session.
-    service._resolve_participant(session_id, payload.access_token)
-    try:
-        envelope = service.compute_result(session_id)
-        service.db.commit()
-    except Exception:
-        service.db.rollback()
-        raise
-    return envelope
+    def compute(couples: CoupleService) -> CoupleResultEnvelope:
+        couples._resolve_participant(session_id, payload.access_token)
+        return couples.compute_result(session_id)
+
+    return await service.call(compute, commit=True)
@@ -13,7 +13,10 @@ from fastapi.responses import JSONResponse
 from sqlalchemy import text
 from sqlalchemy.exc import SQLAlchemyError
 
-from app.database import engine
+from app.database import engine, pool_metrics
+from app.og.pool import render_pool_metrics
+from app.services.session_meta import get_session_meta_cache
+from app.session_guard import leak_metrics
 
 try:  # pragma: no cover - optional dependency
     from redis import asyncio as redis_asyncio  # type: ignore[import]
@@ -66,6 +69,19 @@ async def readyz() -> JSONResponse:
     )
 
 
+@router.get("/metricsz")
+async def metricsz() -> Dict[str, Any]:
+    """Process-local runtime metrics (OG render and DB pool utilisation and waits)."""
+
+    return {
+        "time": _utc_now(),
+        "og_render_pool": render_pool_metrics(),
+        "database_pools": pool_metrics(),
+        "database_leaks": leak_metrics(),
+        "session_meta_cache": get_session_meta_cache().snapshot(),
+    }
+
+
 async def _check_database() -> Dict[str, Any]:
     try:
         await to_thread.run_sync(_ping_database)
@@ -9,6 +9,7 @@ from app.core.config import compute_expiry, generate_invite_token, generate_sess
 from app.database import get_db
 from app.models import OwnerProfile, Session as SessionModel
 from app.schemas import InviteCreateRequest, InviteCreateResponse
+from app.services.session_meta import invalidate_session_meta
 from app.urling import build_invite_url
 from app.utils.auth import extract_owner_key
 from app.utils.problem_details import ProblemDetailsException
@@ -60,6 +61,7 @@ def create_invite(
 
     db.add(session)
     db.commit()
+    invalidate_session_meta(invite_token)
 
     invite_url = build_invite_url(request, token=session.invite_token)
 
@@ -1,29 +1,48 @@
 from __future__ import annotations
 
-import hashlib
-
-from fastapi import APIRouter, Depends, Response
+from fastapi import APIRouter, Depends, Request, Response
 from fastapi.responses import Response as FastAPIResponse
 from sqlalchemy.orm import Session
 
-from app.database import get_db
-from app.models import Session as SessionModel
-from app.services.aggregator import recalculate_aggregate
+from app import settings
+from app.database import get_thread_db, run_in_db_thread
+from app.services.aggregator import load_aggregate
 from app.services.scoring import ScoringError
+from app.services.session_meta import lookup_session_meta
 from app.utils.problem_details import ProblemDetailsException
 from app.utils.privacy import NOINDEX_VALUE, apply_noindex_headers
-from app.og import render_share_card
+from app.og import DEFAULT_VARIANT, VARIANTS, get_og_cache, render_share_card, share_card_fingerprint
+from app.og.pool import RenderPoolSaturated, get_render_pool
 
 router = APIRouter(prefix="/share", tags=["share"])
 
+OG_CACHE_CONTROL = "public, max-age=600"
 
-@router.get("/og/{invite_token}.png")
-async def generate_share_og(invite_token: str, db: Session = Depends(get_db)) -> Response:
-    session = (
-        db.query(SessionModel)
-        .filter(SessionModel.invite_token == invite_token)
-        .first()
-    )
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def _og_headers(response: Response, etag: str) -> Response:
+    response.headers["Cache-Control"] = OG_CACHE_CONTROL
+    response.headers["ETag"] = etag
+    apply_noindex_headers(response)
+    response.headers["X-Robots-Tag"] = NOINDEX_VALUE
+    return response
+
+
+def _load_card_inputs(db: Session, invite_token: str):
+    session = lookup_session_meta(db, invite_token)
     if session is None:
         raise ProblemDetailsException(
             status_code=404,
@@ -33,7 +52,7 @@ async def generate_share_og(invite_token: str, db: Session = Depends(get_db)) ->
         )
 
     try:
-        aggregate = recalculate_aggregate(db, session)
+        aggregate = load_aggregate(db, session)
     except ScoringError as exc:
         raise ProblemDetailsException(
             status_code=400,
@@ -41,13 +60,61 @@ async def generate_share_og(invite_token: str, db: Session = Depends(get_db)) ->
             detail=str(exc),
             type_suffix="scoring-error",
         ) from exc
+    return session, aggregate
 
-    image_bytes = render_share_card(session, aggregate)
-    etag = hashlib.sha256(image_bytes).hexdigest()
 
-    response = FastAPIResponse(content=image_bytes, media_type="image/png")
-    response.headers["Cache-Control"] = "public, max-age=600"
-    response.headers["ETag"] = etag
-    apply_noindex_headers(response)
-    response.headers["X-Robots-Tag"] = NOINDEX_VALUE
-    return response
+async def _share_og_response(
+    invite_token: str, variant: str, request: Request, db: Session
+) -> Response:
+    # A stale aggregate is rescored here, so keep it off the event loop. The
+    # connection is released before rendering; the loaded rows stay usable.
+    session, aggregate = await run_in_db_thread(_load_card_inputs, db, invite_token)
+    fingerprint = share_card_fingerprint(session, aggregate, variant)
+    etag = f'"{fingerprint}"'
+    if _etag_matches(request.headers.get("If-None-Match"), etag):
+        return _og_headers(FastAPIResponse(status_code=304), etag)
+
+    cache = get_og_cache()
+    image_bytes = cache.get(fingerprint)
+    if image_bytes is None:
+        try:
+            image_bytes = await get_render_pool().run(render_share_card, session, aggregate, variant)
+        except RenderPoolSaturated as exc:
+            raise ProblemDetailsException(
+                status_code=503,
+                title="Share Image Busy",
+                detail="공유 이미지를 생성하는 요청이 많습니다. 잠시 후 다시 시도해 주세요.",
+                type_suffix="og-render-busy",
+                headers={"Retry-After": str(settings.OG_RENDER_RETRY_AFTER_SECONDS)},
+            ) from exc
+        cache.put(fingerprint, image_bytes)
+
+    return _og_headers(FastAPIResponse(content=image_bytes, media_type="image/png"), etag)
+
+
+# Registered before the plain route, which would otherwise capture
+# "<token>.<variant>" as the token.
+@router.get("/og/{invite_token}.{variant}.png")
+async def generate_share_og_variant(
+    invite_token: str,
+    variant: str,
+    request: Request,
+    db: Session = Depends(get_thread_db),
+) -> Response:
+    if variant not in VARIANTS:
+        raise ProblemDetailsException(
+            status_code=404,
+            title="Share Image Variant Not Found",
+            detail=f"지원하지 않는 공유 이미지 형식입니다: {', '.join(VARIANTS)}",
+            type_suffix="og-variant-not-found",
+        )
+    return await _share_og_response(invite_token, variant, request, db)
+
+
+@router.get("/og/{invite_token}.png")
+async def generate_share_og(
+    invite_token: str,
+    request: Request,
+    db: Session = Depends(get_thread_db),
+) -> Response:
+    return await _share_og_response(invite_token, DEFAULT_VARIANT, request, db)
@@ -1,22 +1,20 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
-from typing import Dict, List
+from typing import List
 
 from fastapi import APIRouter, Depends
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 
-from app.data.loader import seed_questions
-from app.database import get_db
+from app.data.question_index import get_question_index
+from app.database import get_thread_db, run_in_db_thread
 from app.models import (
-    OtherResponse,
     Participant,
-    ParticipantAnswer,
     ParticipantRelation,
-    Question,
     Session as SessionModel,
 )
+from app.og.prerender import schedule_prerender
 from app.routers.responses import ensure_session_active, validate_answers
 from app.schemas import (
     ParticipantAnswerSubmitRequest,
@@ -27,12 +25,23 @@ from app.schemas import (
     ParticipantRegistrationRequest,
     ParticipantRegistrationResponse,
 )
+from app.services import answer_store
 from app.services.aggregator import (
-    build_question_lookup,
-    recalculate_aggregate,
+    RaterContribution,
+    compute_relation_aggregates,
+    load_rater_contribution,
+    mark_responses_changed,
     recalculate_relation_aggregates,
+    update_aggregate_incrementally,
 )
-from app.services.scoring import ScoringError, compute_norms, norms_to_mbti
+from app.services.recompute import aggregate_status, is_coalescing, schedule_recompute
+from app.services.scoring import (
+    ScoringError,
+    compute_norms,
+    norms_to_mbti,
+    weight_for_relation,
+)
+from app.services.session_meta import SessionMeta, lookup_session_meta
 from app.utils.problem_details import ProblemDetailsException
 
 router = APIRouter(prefix="/v1", tags=["participants"])
@@ -44,12 +53,7 @@ def _participant_rater_hash(participant_id: int) -> str:
     return f"participant:{participant_id}"
 
 
-def _get_question_lookup(db: Session) -> Dict[int, tuple[str, int]]:
-    questions = db.query(Question).all()
-    return build_question_lookup(questions)
-
-
-def _ensure_capacity(session: SessionModel, db: Session) -> None:
+def _ensure_capacity(session: SessionModel | SessionMeta, db: Session) -> None:
     current_count = (
         db.query(func.count(Participant.id))
         .filter(Participant.session_id == session.id)
@@ -65,6 +69,18 @@ def _ensure_capacity(session: SessionModel, db: Session) -> None:
         )
 
 
+def _submitted_count(session: SessionModel, db: Session) -> int:
+    return (
+        db.query(func.count(Participant.id))
+        .filter(
+            Participant.session_id == session.id,
+            Participant.answers_submitted_at.is_not(None),
+        )
+        .scalar()
+        or 0
+    )
+
+
 @router.post(
     "/participants/{invite_token}",
     response_model=ParticipantRegistrationResponse,
@@ -73,13 +89,15 @@ def _ensure_capacity(session: SessionModel, db: Session) -> None:
 async def register_participant(
     invite_token: str,
     payload: ParticipantRegistrationRequest,
-    db: Session = Depends(get_db),
-):
-    session = (
-        db.query(SessionModel)
-        .filter(SessionModel.invite_token == invite_token)
-        .first()
-    )
+    db: Session = Depends(get_thread_db),
+) -> ParticipantRegistrationResponse:
+    return await run_in_db_thread(_register_participant, db, invite_token, payload, write=True)
+
+
+def _register_participant(
+    db: Session, invite_token: str, payload: ParticipantRegistrationRequest
+) -> ParticipantRegistrationResponse:
+    session = lookup_session_meta(db, invite_token)
     if session is None:
         raise ProblemDetailsException(
             status_code=404,
@@ -133,8 +151,16 @@ async def register_participant(
 async def submit_participant_answers(
     participant_id: int,
     payload: ParticipantAnswerSubmitRequest,
-    db: Session = Depends(get_db),
-):
+    db: Session = Depends(get_thread_db),
+) -> ParticipantAnswerSubmitResponse:
+    return await run_in_db_thread(
+        _submit_participant_answers, db, participant_id, payload, write=True
+    )
+
+
+def _submit_participant_answers(
+    db: Session, participant_id: int, payload: ParticipantAnswerSubmitRequest
+) -> ParticipantAnswerSubmitResponse:
     participant = db.get(Participant, participant_id)
     if participant is None:
         raise ProblemDetailsException(
@@ -159,42 +185,22 @@ async def submit_participant_answers(
 
     validate_answers(session.mode, answers)
 
-    seed_questions(db)
-    lookup = _get_question_lookup(db)
+    lookup = get_question_index()
 
     try:
-        db.query(ParticipantAnswer).filter(
-            ParticipantAnswer.participant_id == participant.id
-        ).delete()
-
+        answer_pairs = [(item.question_id, item.value) for item in answers]
         rater_hash = _participant_rater_hash(participant.id)
-        db.query(OtherResponse).filter(
-            OtherResponse.session_id == session.id,
-            OtherResponse.rater_hash == rater_hash,
-        ).delete()
-
-        for answer in answers:
-            db.add(
-                ParticipantAnswer(
-                    participant_id=participant.id,
-                    question_id=answer.question_id,
-                    value=answer.value,
-                )
-            )
-            db.add(
-                OtherResponse(
-                    session_id=session.id,
-                    rater_hash=rater_hash,
-                    participant_id=participant.id,
-                    question_id=answer.question_id,
-                    value=answer.value,
-                    relation_tag=participant.relation.value,
-                )
-            )
-
-        db.flush()
+        previous = load_rater_contribution(db, session.id, rater_hash, lookup)
+
+        answer_store.save_rater_answers(
+            db,
+            session.id,
+            rater_hash,
+            answer_pairs,
+            participant.relation.value,
+            participant_id=participant.id,
+        )
 
-        answer_pairs = [(item.question_id, item.value) for item in answers]
         norms = compute_norms(answer_pairs, lookup)
         participant.axes_payload = {dim: round(value, 6) for dim, value in norms.items()}
         participant.perceived_type = norms_to_mbti(norms)
@@ -202,8 +208,21 @@ async def submit_participant_answers(
         participant.answers_submitted_at = now
         participant.computed_at = now
 
-        recalculate_aggregate(db, session)
-        relation_result = recalculate_relation_aggregates(session.id, db)
+        if is_coalescing():
+            mark_responses_changed(db, session.id)
+            db.flush()
+            respondents = _submitted_count(session, db)
+        else:
+            update_aggregate_incrementally(
+                db,
+                session,
+                previous=previous,
+                current=RaterContribution(
+                    norms=norms, weight=weight_for_relation(participant.relation.value)
+                ),
+                lookup=lookup,
+            )
+            respondents = recalculate_relation_aggregates(session.id, db).total_respondents
 
         db.commit()
     except ProblemDetailsException:
@@ -221,7 +240,11 @@ async def submit_participant_answers(
         db.rollback()
         raise
 
-    respondents = relation_result.total_respondents
+    if is_coalescing():
+        schedule_recompute(session.id)
+    else:
+        schedule_prerender(session.id)
+
     unlocked = respondents >= UNLOCK_THRESHOLD
 
     return ParticipantAnswerSubmitResponse(
@@ -233,6 +256,7 @@ async def submit_participant_answers(
         respondent_count=respondents,
         unlocked=unlocked,
         threshold=UNLOCK_THRESHOLD,
+        aggregate_status=aggregate_status(db, session.id),
     )
 
 
@@ -242,13 +266,13 @@ async def submit_participant_answers(
 )
 async def participant_preview(
     invite_token: str,
-    db: Session = Depends(get_db),
-):
-    session = (
-        db.query(SessionModel)
-        .filter(SessionModel.invite_token == invite_token)
-        .first()
-    )
+    db: Session = Depends(get_thread_db),
+) -> ParticipantPreviewResponse:
+    return await run_in_db_thread(_participant_preview, db, invite_token)
+
+
+def _participant_preview(db: Session, invite_token: str) -> ParticipantPreviewResponse:
+    session = lookup_session_meta(db, invite_token)
     if session is None:
         raise ProblemDetailsException(
             status_code=404,
@@ -257,8 +281,7 @@ async def participant_preview(
             type_suffix="invite-not-found",
         )
 
-    relation_result = recalculate_relation_aggregates(session.id, db)
-    db.commit()
+    relation_result = compute_relation_aggregates(session.id, db)
 
     respondents = relation_result.total_respondents
     unlocked = respondents >= UNLOCK_THRESHOLD
@@ -306,4 +329,5 @@ async def participant_preview(
         unlocked=unlocked,
         relations=relations_payload,
         participants=participants_payload,
+        aggregate_status=aggregate_status(db, session.id),
     )
@@ -5,8 +5,9 @@ from typing import Dict
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
+from app.data.question_index import get_question_index
 from app.database import get_db
-from app.models import Participant, Question, Session as SessionModel
+from app.models import Participant, Session as SessionModel
 from app.schemas import (
     DIMENSIONS,
     ParticipantReportAxis,
@@ -15,9 +16,8 @@ from app.schemas import (
     SessionReportResponse,
 )
 from app.services.aggregator import (
-    build_question_lookup,
+    compute_relation_aggregates,
     load_self_norm,
-    recalculate_relation_aggregates,
 )
 from app.services.scoring import norms_to_mbti
 from app.utils.problem_details import ProblemDetailsException
@@ -28,9 +28,7 @@ router = APIRouter(prefix="/v1/report", tags=["report"])
 
 
 def _load_self_axes(db: Session, session: SessionModel) -> Dict[str, float]:
-    questions = db.query(Question).all()
-    lookup = build_question_lookup(questions)
-    self_norm = load_self_norm(db, session, lookup)
+    self_norm = load_self_norm(db, session, get_question_index())
     if self_norm is None:
         raise ProblemDetailsException(
             status_code=409,
@@ -94,7 +92,7 @@ def participant_report(participant_id: int, db: Session = Depends(get_db)) -> Pa
             )
         )
 
-    summary = recalculate_relation_aggregates(session.id, db)
+    summary = compute_relation_aggregates(session.id, db)
 
     return ParticipantReportResponse(
         participant_id=participant.id,
@@ -125,7 +123,7 @@ def session_report(session_id: str, db: Session = Depends(get_db)) -> SessionRep
     except ProblemDetailsException:
         self_axes = None
 
-    summary = recalculate_relation_aggregates(session.id, db)
+    summary = compute_relation_aggregates(session.id, db)
     respondents = summary.total_respondents
     unlocked = respondents >= UNLOCK_THRESHOLD
 
@@ -2,13 +2,13 @@ import hashlib
 from datetime import datetime, timezone
 
 from fastapi import APIRouter, Depends
-from sqlalchemy import func
 from sqlalchemy.orm import Session
 
-from app.data.loader import seed_questions
+from app.data.question_index import get_question_index
 from app.data.questions import questions_for_mode
-from app.database import get_db
-from app.models import OtherResponse, Session as SessionModel, SelfResponse
+from app.database import get_thread_db, run_in_db_thread
+from app.models import Session as SessionModel
+from app.og.prerender import schedule_prerender
 from app.schemas import (
     AnswerItem,
     OtherSubmitRequest,
@@ -16,14 +16,22 @@ from app.schemas import (
     SelfSubmitRequest,
     SelfSubmitResponse,
 )
-from app.services.aggregator import recalculate_aggregate
-from app.services.scoring import ScoringError
+from app.services import answer_store
+from app.services.aggregator import (
+    load_rater_contribution,
+    mark_responses_changed,
+    rater_contribution,
+    update_aggregate_incrementally,
+)
+from app.services.recompute import aggregate_status, is_coalescing, schedule_recompute
+from app.services.scoring import ScoringError, compute_norms, norm_to_radar
+from app.services.session_meta import SessionMeta, invalidate_session_meta, lookup_session_meta
 from app.utils.problem_details import ProblemDetailsException
 
 router = APIRouter(prefix="/api", tags=["responses"])
 
 
-def ensure_session_active(session: SessionModel) -> None:
+def ensure_session_active(session: SessionModel | SessionMeta) -> None:
     expires_at = session.expires_at
     if expires_at.tzinfo is None:
         expires_at = expires_at.replace(tzinfo=timezone.utc)
@@ -79,7 +87,11 @@ def validate_answers(mode: str, answers: list[AnswerItem]) -> None:
 
 
 @router.post("/self/submit", response_model=SelfSubmitResponse)
-async def submit_self(payload: SelfSubmitRequest, db: Session = Depends(get_db)):
+async def submit_self(payload: SelfSubmitRequest, db: Session = Depends(get_thread_db)):
+    return await run_in_db_thread(_submit_self, db, payload, write=True)
+
+
+def _submit_self(db: Session, payload: SelfSubmitRequest) -> SelfSubmitResponse:
     session = db.get(SessionModel, payload.session_id)
     if session is None:
         raise ProblemDetailsException(
@@ -93,24 +105,19 @@ async def submit_self(payload: SelfSubmitRequest, db: Session = Depends(get_db))
 
     validate_answers(session.mode, payload.answers)
 
-    seed_questions(db)
-
     try:
-        db.query(SelfResponse).filter(SelfResponse.session_id == session.id).delete()
-
-        for answer in payload.answers:
-            db.add(
-                SelfResponse(
-                    session_id=session.id,
-                    question_id=answer.question_id,
-                    value=answer.value,
-                )
-            )
-
-        db.flush()
+        answers = [(answer.question_id, answer.value) for answer in payload.answers]
+        answer_store.save_self_answers(db, session.id, answers)
 
         try:
-            result = recalculate_aggregate(db, session)
+            lookup = get_question_index()
+            self_norm = compute_norms(answers, lookup)
+            if is_coalescing():
+                mark_responses_changed(db, session.id)
+            else:
+                update_aggregate_incrementally(
+                    db, session, self_norm=self_norm, lookup=lookup
+                )
         except ScoringError as exc:
             raise ProblemDetailsException(
                 status_code=400,
@@ -127,10 +134,15 @@ async def submit_self(payload: SelfSubmitRequest, db: Session = Depends(get_db))
         db.rollback()
         raise
 
+    if is_coalescing():
+        schedule_recompute(session.id)
+    else:
+        schedule_prerender(session.id)
+
     return SelfSubmitResponse(
         session_id=session.id,
-        self_norm=result.self_norm,
-        self_radar=result.radar_self,
+        self_norm=self_norm,
+        self_radar=norm_to_radar(self_norm),
     )
 
 
@@ -143,13 +155,13 @@ def build_rater_hash(invite_token: str, payload: OtherSubmitRequest) -> str:
 
 
 @router.post("/other/submit", response_model=OtherSubmitResponse, status_code=201)
-async def submit_other(payload: OtherSubmitRequest, db: Session = Depends(get_db)):
-    session = (
-        db.query(SessionModel)
-        .filter(SessionModel.invite_token == payload.invite_token)
-        .first()
-    )
-    if session is None:
+async def submit_other(payload: OtherSubmitRequest, db: Session = Depends(get_thread_db)):
+    return await run_in_db_thread(_submit_other, db, payload, write=True)
+
+
+def _submit_other(db: Session, payload: OtherSubmitRequest) -> OtherSubmitResponse:
+    meta = lookup_session_meta(db, payload.invite_token)
+    if meta is None:
         raise ProblemDetailsException(
             status_code=404,
             title="Invite Not Found",
@@ -157,28 +169,14 @@ async def submit_other(payload: OtherSubmitRequest, db: Session = Depends(get_db
             type_suffix="invite-not-found",
         )
 
-    ensure_session_active(session)
-
-    validate_answers(session.mode, payload.answers)
+    ensure_session_active(meta)
 
-    seed_questions(db)
+    validate_answers(meta.mode, payload.answers)
 
-    distinct_raters = (
-        db.query(func.count(func.distinct(OtherResponse.rater_hash)))
-        .filter(OtherResponse.session_id == session.id)
-        .scalar()
-        or 0
-    )
-    rater_hash = build_rater_hash(session.invite_token, payload)
-    already_exists = (
-        db.query(OtherResponse)
-        .filter(
-            OtherResponse.session_id == session.id,
-            OtherResponse.rater_hash == rater_hash,
-        )
-        .first()
-    )
-    if distinct_raters >= session.max_raters and not already_exists:
+    distinct_raters = answer_store.count_raters(db, meta.id)
+    rater_hash = build_rater_hash(meta.invite_token, payload)
+    already_exists = answer_store.rater_exists(db, meta.id, rater_hash)
+    if distinct_raters >= meta.max_raters and not already_exists:
         raise ProblemDetailsException(
             status_code=429,
             title="Capacity Reached",
@@ -186,27 +184,51 @@ async def submit_other(payload: OtherSubmitRequest, db: Session = Depends(get_db
             type_suffix="rate-limit",
         )
 
+    # The aggregate update writes through the ORM, so load the row itself.
+    session = db.get(SessionModel, meta.id)
+    if session is None:
+        # Deleted since its metadata was cached.
+        invalidate_session_meta(payload.invite_token)
+        raise ProblemDetailsException(
+            status_code=404,
+            title="Invite Not Found",
+            detail="초대 정보를 찾을 수 없습니다.",
+            type_suffix="invite-not-found",
+        )
+
     try:
-        db.query(OtherResponse).filter(
-            OtherResponse.session_id == session.id,
-            OtherResponse.rater_hash == rater_hash,
-        ).delete()
-
-        for answer in payload.answers:
-            db.add(
-                OtherResponse(
-                    session_id=session.id,
-                    rater_hash=rater_hash,
-                    question_id=answer.question_id,
-                    value=answer.value,
-                    relation_tag=payload.relation_tag,
-                )
+        answers = [(answer.question_id, answer.value) for answer in payload.answers]
+        if is_coalescing():
+            answer_store.save_rater_answers(
+                db, session.id, rater_hash, answers, payload.relation_tag
             )
+            mark_responses_changed(db, session.id)
+            respondents = distinct_raters + (0 if already_exists else 1)
+            db.commit()
+            schedule_recompute(session.id)
+            return OtherSubmitResponse(
+                session_id=session.id,
+                accepted=True,
+                respondents=respondents,
+                aggregate_status=aggregate_status(db, session.id),
+            )
+
+        lookup = get_question_index()
+        previous = (
+            load_rater_contribution(db, session.id, rater_hash, lookup)
+            if already_exists
+            else None
+        )
+        current = rater_contribution(answers, payload.relation_tag, lookup)
 
-        db.flush()
+        answer_store.save_rater_answers(
+            db, session.id, rater_hash, answers, payload.relation_tag
+        )
 
         try:
-            result = recalculate_aggregate(db, session)
+            result = update_aggregate_incrementally(
+                db, session, previous=previous, current=current, lookup=lookup
+            )
         except ScoringError as exc:
             raise ProblemDetailsException(
                 status_code=400,
@@ -223,6 +245,8 @@ async def submit_other(payload: OtherSubmitRequest, db: Session = Depends(get_db
         db.rollback()
         raise
 
+    schedule_prerender(session.id)
+
     return OtherSubmitResponse(
         session_id=session.id,
         accepted=True,
@@ -3,10 +3,12 @@ from statistics import fmean
 from fastapi import APIRouter, Depends, Response
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.database import get_thread_db, run_in_db_thread
 from app.models import Aggregate, Session as SessionModel
 from app.schemas import ResultDetail
-from app.services.aggregator import recalculate_aggregate
+from app.services.aggregator import load_aggregate
+from app.services.recompute import aggregate_status
+from app.services.session_meta import SessionMeta, lookup_session_meta
 from app.services.scoring import ScoringError, norm_to_radar
 from app.utils.problem_details import ProblemDetailsException
 from app.utils.privacy import apply_noindex_headers
@@ -34,9 +36,10 @@ PREVIEW_RESULT = ResultDetail(
 
 
 def _build_result_detail(
-    session: SessionModel,
+    session: SessionModel | SessionMeta,
     aggregate_result,
     publish_other: bool,
+    status: str = "fresh",
 ) -> ResultDetail:
     return ResultDetail(
         session_id=session.id,
@@ -50,14 +53,19 @@ def _build_result_detail(
         radar_self=aggregate_result.radar_self,
         radar_other=aggregate_result.radar_other if publish_other else None,
         unlocked=publish_other,
+        aggregate_status=status,
     )
 
 
 @router.get("/result/preview", response_model=ResultDetail)
 async def preview_result(
     response: Response,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_thread_db),
 ) -> ResultDetail:
+    return await run_in_db_thread(_preview_result, db, response)
+
+
+def _preview_result(db: Session, response: Response) -> ResultDetail:
     session = (
         db.query(SessionModel)
         .join(Aggregate, Aggregate.session_id == SessionModel.id)
@@ -70,7 +78,7 @@ async def preview_result(
         return PREVIEW_RESULT
 
     try:
-        aggregate_result = recalculate_aggregate(db, session)
+        aggregate_result = load_aggregate(db, session)
     except ScoringError as exc:
         raise ProblemDetailsException(
             status_code=503,
@@ -79,8 +87,6 @@ async def preview_result(
             type_suffix="preview-unavailable",
         ) from exc
 
-    db.commit()
-
     publish_other = session.mode == "couple" or (aggregate_result.n or 0) >= 3
 
     result_payload = _build_result_detail(session, aggregate_result, publish_other)
@@ -92,13 +98,13 @@ async def preview_result(
 async def fetch_result(
     invite_token: str,
     response: Response,
-    db: Session = Depends(get_db),
-):
-    session = (
-        db.query(SessionModel)
-        .filter(SessionModel.invite_token == invite_token)
-        .first()
-    )
+    db: Session = Depends(get_thread_db),
+) -> ResultDetail:
+    return await run_in_db_thread(_fetch_result, db, invite_token, response)
+
+
+def _fetch_result(db: Session, invite_token: str, response: Response) -> ResultDetail:
+    session = lookup_session_meta(db, invite_token)
     if session is None:
         raise ProblemDetailsException(
             status_code=404,
@@ -108,7 +114,7 @@ async def fetch_result(
         )
 
     try:
-        aggregate_result = recalculate_aggregate(db, session)
+        aggregate_result = load_aggregate(db, session)
     except ScoringError as exc:
         raise ProblemDetailsException(
             status_code=400,
@@ -117,11 +123,11 @@ async def fetch_result(
             type_suffix="scoring-error",
         ) from exc
 
-    db.commit()
-
     publish_other = session.mode == "couple" or (aggregate_result.n or 0) >= 3
 
-    result_payload = _build_result_detail(session, aggregate_result, publish_other)
+    result_payload = _build_result_detail(
+        session, aggregate_result, publish_other, aggregate_status(db, session.id)
+    )
 
     apply_noindex_headers(response)
 
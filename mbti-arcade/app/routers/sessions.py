@@ -2,11 +2,11 @@
 from sqlalchemy.orm import Session
 
 from app.core.config import compute_expiry, generate_invite_token, generate_session_id
-from app.data.loader import seed_questions
 from app.data.questions import questions_for_mode
 from app.database import get_db
 from app.models import Session as SessionModel, User
 from app.schemas import InviteUpdate, QuestionSchema, SessionCreate, SessionResponse
+from app.services.session_meta import invalidate_session_meta
 from app.utils.problem_details import ProblemDetailsException
 
 router = APIRouter(prefix="/api", tags=["sessions"])
@@ -14,8 +14,6 @@ router = APIRouter(prefix="/api", tags=["sessions"])
 
 @router.post("/sessions", response_model=SessionResponse, status_code=201)
 async def create_session(payload: SessionCreate, db: Session = Depends(get_db)):
-    seed_questions(db)
-
     owner = None
     if payload.owner_email:
         owner = db.query(User).filter(User.email == payload.owner_email).first()
@@ -42,6 +40,7 @@ async def create_session(payload: SessionCreate, db: Session = Depends(get_db)):
 
     db.add(session)
     db.commit()
+    invalidate_session_meta(invite_token)
 
     return SessionResponse(
         session_id=session_id,
@@ -72,6 +71,7 @@ async def update_invite(payload: InviteUpdate, db: Session = Depends(get_db)):
         session.is_anonymous = payload.anonymous
 
     db.commit()
+    invalidate_session_meta(session.invite_token)
 
     return SessionResponse(
         session_id=session.id,
@@ -1,7 +1,7 @@
 ﻿from __future__ import annotations
 
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Literal, Optional
 
 from pydantic import (
     BaseModel,
@@ -14,6 +14,9 @@ from pydantic import (
 
 from app.models import ParticipantRelation
 
+# "pending" while a coalesced recomputation has not caught up with submissions.
+AggregateStatus = Literal["fresh", "pending"]
+
 DIMENSIONS = ("EI", "SN", "TF", "JP")
 
 
@@ -96,6 +99,7 @@ class OtherSubmitResponse(BaseModel):
     session_id: str
     accepted: bool
     respondents: int
+    aggregate_status: AggregateStatus = "fresh"
 
 
 class ResultDetail(BaseModel):
@@ -110,6 +114,7 @@ class ResultDetail(BaseModel):
     radar_self: Dict[str, float]
     radar_other: Optional[Dict[str, float]]
     unlocked: bool
+    aggregate_status: AggregateStatus = "fresh"
 
 
 class ProblemDetails(BaseModel):
@@ -151,6 +156,7 @@ class ParticipantAnswerSubmitResponse(BaseModel):
     respondent_count: int
     unlocked: bool
     threshold: int
+    aggregate_status: AggregateStatus = "fresh"
 
 
 class ParticipantPreviewParticipant(BaseModel):
@@ -183,6 +189,7 @@ class ParticipantPreviewResponse(BaseModel):
     unlocked: bool
     relations: List[ParticipantPreviewRelation]
     participants: List[ParticipantPreviewParticipant]
+    aggregate_status: AggregateStatus = "fresh"
 
 
 class ParticipantReportAxis(BaseModel):
@@ -1,22 +1,27 @@
 from __future__ import annotations
 
-from collections import Counter, defaultdict
+from collections import defaultdict
+from datetime import datetime, timezone
 from statistics import fmean
-from typing import Dict, Iterable, List, NamedTuple, Tuple
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Tuple
 
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.models import (
     Aggregate,
+    AggregateState,
     OtherResponse,
     Participant,
     ParticipantRelation,
-    Question,
     RelationAggregate,
-    SelfResponse,
     Session as SessionModel,
 )
+from app.data.question_index import get_question_index
 from app.schemas import DIMENSIONS
+from app.services import answer_store, batch_scoring
+from app.services.bulk_writer import upsert_rows
 from app.services.scoring import (
     ScoringError,
     compute_gap_metrics,
@@ -74,11 +79,32 @@ class RelationAggregateSummary:
         return sum(item.respondent_count for item in self.relations)
 
 
+# Bump whenever scoring or aggregation changes what a recomputation stores;
+# scripts/reaggregate.py discards checkpoints written under another version.
+AGGREGATION_VERSION = "1"
 RELATION_MIN_RESPONDENTS = 3
+_RELATION_UPDATE_COLUMNS = (
+    "respondent_count",
+    "top_type",
+    "top_fraction",
+    "second_type",
+    "second_fraction",
+    "consensus",
+    "pgi",
+    "axes_payload",
+    "updated_at",
+)
+_M2_EPSILON = 1e-12
+_STATE_COLUMNS = (
+    "n",
+    "weight_total",
+    *(f"{dim.lower()}_{suffix}" for suffix in ("mean", "m2") for dim in DIMENSIONS),
+)
+_STATE_WRITE_ATTEMPTS = 5
 
 
-def build_question_lookup(questions: Iterable[Question]) -> Dict[int, Tuple[str, int]]:
-    return {question.id: (question.dim, question.sign) for question in questions}
+class AggregateStateConflict(RuntimeError):
+    """The running state kept changing underneath a compare-and-swap write."""
 
 
 def group_other_responses(responses: Iterable[OtherResponse]) -> Dict[str, List[OtherResponse]]:
@@ -88,57 +114,185 @@ def group_other_responses(responses: Iterable[OtherResponse]) -> Dict[str, List[
     return grouped
 
 
-def recalculate_aggregate(db: Session, session: SessionModel) -> AggregateResult:
-    questions = db.query(Question).all()
-    lookup = build_question_lookup(questions)
-
-    self_rows = (
-        db.query(SelfResponse)
-        .filter(SelfResponse.session_id == session.id)
-        
-        .all()
-    )
-    if not self_rows:
-        raise ScoringError("Self responses missing for session")
+class RaterContribution(NamedTuple):
+    norms: Dict[str, float]
+    weight: float
 
-    self_answers = [(row.question_id, row.value) for row in self_rows]
-    self_norm = compute_norms(self_answers, lookup)
-    radar_self = norm_to_radar(self_norm)
 
-    other_rows = (
-        db.query(OtherResponse)
-        .filter(OtherResponse.session_id == session.id)
-        .all()
-    )
-    grouped = group_other_responses(other_rows)
-
-    other_norms: List[Dict[str, float]] = []
-    weights: List[float] = []
-    for rater_hash, rows in grouped.items():
-        answers = [(row.question_id, row.value) for row in rows]
-        relation_tag = rows[0].relation_tag if rows else None
-        try:
-            norms = compute_norms(answers, lookup)
-        except ScoringError:
-            continue
-        other_norms.append(norms)
-        weights.append(weight_for_relation(relation_tag))
-
-    agg_other = None
-    radar_other = None
-    gap = None
-    sigma = None
-    gap_score = None
-
-    if other_norms:
-        agg_other, sigma, gap, gap_score = compute_gap_metrics(
-            self_norm, other_norms, weights
-        )
-        radar_other = norm_to_radar(agg_other)
+def rater_contribution(
+    answers: Iterable[tuple[int, int]],
+    relation_tag: str | None,
+    lookup: Mapping[int, Tuple[str, int]],
+) -> RaterContribution | None:
+    """Score one rater, mirroring the skip-on-error rule of the full rebuild."""
 
+    try:
+        norms = compute_norms(answers, lookup)
+    except ScoringError:
+        return None
+    return RaterContribution(norms=norms, weight=weight_for_relation(relation_tag))
+
+
+def load_rater_contribution(
+    db: Session,
+    session_id: str,
+    rater_hash: str,
+    lookup: Mapping[int, Tuple[str, int]],
+) -> RaterContribution | None:
+    stored = answer_store.load_rater_answers(db, session_id, rater_hash)
+    if stored is None or not stored.answers:
+        return None
+    return rater_contribution(stored.answers, stored.relation_tag, lookup)
+
+
+def _reset_state(state: AggregateState) -> None:
+    # A reset rewrites every moment, so in-flight incremental writes must retry.
+    state.version = (state.version or 0) + 1
+    state.n = 0
+    state.weight_total = 0.0
+    for dim in DIMENSIONS:
+        key = dim.lower()
+        setattr(state, f"{key}_mean", 0.0)
+        setattr(state, f"{key}_m2", 0.0)
+
+
+def _state_add(state: AggregateState, contribution: RaterContribution) -> None:
+    weight = contribution.weight
+    total = (state.weight_total or 0.0) + weight
+    for dim in DIMENSIONS:
+        key = dim.lower()
+        mean = getattr(state, f"{key}_mean") or 0.0
+        m2 = getattr(state, f"{key}_m2") or 0.0
+        value = contribution.norms[dim]
+        delta = value - mean
+        new_mean = mean + (weight / total) * delta
+        setattr(state, f"{key}_mean", new_mean)
+        setattr(state, f"{key}_m2", m2 + weight * delta * (value - new_mean))
+    state.weight_total = total
+    state.n = (state.n or 0) + 1
+
+
+def _state_remove(state: AggregateState, contribution: RaterContribution) -> None:
+    weight = contribution.weight
+    remaining = (state.weight_total or 0.0) - weight
+    if (state.n or 0) <= 1 or remaining <= 1e-12:
+        _reset_state(state)
+        return
+    for dim in DIMENSIONS:
+        key = dim.lower()
+        mean = getattr(state, f"{key}_mean") or 0.0
+        m2 = getattr(state, f"{key}_m2") or 0.0
+        value = contribution.norms[dim]
+        new_mean = (state.weight_total * mean - weight * value) / remaining
+        setattr(state, f"{key}_mean", new_mean)
+        new_m2 = m2 - weight * (value - new_mean) * (value - mean)
+        # Norms live in [-1, 1], so anything this small is cancellation residue.
+        setattr(state, f"{key}_m2", new_m2 if new_m2 > _M2_EPSILON else 0.0)
+    state.weight_total = remaining
+    state.n -= 1
+
+
+def apply_rater_change(
+    state: AggregateState,
+    previous: RaterContribution | None,
+    current: RaterContribution | None,
+) -> None:
+    """Replace one rater's contribution in O(1) per dimension."""
+
+    if previous is not None:
+        _state_remove(state, previous)
+    if current is not None:
+        _state_add(state, current)
+
+
+def _stored_moments(
+    db: Session, session_id: str, lookup: Mapping[int, Tuple[str, int]]
+) -> AggregateState:
+    """Unsaved state holding the moments of every rater stored for the session."""
+
+    working = AggregateState(session_id=session_id)
+    _reset_state(working)
+    for rater in answer_store.load_session_raters(db, session_id):
+        contribution = rater_contribution(rater.answers, rater.relation_tag, lookup)
+        if contribution is not None:
+            _state_add(working, contribution)
+    return working
+
+
+def _apply_rater_change_checked(
+    db: Session,
+    state: AggregateState,
+    previous: RaterContribution | None,
+    current: RaterContribution | None,
+    lookup: Mapping[int, Tuple[str, int]] | None = None,
+) -> None:
+    """Write one rater change only if nobody has updated ``state`` since it was read.
+
+    Two submits to the same session can both read the same moments; a plain
+    read-modify-write would then drop one rater for good. The UPDATE is
+    conditioned on the version that was read. On a miss the delta cannot be
+    reapplied: if the other writer changed the same rater, ``previous`` is no
+    longer what the moments hold, and this transaction has already replaced
+    that rater's stored answers. The retry rebuilds the moments from the
+    stored answers instead, which include both writes.
+    """
+
+    for attempt in range(_STATE_WRITE_ATTEMPTS):
+        if attempt == 0:
+            working = AggregateState(**{column: getattr(state, column) for column in _STATE_COLUMNS})
+            apply_rater_change(working, previous, current)
+        else:
+            working = _stored_moments(db, state.session_id, lookup or get_question_index())
+        values = {column: getattr(working, column) for column in _STATE_COLUMNS}
+        values["version"] = state.version + 1
+        written = db.execute(
+            update(AggregateState)
+            .where(
+                AggregateState.session_id == state.session_id,
+                AggregateState.version == state.version,
+            )
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        if written.rowcount == 1:
+            for column, value in values.items():
+                set_committed_value(state, column, value)
+            return
+        db.refresh(state)
+    raise AggregateStateConflict(f"Aggregate state for {state.session_id} kept changing")
+
+
+def _state_metrics(
+    state: AggregateState, self_norm: Dict[str, float]
+) -> tuple[Dict[str, float], Dict[str, float], Dict[str, float], float] | None:
+    if not state.n or not state.weight_total:
+        return None
+    agg_other: Dict[str, float] = {}
+    sigma: Dict[str, float] = {}
+    gap: Dict[str, float] = {}
+    for dim in DIMENSIONS:
+        key = dim.lower()
+        mean = getattr(state, f"{key}_mean")
+        agg_other[dim] = mean
+        sigma[dim] = (max(getattr(state, f"{key}_m2"), 0.0) / state.weight_total) ** 0.5
+        gap[dim] = mean - self_norm[dim]
+    gap_score = fmean(abs(gap[dim]) for dim in DIMENSIONS) * 100
+    return agg_other, sigma, gap, gap_score
+
+
+def _store_aggregate(
+    db: Session,
+    session: SessionModel,
+    self_norm: Dict[str, float],
+    agg_other: Dict[str, float] | None,
+    sigma: Dict[str, float] | None,
+    gap: Dict[str, float] | None,
+    gap_score: float | None,
+    n: int,
+) -> AggregateResult:
     aggregate = db.get(Aggregate, session.id)
     if aggregate is None:
-        aggregate = Aggregate(session_id=session.id)
+        aggregate = Aggregate(session_id=session.id, responses_version=0)
         db.add(aggregate)
 
     aggregate.ei_self = self_norm["EI"]
@@ -159,7 +313,7 @@ def recalculate_aggregate(db: Session, session: SessionModel) -> AggregateResult
         aggregate.sn_sigma = sigma["SN"]
         aggregate.tf_sigma = sigma["TF"]
         aggregate.jp_sigma = sigma["JP"]
-        aggregate.n = len(other_norms)
+        aggregate.n = n
         aggregate.gap_score = gap_score
     else:
         aggregate.ei_other = aggregate.sn_other = aggregate.tf_other = aggregate.jp_other = None
@@ -168,24 +322,247 @@ def recalculate_aggregate(db: Session, session: SessionModel) -> AggregateResult
         aggregate.n = 0
         aggregate.gap_score = None
 
+    aggregate.computed_version = aggregate.responses_version or 0
     db.flush()
 
+    metrics = None
+    if agg_other is not None and gap is not None and sigma is not None:
+        metrics = (agg_other, sigma, gap, gap_score)
+    return _build_result(session, self_norm, metrics, aggregate.n)
+
+
+def _get_or_create_state(db: Session, session_id: str) -> AggregateState:
+    state = db.get(AggregateState, session_id)
+    if state is None:
+        state = AggregateState(session_id=session_id)
+        _reset_state(state)
+        db.add(state)
+    return state
+
+
+def rebuild_aggregate_state(
+    db: Session,
+    session: SessionModel,
+    lookup: Mapping[int, Tuple[str, int]] | None = None,
+) -> AggregateState:
+    """Rebuild the running moments from every stored rater (O(raters x questions))."""
+
+    if lookup is None:
+        lookup = get_question_index()
+    working = _stored_moments(db, session.id, lookup)
+    state = _get_or_create_state(db, session.id)
+    _reset_state(state)
+    for column in _STATE_COLUMNS:
+        setattr(state, column, getattr(working, column))
+    return state
+
+
+def update_aggregate_incrementally(
+    db: Session,
+    session: SessionModel,
+    *,
+    previous: RaterContribution | None = None,
+    current: RaterContribution | None = None,
+    self_norm: Dict[str, float] | None = None,
+    lookup: Mapping[int, Tuple[str, int]] | None = None,
+) -> AggregateResult:
+    """Apply one rater change (or a new self norm) without rescanning the session.
+
+    Callers must flush the rater's new rows first: when no state row exists yet
+    (legacy sessions) the state is rebuilt once from the stored responses and
+    the ``previous``/``current`` delta is already reflected in it.
+    """
+
+    state = db.get(AggregateState, session.id)
+    if state is None:
+        state = rebuild_aggregate_state(db, session, lookup)
+    else:
+        _apply_rater_change_checked(db, state, previous, current, lookup)
+
+    if self_norm is None:
+        if lookup is None:
+            lookup = get_question_index()
+        self_norm = load_self_norm(db, session, lookup)
+    if self_norm is None:
+        raise ScoringError("Self responses missing for session")
+
+    mark_responses_changed(db, session.id)
+    metrics = _state_metrics(state, self_norm)
+    if metrics is None:
+        return _store_aggregate(db, session, self_norm, None, None, None, None, 0)
+    agg_other, sigma, gap, gap_score = metrics
+    return _store_aggregate(db, session, self_norm, agg_other, sigma, gap, gap_score, state.n)
+
+
+def remove_rater(db: Session, session: SessionModel, rater_hash: str) -> AggregateResult:
+    """Delete one rater's responses and retract them from the running state."""
+
+    lookup = get_question_index()
+    previous = load_rater_contribution(db, session.id, rater_hash, lookup)
+    answer_store.delete_rater_answers(db, session.id, rater_hash)
+    return update_aggregate_incrementally(db, session, previous=previous, lookup=lookup)
+
+
+_Metrics = Tuple[Dict[str, float], Dict[str, float], Dict[str, float], float]
+
+
+class _SessionScores(NamedTuple):
+    self_norm: Dict[str, float]
+    contributions: List[RaterContribution]
+    metrics: _Metrics | None
+
+
+def _score_session(db: Session, session: SessionModel) -> _SessionScores:
+    lookup = get_question_index()
+
+    self_answers = answer_store.load_self_answers(db, session.id)
+    if not self_answers:
+        raise ScoringError("Self responses missing for session")
+    self_norm = compute_norms(self_answers, lookup)
+
+    raters = answer_store.load_session_raters(db, session.id)
+
+    if batch_scoring.NUMPY_AVAILABLE and raters:
+        batch = batch_scoring.score_session(
+            self_norm,
+            [rater.answers for rater in raters],
+            [weight_for_relation(rater.relation_tag) for rater in raters],
+            batch_scoring.question_weights(lookup),
+        )
+        valid_norms = [norms for norms in batch.scores.norm_dicts() if norms is not None]
+        contributions = [
+            RaterContribution(norms=norms, weight=weight)
+            for norms, weight in zip(valid_norms, batch.rater_weights.tolist())
+        ]
+        metrics = None
+        if batch.other_norm is not None:
+            metrics = (batch.other_norm, batch.sigma, batch.gap, batch.gap_score)
+        return _SessionScores(self_norm, contributions, metrics)
+
+    contributions = []
+    for rater in raters:
+        contribution = rater_contribution(rater.answers, rater.relation_tag, lookup)
+        if contribution is not None:
+            contributions.append(contribution)
+
+    if not contributions:
+        return _SessionScores(self_norm, contributions, None)
+
+    metrics = compute_gap_metrics(
+        self_norm,
+        [item.norms for item in contributions],
+        [item.weight for item in contributions],
+    )
+    return _SessionScores(self_norm, contributions, metrics)
+
+
+def _build_result(
+    session: SessionModel,
+    self_norm: Dict[str, float],
+    metrics: _Metrics | None,
+    n: int,
+) -> AggregateResult:
+    if metrics is None:
+        return AggregateResult(
+            session_id=session.id,
+            mode=session.mode,
+            self_norm=self_norm,
+            radar_self=norm_to_radar(self_norm),
+            other_norm=None,
+            radar_other=None,
+            gap=None,
+            sigma=None,
+            n=0,
+            gap_score=None,
+        )
+    agg_other, sigma, gap, gap_score = metrics
     return AggregateResult(
         session_id=session.id,
         mode=session.mode,
         self_norm=self_norm,
-        radar_self=radar_self,
+        radar_self=norm_to_radar(self_norm),
         other_norm=agg_other,
-        radar_other=radar_other,
+        radar_other=norm_to_radar(agg_other),
         gap=gap,
         sigma=sigma,
-        n=len(other_norms),
+        n=n,
         gap_score=gap_score,
     )
 
 
+def compute_aggregate(db: Session, session: SessionModel) -> AggregateResult:
+    """Full recomputation from stored rows without writing anything."""
+
+    scores = _score_session(db, session)
+    return _build_result(session, scores.self_norm, scores.metrics, len(scores.contributions))
+
+
+def recalculate_aggregate(db: Session, session: SessionModel) -> AggregateResult:
+    """Full rebuild from stored rows; also resynchronises the incremental state."""
+
+    scores = _score_session(db, session)
+
+    state = _get_or_create_state(db, session.id)
+    _reset_state(state)
+    for contribution in scores.contributions:
+        _state_add(state, contribution)
+
+    if scores.metrics is None:
+        return _store_aggregate(db, session, scores.self_norm, None, None, None, None, 0)
+    agg_other, sigma, gap, gap_score = scores.metrics
+    return _store_aggregate(
+        db,
+        session,
+        scores.self_norm,
+        agg_other,
+        sigma,
+        gap,
+        gap_score,
+        len(scores.contributions),
+    )
+
+
+def mark_responses_changed(db: Session, session_id: str) -> None:
+    """Flag the stored aggregate as stale after a write that skips recomputation."""
+
+    aggregate = db.get(Aggregate, session_id)
+    if aggregate is not None:
+        aggregate.responses_version = (aggregate.responses_version or 0) + 1
+
+
+def is_aggregate_fresh(aggregate: Aggregate) -> bool:
+    return (aggregate.computed_version or 0) == (aggregate.responses_version or 0) and all(
+        getattr(aggregate, f"{dim.lower()}_self") is not None for dim in DIMENSIONS
+    )
+
+
+def aggregate_result_from_row(session: SessionModel, aggregate: Aggregate) -> AggregateResult:
+    self_norm = {dim: getattr(aggregate, f"{dim.lower()}_self") for dim in DIMENSIONS}
+    metrics = None
+    if aggregate.n and aggregate.ei_other is not None:
+        metrics = (
+            {dim: getattr(aggregate, f"{dim.lower()}_other") for dim in DIMENSIONS},
+            {dim: getattr(aggregate, f"{dim.lower()}_sigma") for dim in DIMENSIONS},
+            {dim: getattr(aggregate, f"{dim.lower()}_gap") for dim in DIMENSIONS},
+            aggregate.gap_score,
+        )
+    return _build_result(session, self_norm, metrics, aggregate.n or 0)
+
+
+def load_aggregate(db: Session, session: SessionModel) -> AggregateResult:
+    """Read path: serve the persisted row, recomputing in memory only when stale.
+
+    Never writes, so GET handlers do not take the SQLite write lock.
+    """
+
+    aggregate = db.get(Aggregate, session.id)
+    if aggregate is not None and is_aggregate_fresh(aggregate):
+        return aggregate_result_from_row(session, aggregate)
+    return compute_aggregate(db, session)
+
+
 def load_self_norm(
-    db: Session, session: SessionModel, lookup: Dict[int, Tuple[str, int]]
+    db: Session, session: SessionModel, lookup: Mapping[int, Tuple[str, int]]
 ) -> Dict[str, float] | None:
     aggregate = db.get(Aggregate, session.id)
     if aggregate and all(
@@ -198,121 +575,160 @@ def load_self_norm(
             "JP": aggregate.jp_self,
         }
 
-    rows = (
-        db.query(SelfResponse)
-        .filter(SelfResponse.session_id == session.id)
-        .all()
-    )
-    if not rows:
+    answers = answer_store.load_self_answers(db, session.id)
+    if not answers:
         return None
 
-    answers = [(row.question_id, row.value) for row in rows]
     try:
         return compute_norms(answers, lookup)
     except ScoringError:
         return None
 
 
-def _average_axes(payloads: List[Dict[str, float]]) -> Dict[str, float]:
-    return {
-        dim: round(fmean(item.get(dim, 0.0) for item in payloads), 6)
-        for dim in DIMENSIONS
-    }
+MBTI_TYPES: Tuple[str, ...] = tuple(
+    ei + sn + tf + jp for ei in "EI" for sn in "SN" for tf in "TF" for jp in "JP"
+)
+_TYPE_SLOTS = {mbti: slot for slot, mbti in enumerate(MBTI_TYPES)}
+
+
+class _RelationTally:
+    """Per-relation accumulator: respondent count, axis values, 16 type slots."""
+
+    __slots__ = ("respondents", "axes", "type_counts", "first_seen", "distinct_types")
+
+    def __init__(self) -> None:
+        self.respondents = 0
+        self.axes: Tuple[List[float], ...] = tuple([] for _ in DIMENSIONS)
+        self.type_counts = [0] * len(MBTI_TYPES)
+        self.first_seen = [0] * len(MBTI_TYPES)
+        self.distinct_types = 0
+
+    def add(self, perceived_type: str | None, axes_payload: Dict[str, float] | None) -> None:
+        self.respondents += 1
+        if axes_payload:
+            for values, dim in zip(self.axes, DIMENSIONS):
+                values.append(axes_payload.get(dim, 0.0))
+        slot = _TYPE_SLOTS.get(perceived_type) if perceived_type else None
+        if slot is not None:
+            if self.type_counts[slot] == 0:
+                self.first_seen[slot] = self.distinct_types
+                self.distinct_types += 1
+            self.type_counts[slot] += 1
+
+    def top_types(self) -> List[Tuple[str, int]]:
+        # Highest count first, ties broken by first appearance (Counter.most_common).
+        ranked = sorted(
+            (slot for slot, count in enumerate(self.type_counts) if count),
+            key=lambda slot: (-self.type_counts[slot], self.first_seen[slot]),
+        )
+        return [(MBTI_TYPES[slot], self.type_counts[slot]) for slot in ranked[:2]]
+
+
+def _relation_result(
+    relation: ParticipantRelation,
+    tally: _RelationTally,
+    self_norm: Dict[str, float] | None,
+) -> RelationAggregateResult:
+    respondent_count = tally.respondents
+    axes_payload = None
+    top_type = None
+    top_fraction = None
+    second_type = None
+    second_fraction = None
+    consensus = None
+    pgi = None
+
+    if respondent_count >= RELATION_MIN_RESPONDENTS and tally.axes[0]:
+        axes_payload = {
+            dim: round(fmean(values), 6) for values, dim in zip(tally.axes, DIMENSIONS)
+        }
+        most_common = tally.top_types()
+        if most_common:
+            top_type, top_count = most_common[0]
+            top_fraction = round(top_count / respondent_count, 6)
+            if len(most_common) > 1:
+                second_type, second_count = most_common[1]
+                second_fraction = round(second_count / respondent_count, 6)
+            if second_fraction is None:
+                consensus = top_fraction
+            else:
+                consensus = round(top_fraction - second_fraction, 6)
+
+        if self_norm is not None:
+            gaps = [abs(axes_payload[dim] - self_norm[dim]) for dim in DIMENSIONS]
+            pgi = round(fmean(gaps) * 100, 6)
+
+    return RelationAggregateResult(
+        relation=relation,
+        respondent_count=respondent_count,
+        top_type=top_type,
+        top_fraction=top_fraction,
+        second_type=second_type,
+        second_fraction=second_fraction,
+        consensus=consensus,
+        pgi=pgi,
+        axes_payload=axes_payload,
+    )
+
 
+def compute_relation_aggregates(session_id: str, db: Session) -> RelationAggregateSummary:
+    """Relation summaries from one participant query, without writing."""
 
-def recalculate_relation_aggregates(session_id: str, db: Session) -> RelationAggregateSummary:
     session = db.get(SessionModel, session_id)
     if session is None:
         return RelationAggregateSummary(session_id=session_id, relations=[])
 
-    questions = db.query(Question).all()
-    lookup = build_question_lookup(questions)
-    self_norm = load_self_norm(db, session, lookup)
+    self_norm = load_self_norm(db, session, get_question_index())
 
-    participants = (
-        db.query(Participant)
-        .filter(Participant.session_id == session_id)
-        .all()
-    )
-
-    relations_map: Dict[ParticipantRelation, List[Participant]] = defaultdict(list)
-    for participant in participants:
-        relations_map[participant.relation].append(participant)
-
-    results: List[RelationAggregateResult] = []
-
-    for relation, members in relations_map.items():
-        submitted = [item for item in members if item.answers_submitted_at is not None]
-        respondent_count = len(submitted)
-
-        axes_payload = None
-        top_type = None
-        top_fraction = None
-        second_type = None
-        second_fraction = None
-        consensus = None
-        pgi = None
-
-        axes_candidates = [item.axes_payload for item in submitted if item.axes_payload]
-        if respondent_count >= RELATION_MIN_RESPONDENTS and axes_candidates:
-            axes_payload = _average_axes(axes_candidates)
-            type_counts = Counter(
-                item.perceived_type for item in submitted if item.perceived_type
-            )
-            if type_counts:
-                most_common = type_counts.most_common(2)
-                top_type, top_count = most_common[0]
-                top_fraction = round(top_count / respondent_count, 6)
-                if len(most_common) > 1:
-                    second_type, second_count = most_common[1]
-                    second_fraction = round(second_count / respondent_count, 6)
-                if second_fraction is None:
-                    consensus = top_fraction
-                else:
-                    consensus = round(top_fraction - second_fraction, 6)
-
-            if self_norm is not None:
-                gaps = [abs(axes_payload[dim] - self_norm[dim]) for dim in DIMENSIONS]
-                pgi = round(fmean(gaps) * 100, 6)
-
-        record = (
-            db.query(RelationAggregate)
-            .filter(
-                RelationAggregate.session_id == session_id,
-                RelationAggregate.relation == relation,
-            )
-            .first()
-        )
-        if record is None:
-            record = RelationAggregate(session_id=session_id, relation=relation)
-            db.add(record)
-
-        record.respondent_count = respondent_count
-        record.top_type = top_type
-        record.top_fraction = top_fraction
-        record.second_type = second_type
-        record.second_fraction = second_fraction
-        record.consensus = consensus
-        record.pgi = pgi
-        record.axes_payload = axes_payload
-
-        results.append(
-            RelationAggregateResult(
-                relation=relation,
-                respondent_count=respondent_count,
-                top_type=top_type,
-                top_fraction=top_fraction,
-                second_type=second_type,
-                second_fraction=second_fraction,
-                consensus=consensus,
-                pgi=pgi,
-                axes_payload=axes_payload,
-            )
+    rows = db.execute(
+        select(
+            Participant.relation,
+            Participant.answers_submitted_at.is_not(None),
+            Participant.perceived_type,
+            Participant.axes_payload,
         )
+        .where(Participant.session_id == session_id)
+        .order_by(Participant.id)
+    )
 
-    db.flush()
-
+    tallies: Dict[ParticipantRelation, _RelationTally] = {}
+    for relation, submitted, perceived_type, axes_payload in rows:
+        tally = tallies.get(relation)
+        if tally is None:
+            tally = tallies[relation] = _RelationTally()
+        if submitted:
+            tally.add(perceived_type, axes_payload)
+
+    results = [
+        _relation_result(relation, tally, self_norm) for relation, tally in tallies.items()
+    ]
     # Ensure deterministic ordering for callers/tests.
     results.sort(key=lambda item: item.relation.value)
 
     return RelationAggregateSummary(session_id=session_id, relations=results)
+
+
+def recalculate_relation_aggregates(session_id: str, db: Session) -> RelationAggregateSummary:
+    """Recompute relation summaries and upsert every relation row in one statement."""
+
+    summary = compute_relation_aggregates(session_id, db)
+    now = datetime.now(timezone.utc)
+    upsert_rows(
+        db,
+        RelationAggregate,
+        [
+            {
+                "session_id": session_id,
+                "created_at": now,
+                "updated_at": now,
+                **item._asdict(),
+            }
+            for item in summary.relations
+        ],
+        ("session_id", "relation"),
+        _RELATION_UPDATE_COLUMNS,
+    )
+    for record in db.identity_map.values():
+        if isinstance(record, RelationAggregate):
+            db.expire(record)
+    return summary
@@ -0,0 +1,435 @@
+"""Respondent answer persistence behind ``ANSWER_STORAGE_MODE``.
+
+``rows``
+    One row per (respondent, question) in ``responses_self``,
+    ``responses_other`` and ``participant_answers`` (the original layout).
+    Packs are neither read nor written.
+``dual``
+    The migration step in either direction: write rows and
+    :class:`~app.models.AnswerPack` rows, read packs first and fall back to
+    rows for respondents without one.
+``packed``
+    Write and read packs only.
+
+Moving to ``packed`` goes through ``dual`` and ``scripts/pack_answers.py``;
+moving back goes through ``dual`` and ``scripts/pack_answers.py --unpack``,
+which turns packs back into rows and deletes them.
+
+A pack is one byte per question ordinal of the compiled question index, so
+loading a session's answers is a single primary-key range read.
+"""
+
+from __future__ import annotations
+
+import json
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, NamedTuple, Sequence, Tuple
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import Session
+
+from app import settings
+from app.data.question_index import QuestionIndex, get_question_index
+from app.models import (
+    AnswerPack,
+    OtherResponse,
+    ParticipantAnswer,
+    QuestionnaireVersion,
+    SelfResponse,
+)
+from app.services.bulk_writer import replace_answers, upsert_rows
+
+SELF_OWNER = "self"
+
+_PACK_UPDATE_COLUMNS = (
+    "participant_id",
+    "relation_tag",
+    "questionnaire_version",
+    "answer_values",
+    "updated_at",
+)
+
+# question_ids by questionnaire version; versions are immutable.
+_VERSION_IDS: Dict[str, Tuple[int, ...]] = {}
+
+
+class RaterAnswers(NamedTuple):
+    rater_hash: str
+    answers: List[Tuple[int, int]]
+    relation_tag: str | None
+    participant_id: int | None
+
+
+def _mode() -> str:
+    return settings.ANSWER_STORAGE_MODE
+
+
+def _uses_rows() -> bool:
+    return _mode() in ("rows", "dual")
+
+
+def _uses_packs() -> bool:
+    return _mode() in ("dual", "packed")
+
+
+def encode_answers(answers: Iterable[Tuple[int, int]], index: QuestionIndex) -> bytes:
+    """Pack ``(question_id, value)`` pairs into bytes ordered by ``index``."""
+
+    packed = bytearray(len(index))
+    for question_id, value in answers:
+        if question_id not in index:
+            raise ValueError(f"Unknown question_id={question_id}")
+        if value < 1 or value > 5:
+            raise ValueError(f"Answer value must be 1..5 (question_id={question_id})")
+        packed[index.ordinals[question_id]] = value
+    # Unanswered trailing questions (other modes' sections) are implicit.
+    return bytes(packed.rstrip(b"\x00"))
+
+
+def decode_answers(blob: bytes, question_ids: Sequence[int]) -> List[Tuple[int, int]]:
+    if len(blob) > len(question_ids):
+        raise ValueError("Answer pack is longer than its questionnaire version")
+    return [
+        (question_ids[ordinal], value) for ordinal, value in enumerate(blob) if value
+    ]
+
+
+def _question_ids_for(db: Session, version: str) -> Tuple[int, ...]:
+    question_ids = _VERSION_IDS.get(version)
+    if question_ids is None:
+        index = get_question_index()
+        if version == index.content_hash:
+            question_ids = index.question_ids
+        else:
+            # Registered by app.data.loader whenever a questionnaire is seeded.
+            record = db.get(QuestionnaireVersion, version)
+            if record is None:
+                raise LookupError(f"Unknown questionnaire version {version}")
+            question_ids = tuple(json.loads(record.question_ids))
+        _VERSION_IDS[version] = question_ids
+    return question_ids
+
+
+def _write_pack(
+    db: Session,
+    session_id: str,
+    owner: str,
+    answers: Sequence[Tuple[int, int]],
+    relation_tag: str | None = None,
+    participant_id: int | None = None,
+) -> None:
+    index = get_question_index()
+    now = datetime.now(timezone.utc)
+    upsert_rows(
+        db,
+        AnswerPack,
+        [
+            {
+                "session_id": session_id,
+                "owner": owner,
+                "participant_id": participant_id,
+                "relation_tag": relation_tag,
+                "questionnaire_version": index.content_hash,
+                "answer_values": encode_answers(answers, index),
+                "created_at": now,
+                "updated_at": now,
+            }
+        ],
+        ("session_id", "owner"),
+        _PACK_UPDATE_COLUMNS,
+    )
+
+
+def _drop_pack(db: Session, session_id: str, owner: str) -> None:
+    db.execute(
+        delete(AnswerPack).where(AnswerPack.session_id == session_id, AnswerPack.owner == owner)
+    )
+
+
+def _write_rater_rows(
+    db: Session,
+    session_id: str,
+    rater_hash: str,
+    answers: Sequence[Tuple[int, int]],
+    relation_tag: str | None,
+    participant_id: int | None,
+) -> None:
+    extra: Dict[str, object] = {"relation_tag": relation_tag}
+    if participant_id is not None:
+        extra["participant_id"] = participant_id
+        replace_answers(db, ParticipantAnswer, {"participant_id": participant_id}, answers)
+    replace_answers(
+        db,
+        OtherResponse,
+        {"session_id": session_id, "rater_hash": rater_hash},
+        answers,
+        extra=extra,
+    )
+
+
+def save_self_answers(db: Session, session_id: str, answers: Sequence[Tuple[int, int]]) -> None:
+    if _uses_rows():
+        replace_answers(db, SelfResponse, {"session_id": session_id}, answers)
+    if _uses_packs():
+        _write_pack(db, session_id, SELF_OWNER, answers)
+
+
+def save_rater_answers(
+    db: Session,
+    session_id: str,
+    rater_hash: str,
+    answers: Sequence[Tuple[int, int]],
+    relation_tag: str | None,
+    participant_id: int | None = None,
+) -> None:
+    if _uses_rows():
+        _write_rater_rows(db, session_id, rater_hash, answers, relation_tag, participant_id)
+    if _uses_packs():
+        _write_pack(db, session_id, rater_hash, answers, relation_tag, participant_id)
+
+
+def delete_rater_answers(db: Session, session_id: str, rater_hash: str) -> None:
+    # Rows go in every mode: under packed they are leftovers from before the
+    # conversion, and dual would read them again after a rollback.
+    db.execute(
+        delete(OtherResponse).where(
+            OtherResponse.session_id == session_id,
+            OtherResponse.rater_hash == rater_hash,
+        )
+    )
+    if _uses_packs():
+        _drop_pack(db, session_id, rater_hash)
+
+
+def rekey_rater_pack(
+    db: Session,
+    session_id: str,
+    rater_hash: str,
+    new_rater_hash: str,
+    participant_id: int | None,
+) -> None:
+    """Move a rater's pack to ``new_rater_hash`` (participant backfill)."""
+
+    db.execute(
+        delete(AnswerPack).where(
+            AnswerPack.session_id == session_id,
+            AnswerPack.owner == new_rater_hash,
+        )
+    )
+    db.execute(
+        update(AnswerPack)
+        .where(AnswerPack.session_id == session_id, AnswerPack.owner == rater_hash)
+        .values(owner=new_rater_hash, participant_id=participant_id)
+    )
+
+
+def _load_packs(db: Session, session_id: str, *conditions) -> list:
+    return list(
+        db.execute(
+            select(
+                AnswerPack.owner,
+                AnswerPack.participant_id,
+                AnswerPack.relation_tag,
+                AnswerPack.questionnaire_version,
+                AnswerPack.answer_values,
+            ).where(AnswerPack.session_id == session_id, *conditions)
+        )
+    )
+
+
+def _unpack(db: Session, pack) -> RaterAnswers:
+    return RaterAnswers(
+        rater_hash=pack.owner,
+        answers=decode_answers(pack.answer_values, _question_ids_for(db, pack.questionnaire_version)),
+        relation_tag=pack.relation_tag,
+        participant_id=pack.participant_id,
+    )
+
+
+def load_self_answers(db: Session, session_id: str) -> List[Tuple[int, int]]:
+    if _uses_packs():
+        packs = _load_packs(db, session_id, AnswerPack.owner == SELF_OWNER)
+        if packs:
+            return _unpack(db, packs[0]).answers
+        if not _uses_rows():
+            return []
+    return [
+        (question_id, value)
+        for question_id, value in db.execute(
+            select(SelfResponse.question_id, SelfResponse.value).where(
+                SelfResponse.session_id == session_id
+            )
+        )
+    ]
+
+
+def _group_rows(rows) -> Dict[str, RaterAnswers]:
+    grouped: Dict[str, RaterAnswers] = {}
+    for rater_hash, question_id, value, relation_tag, participant_id in rows:
+        entry = grouped.get(rater_hash)
+        if entry is None:
+            entry = grouped[rater_hash] = RaterAnswers(
+                rater_hash, [], relation_tag, participant_id
+            )
+        entry.answers.append((question_id, value))
+    return grouped
+
+
+def _row_columns():
+    return select(
+        OtherResponse.rater_hash,
+        OtherResponse.question_id,
+        OtherResponse.value,
+        OtherResponse.relation_tag,
+        OtherResponse.participant_id,
+    )
+
+
+def load_rater_answers(db: Session, session_id: str, rater_hash: str) -> RaterAnswers | None:
+    if _uses_packs():
+        packs = _load_packs(db, session_id, AnswerPack.owner == rater_hash)
+        if packs:
+            return _unpack(db, packs[0])
+        if not _uses_rows():
+            return None
+    grouped = _group_rows(
+        db.execute(
+            _row_columns().where(
+                OtherResponse.session_id == session_id,
+                OtherResponse.rater_hash == rater_hash,
+            )
+        )
+    )
+    return grouped.get(rater_hash)
+
+
+def load_session_raters(db: Session, session_id: str) -> List[RaterAnswers]:
+    """Every rater's answers for a session; under dual, packs win over rows."""
+
+    raters: Dict[str, RaterAnswers] = {}
+    if _uses_packs():
+        raters = {
+            pack.owner: _unpack(db, pack)
+            for pack in _load_packs(db, session_id, AnswerPack.owner != SELF_OWNER)
+        }
+    if not _uses_rows():
+        return list(raters.values())
+    rows = _group_rows(
+        db.execute(
+            _row_columns()
+            .where(OtherResponse.session_id == session_id)
+            .order_by(OtherResponse.rater_hash, OtherResponse.question_id)
+        )
+    )
+    for rater_hash, entry in rows.items():
+        raters.setdefault(rater_hash, entry)
+    return list(raters.values())
+
+
+def _rater_hashes(db: Session, session_id: str) -> set[str]:
+    hashes = {
+        rater_hash
+        for (rater_hash,) in db.execute(
+            select(OtherResponse.rater_hash)
+            .where(OtherResponse.session_id == session_id)
+            .distinct()
+        )
+    }
+    hashes.update(
+        owner
+        for (owner,) in db.execute(
+            select(AnswerPack.owner).where(
+                AnswerPack.session_id == session_id,
+                AnswerPack.owner != SELF_OWNER,
+            )
+        )
+    )
+    return hashes
+
+
+def count_raters(db: Session, session_id: str) -> int:
+    mode = _mode()
+    if mode == "dual":
+        # Only while migrating: a rater may have a pack, rows or both.
+        return len(_rater_hashes(db, session_id))
+    if mode == "packed":
+        statement = select(func.count()).where(
+            AnswerPack.session_id == session_id, AnswerPack.owner != SELF_OWNER
+        )
+    else:
+        statement = select(func.count(func.distinct(OtherResponse.rater_hash))).where(
+            OtherResponse.session_id == session_id
+        )
+    return db.execute(statement).scalar() or 0
+
+
+def rater_exists(db: Session, session_id: str, rater_hash: str) -> bool:
+    if _uses_packs():
+        if db.get(AnswerPack, (session_id, rater_hash)) is not None:
+            return True
+        if not _uses_rows():
+            return False
+    return (
+        db.execute(
+            select(OtherResponse.rater_hash)
+            .where(
+                OtherResponse.session_id == session_id,
+                OtherResponse.rater_hash == rater_hash,
+            )
+            .limit(1)
+        ).first()
+        is not None
+    )
+
+
+def pack_session_rows(db: Session, session_id: str) -> int:
+    """Copy a session's row-stored answers into packs; returns packs written."""
+
+    written = 0
+    self_answers = [
+        (question_id, value)
+        for question_id, value in db.execute(
+            select(SelfResponse.question_id, SelfResponse.value).where(
+                SelfResponse.session_id == session_id
+            )
+        )
+    ]
+    if self_answers:
+        _write_pack(db, session_id, SELF_OWNER, self_answers)
+        written += 1
+    rows = _group_rows(
+        db.execute(_row_columns().where(OtherResponse.session_id == session_id))
+    )
+    for entry in rows.values():
+        _write_pack(
+            db,
+            session_id,
+            entry.rater_hash,
+            entry.answers,
+            entry.relation_tag,
+            entry.participant_id,
+        )
+        written += 1
+    return written
+
+
+def unpack_session_packs(db: Session, session_id: str) -> int:
+    """Write a session's packs back as rows and delete them; returns packs unpacked."""
+
+    packs = _load_packs(db, session_id)
+    for pack in packs:
+        entry = _unpack(db, pack)
+        if entry.rater_hash == SELF_OWNER:
+            replace_answers(db, SelfResponse, {"session_id": session_id}, entry.answers)
+        else:
+            _write_rater_rows(
+                db,
+                session_id,
+                entry.rater_hash,
+                entry.answers,
+                entry.relation_tag,
+                entry.participant_id,
+            )
+    if packs:
+        db.execute(delete(AnswerPack).where(AnswerPack.session_id == session_id))
+    return len(packs)
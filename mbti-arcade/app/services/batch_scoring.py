@@ -0,0 +1,230 @@
+"""Vectorised scoring for many raters in one NumPy pass.
+
+The functions mirror :func:`app.services.scoring.compute_norms`,
+:func:`compute_gap_metrics` and :func:`norms_to_mbti` exactly. Norm totals are
+small integers, so the matrix products are exact; weighted sums use
+``cumsum`` so they accumulate left to right like the builtin ``sum`` in the
+scalar path and produce bit-identical floats.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from statistics import fmean
+from typing import Dict, Iterable, List, Mapping, Sequence, Tuple
+
+from app.data.question_index import QuestionIndex, get_question_index
+from app.schemas import DIMENSIONS
+from app.services.scoring import MBTI_NEGATIVE, MBTI_POSITIVE, ScoringError
+
+try:  # pragma: no cover - optional dependency
+    import numpy as np  # type: ignore[import]
+except ImportError:  # pragma: no cover - optional dependency
+    np = None  # type: ignore[assignment]
+
+NUMPY_AVAILABLE = np is not None
+DIMENSION_INDEX = {dim: index for index, dim in enumerate(DIMENSIONS)}
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise RuntimeError("numpy is required for batch scoring")
+
+
+@dataclass(frozen=True)
+class QuestionWeights:
+    """Column layout and dim/sign weight matrix for an answer matrix."""
+
+    question_ids: Tuple[int, ...]
+    columns: Dict[int, int]
+    signed: "np.ndarray"  # M x 4, question sign in its dimension column
+    indicator: "np.ndarray"  # M x 4, 1.0 in the question's dimension column
+
+    @property
+    def size(self) -> int:
+        return len(self.question_ids)
+
+
+@dataclass(frozen=True)
+class BatchScores:
+    norms: "np.ndarray"  # N x 4, NaN rows for raters the scalar path rejects
+    valid: "np.ndarray"  # N booleans
+
+    def norm_dicts(self) -> List[Dict[str, float] | None]:
+        rows = self.norms.tolist()
+        return [
+            {dim: row[index] for index, dim in enumerate(DIMENSIONS)} if ok else None
+            for row, ok in zip(rows, self.valid.tolist())
+        ]
+
+
+@dataclass(frozen=True)
+class BatchAggregate:
+    scores: BatchScores
+    rater_weights: "np.ndarray"
+    other_norm: Dict[str, float] | None
+    sigma: Dict[str, float] | None
+    gap: Dict[str, float] | None
+    gap_score: float | None
+
+    @property
+    def n(self) -> int:
+        return int(self.scores.valid.sum())
+
+
+def build_question_weights(lookup: Mapping[int, Tuple[str, int]]) -> QuestionWeights:
+    _require_numpy()
+    question_ids = tuple(sorted(lookup))
+    signed = np.zeros((len(question_ids), len(DIMENSIONS)), dtype=np.float64)
+    indicator = np.zeros_like(signed)
+    if isinstance(lookup, QuestionIndex):
+        rows = np.arange(len(question_ids))
+        ids = np.asarray(question_ids, dtype=np.intp)
+        dim_codes = np.frombuffer(lookup.dim_codes, dtype=np.int8)[ids]
+        signs = np.frombuffer(lookup.signs, dtype=np.int8)[ids]
+        signed[rows, dim_codes] = signs
+        indicator[rows, dim_codes] = 1.0
+    else:
+        for row, question_id in enumerate(question_ids):
+            dim, sign = lookup[question_id]
+            signed[row, DIMENSION_INDEX[dim]] = sign
+            indicator[row, DIMENSION_INDEX[dim]] = 1.0
+    signed.setflags(write=False)
+    indicator.setflags(write=False)
+    return QuestionWeights(
+        question_ids=question_ids,
+        columns={question_id: row for row, question_id in enumerate(question_ids)},
+        signed=signed,
+        indicator=indicator,
+    )
+
+
+_WEIGHTS_BY_HASH: Dict[str, QuestionWeights] = {}
+
+
+def question_weights(index: QuestionIndex) -> QuestionWeights:
+    """Weight matrix for ``index``, built once per questionnaire content hash."""
+
+    weights = _WEIGHTS_BY_HASH.get(index.content_hash)
+    if weights is None:
+        weights = build_question_weights(index)
+        _WEIGHTS_BY_HASH[index.content_hash] = weights
+    return weights
+
+
+def seed_question_weights() -> QuestionWeights:
+    return question_weights(get_question_index())
+
+
+def build_answer_matrix(
+    rater_answers: Sequence[Iterable[Tuple[int, int]]], weights: QuestionWeights
+) -> Tuple["np.ndarray", "np.ndarray"]:
+    """Pack answers into an N x M int8 matrix (0 = unanswered).
+
+    The second array flags raters that referenced an unknown question or an
+    out-of-range value; the scalar path raises for those, so they are
+    reported as invalid instead of being scored.
+    """
+
+    _require_numpy()
+    matrix = np.zeros((len(rater_answers), weights.size), dtype=np.int8)
+    accepted = np.ones(len(rater_answers), dtype=bool)
+    columns = weights.columns
+    for row, answers in enumerate(rater_answers):
+        for question_id, value in answers:
+            column = columns.get(question_id)
+            if column is None or value < 1 or value > 5:
+                accepted[row] = False
+                continue
+            matrix[row, column] = value
+    return matrix, accepted
+
+
+def compute_norms_batch(
+    matrix: "np.ndarray",
+    weights: QuestionWeights,
+    accepted: "np.ndarray | None" = None,
+) -> BatchScores:
+    _require_numpy()
+    answered = (matrix != 0).astype(np.float64)
+    deltas = np.where(matrix != 0, matrix.astype(np.float64) - 3.0, 0.0)
+    totals = deltas @ weights.signed
+    counts = answered @ weights.indicator
+
+    valid = (counts > 0).all(axis=1)
+    if accepted is not None:
+        valid &= accepted
+    with np.errstate(divide="ignore", invalid="ignore"):
+        norms = totals / (2.0 * counts)
+    norms[~valid] = np.nan
+    return BatchScores(norms=norms, valid=valid)
+
+
+def compute_gap_metrics_batch(
+    self_norm: Dict[str, float],
+    other_norms: "np.ndarray",
+    rater_weights: "np.ndarray",
+) -> Tuple[Dict[str, float], Dict[str, float], Dict[str, float], float]:
+    """Vectorised :func:`compute_gap_metrics` over an N x 4 norm matrix."""
+
+    _require_numpy()
+    if other_norms.shape[0] == 0 or rater_weights.shape[0] == 0:
+        raise ScoringError("Other norms required")
+
+    column_weights = rater_weights[:, None]
+    denominator = float(np.cumsum(rater_weights)[-1])
+    if denominator <= 0:
+        means = np.zeros(len(DIMENSIONS))
+        variances = np.zeros(len(DIMENSIONS))
+    else:
+        means = np.cumsum(other_norms * column_weights, axis=0)[-1] / denominator
+        spread = column_weights * (other_norms - means) ** 2
+        variances = np.cumsum(spread, axis=0)[-1] / denominator
+
+    mean_values = means.tolist()
+    sigma_values = np.sqrt(variances).tolist()
+    agg_other = {dim: mean_values[index] for index, dim in enumerate(DIMENSIONS)}
+    sigma = {dim: sigma_values[index] for index, dim in enumerate(DIMENSIONS)}
+    gaps = {dim: agg_other[dim] - self_norm[dim] for dim in DIMENSIONS}
+    gap_score = fmean(abs(gaps[dim]) for dim in DIMENSIONS) * 100
+    return agg_other, sigma, gaps, gap_score
+
+
+def norms_to_mbti_batch(norms: "np.ndarray") -> List[str]:
+    _require_numpy()
+    positive = norms >= 0
+    letters = [
+        np.where(positive[:, index], MBTI_POSITIVE[dim], MBTI_NEGATIVE[dim])
+        for index, dim in enumerate(("EI", "SN", "TF", "JP"))
+    ]
+    return ["".join(parts) for parts in zip(*letters)]
+
+
+def score_raters(
+    rater_answers: Sequence[Iterable[Tuple[int, int]]],
+    weights: QuestionWeights | None = None,
+) -> BatchScores:
+    weights = weights or seed_question_weights()
+    matrix, accepted = build_answer_matrix(rater_answers, weights)
+    return compute_norms_batch(matrix, weights, accepted)
+
+
+def score_session(
+    self_norm: Dict[str, float] | None,
+    rater_answers: Sequence[Iterable[Tuple[int, int]]],
+    rater_weights: Sequence[float],
+    weights: QuestionWeights | None = None,
+) -> BatchAggregate:
+    """Score every rater and aggregate the valid ones against ``self_norm``."""
+
+    scores = score_raters(rater_answers, weights)
+    all_weights = np.asarray(rater_weights, dtype=np.float64)
+    valid_weights = all_weights[scores.valid]
+
+    if self_norm is None or valid_weights.shape[0] == 0:
+        return BatchAggregate(scores, valid_weights, None, None, None, None)
+
+    agg_other, sigma, gap, gap_score = compute_gap_metrics_batch(
+        self_norm, scores.norms[scores.valid], valid_weights
+    )
+    return BatchAggregate(scores, valid_weights, agg_other, sigma, gap, gap_score)
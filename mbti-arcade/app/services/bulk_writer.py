@@ -0,0 +1,119 @@
+"""Set-based persistence for answer rows.
+
+Submissions replace one answer set (a session's self answers, one rater's
+answers, one participant's answers). Instead of deleting the set and
+adding an ORM object per answer, :func:`replace_answers` passes all rows
+to one cached ``INSERT ... ON CONFLICT DO UPDATE`` (keyed on the table's
+primary key) as a single DBAPI ``executemany``, plus one ``DELETE`` for
+questions that are no longer part of the set.
+Both statements run on the caller's session/transaction but bypass the
+unit of work.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any, Mapping, Sequence, Tuple, Type
+
+from sqlalchemy import delete, insert, inspect
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.database import Base
+
+_UPSERT_DIALECTS = {
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert,
+}
+
+
+def _upsert_statement(dialect_insert, table, conflict_columns: Tuple[str, ...], update_columns: Tuple[str, ...]):
+    # Parameters are supplied at execute time so the compiled statement is
+    # cached. The rows go to the driver's executemany, which runs the
+    # statement once per row; upserts are not rewritten into multi-row
+    # VALUES ("insertmanyvalues" only applies to RETURNING inserts).
+    statement = dialect_insert(table)
+    return statement.on_conflict_do_update(
+        index_elements=list(conflict_columns),
+        set_={column: statement.excluded[column] for column in update_columns},
+    )
+
+
+def _expire_loaded(db: Session, model: Type[Base], scope: Mapping[str, Any]) -> None:
+    # Rows loaded earlier in this session would otherwise keep their old values.
+    for instance in list(db.identity_map.values()):
+        if not isinstance(instance, model):
+            continue
+        loaded = inspect(instance).dict
+        if all(loaded.get(column) == value for column, value in scope.items()):
+            db.expire(instance)
+
+
+def replace_answers(
+    db: Session,
+    model: Type[Base],
+    scope: Mapping[str, Any],
+    answers: Sequence[Tuple[int, int]],
+    extra: Mapping[str, Any] | None = None,
+) -> None:
+    """Make the rows matching ``scope`` exactly ``answers``.
+
+    ``scope`` holds the primary-key columns other than ``question_id`` and
+    ``extra`` holds non-key columns shared by every row (e.g.
+    ``relation_tag``). Values are upserted; rows for questions missing from
+    ``answers`` are deleted.
+    """
+
+    table = model.__table__
+    now = datetime.now(timezone.utc)
+    by_question = {question_id: value for question_id, value in answers}
+    rows = [
+        {
+            **scope,
+            **(extra or {}),
+            "question_id": question_id,
+            "value": value,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for question_id, value in by_question.items()
+    ]
+
+    stale = delete(model).where(*(table.c[column] == value for column, value in scope.items()))
+    if by_question:
+        stale = stale.where(table.c.question_id.notin_(list(by_question)))
+    db.execute(stale)
+
+    if not rows:
+        return
+
+    key_columns = tuple(column.name for column in table.primary_key.columns)
+    upsert_rows(db, model, rows, key_columns, ("value", "updated_at", *(extra or {})))
+    _expire_loaded(db, model, scope)
+
+
+def upsert_rows(
+    db: Session,
+    model: Type[Base],
+    rows: Sequence[Mapping[str, Any]],
+    conflict_columns: Tuple[str, ...],
+    update_columns: Tuple[str, ...],
+) -> None:
+    """Insert ``rows`` or update ``update_columns`` where ``conflict_columns`` match.
+
+    ``conflict_columns`` must be covered by a primary key or unique
+    constraint. Rows loaded in ``db`` are not refreshed; callers expire them.
+    """
+
+    if not rows:
+        return
+    table = model.__table__
+    dialect_insert = _UPSERT_DIALECTS.get(db.get_bind().dialect.name)
+    if dialect_insert is not None:
+        db.execute(_upsert_statement(dialect_insert, table, conflict_columns, update_columns), rows)
+        return
+
+    # Portable fallback: drop any conflicting rows and insert them again.
+    for row in rows:
+        db.execute(delete(model).where(*(table.c[column] == row[column] for column in conflict_columns)))
+    db.execute(insert(table), list(rows))
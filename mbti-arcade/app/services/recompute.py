@@ -0,0 +1,203 @@
+"""Per-session coalescing of aggregate recomputation.
+
+With ``AGGREGATE_RECOMPUTE_MODE=coalesced`` submit handlers only persist
+answers, bump the aggregate's ``responses_version`` and call
+:func:`schedule_recompute`. A dirty session waits for the debounce window,
+then one full recomputation runs for every submission that arrived in the
+meantime; submissions that land while it runs trigger exactly one more
+pass. Recomputations run on a fixed pool of ``AGGREGATE_RECOMPUTE_WORKERS``
+threads, so a burst across many sessions queues instead of draining the
+connection pool that request handlers use. A failed pass is retried with
+exponential backoff, up to ``AGGREGATE_RECOMPUTE_MAX_ATTEMPTS`` passes.
+
+The coalescer is in-process. Across processes the stored versions are the
+source of truth: :func:`aggregate_status` reports ``pending`` whenever the
+persisted aggregate lags the stored answers.
+"""
+
+from __future__ import annotations
+
+import heapq
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app import settings
+from app.database import session_scope
+from app.models import Aggregate, Session as SessionModel
+from app.og.prerender import prerender_session
+from app.schemas import AggregateStatus
+from app.services.aggregator import recalculate_aggregate, recalculate_relation_aggregates
+from app.services.scoring import ScoringError
+
+log = logging.getLogger("perception_gap.recompute")
+
+
+class RecomputeCoalescer:
+    """Debounced, single-flight recomputation keyed by session id."""
+
+    def __init__(
+        self,
+        recompute: Callable[[str], None],
+        debounce_seconds: float,
+        max_workers: int = 1,
+        max_attempts: int = 1,
+        retry_seconds: float = 1.0,
+    ) -> None:
+        self._recompute = recompute
+        self._debounce = debounce_seconds
+        self._max_attempts = max(1, max_attempts)
+        self._retry_seconds = retry_seconds
+        self._executor = ThreadPoolExecutor(max(1, max_workers), thread_name_prefix="recompute")
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._wake = threading.Condition(self._lock)
+        self._due: List[Tuple[float, str]] = []
+        self._dirty: Set[str] = set()
+        # Sessions waiting out their debounce/backoff, queued or running.
+        self._tracked: Set[str] = set()
+        self._failures: Dict[str, int] = {}
+        self._dispatcher: threading.Thread | None = None
+
+    def schedule(self, session_id: str) -> None:
+        with self._lock:
+            self._dirty.add(session_id)
+            if session_id in self._tracked:
+                return
+            self._tracked.add(session_id)
+            self._push(session_id, self._debounce)
+
+    def is_pending(self, session_id: str) -> bool:
+        with self._lock:
+            return session_id in self._tracked
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Block until no recomputation is queued or running."""
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._idle:
+            while self._tracked:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+    def _push(self, session_id: str, delay: float) -> None:
+        # Caller holds self._lock.
+        heapq.heappush(self._due, (time.monotonic() + delay, session_id))
+        if self._dispatcher is None:
+            self._dispatcher = threading.Thread(
+                target=self._dispatch, name="recompute-dispatch", daemon=True
+            )
+            self._dispatcher.start()
+        self._wake.notify()
+
+    def _dispatch(self) -> None:
+        with self._lock:
+            while True:
+                if not self._due:
+                    self._wake.wait()
+                    continue
+                delay = self._due[0][0] - time.monotonic()
+                if delay > 0:
+                    self._wake.wait(delay)
+                    continue
+                _, session_id = heapq.heappop(self._due)
+                self._executor.submit(self._run, session_id)
+
+    def _run(self, session_id: str) -> None:
+        with self._lock:
+            self._dirty.discard(session_id)
+        failed = False
+        try:
+            self._recompute(session_id)
+        except Exception:
+            failed = True
+            log.exception("Aggregate recomputation failed", extra={"session_id": session_id})
+        with self._lock:
+            delay = self._debounce
+            attempts = self._failures.pop(session_id, 0) + 1
+            if failed and attempts < self._max_attempts:
+                self._failures[session_id] = attempts
+                self._dirty.add(session_id)
+                delay = self._retry_seconds * 2 ** (attempts - 1)
+            elif failed:
+                # Reads fall back to recomputing until the next submission.
+                log.error(
+                    "Aggregate recomputation abandoned after %d attempts",
+                    attempts,
+                    extra={"session_id": session_id},
+                )
+            if session_id in self._dirty:
+                self._push(session_id, delay)
+                return
+            self._tracked.discard(session_id)
+            if not self._tracked:
+                self._idle.notify_all()
+
+
+def recompute_session(session_id: str) -> None:
+    """Full recomputation of a session's aggregates, then its share card."""
+
+    with session_scope() as db:
+        session = db.get(SessionModel, session_id)
+        if session is None:
+            return
+        try:
+            recalculate_aggregate(db, session)
+        except ScoringError:
+            # Raters may answer before the owner; the self submit schedules again.
+            pass
+        recalculate_relation_aggregates(session_id, db)
+    if settings.OG_PRERENDER:
+        prerender_session(session_id)
+
+
+_coalescer: RecomputeCoalescer | None = None
+_coalescer_lock = threading.Lock()
+
+
+def get_coalescer() -> RecomputeCoalescer:
+    global _coalescer
+    with _coalescer_lock:
+        if _coalescer is None:
+            _coalescer = RecomputeCoalescer(
+                recompute_session,
+                settings.AGGREGATE_RECOMPUTE_DEBOUNCE_SECONDS,
+                max_workers=settings.AGGREGATE_RECOMPUTE_WORKERS,
+                max_attempts=settings.AGGREGATE_RECOMPUTE_MAX_ATTEMPTS,
+                retry_seconds=settings.AGGREGATE_RECOMPUTE_RETRY_SECONDS,
+            )
+        return _coalescer
+
+
+def is_coalescing() -> bool:
+    return settings.AGGREGATE_RECOMPUTE_MODE == "coalesced"
+
+
+def schedule_recompute(session_id: str) -> None:
+    """Queue a recomputation; call after the submit's transaction commits."""
+
+    get_coalescer().schedule(session_id)
+
+
+def aggregate_status(db: Session, session_id: str) -> AggregateStatus:
+    if _coalescer is not None and _coalescer.is_pending(session_id):
+        return "pending"
+    aggregate = db.get(Aggregate, session_id)
+    if aggregate is not None and (aggregate.computed_version or 0) < (aggregate.responses_version or 0):
+        return "pending"
+    return "fresh"
+
+
+def flush_pending(timeout: float | None = None) -> bool:
+    """Wait for queued recomputations (shutdown hook); no-op when nothing ran."""
+
+    if _coalescer is None:
+        return True
+    return _coalescer.flush(timeout)
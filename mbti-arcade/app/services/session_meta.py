@@ -0,0 +1,193 @@
+"""Session metadata cached by invite token.
+
+Most invite-token routes only need a session's id, mode, expiry, rater
+limit and owner snapshot before doing real work. Those fields change only
+through ``update_invite``, so they are cached per token in a bounded LRU
+with a TTL. Unknown tokens are cached too, for the longer negative TTL,
+which lets bots replaying dead links be rejected without a query. Expired
+sessions keep the regular TTL: ``update_invite`` can extend them.
+
+The cache is per process. ``update_invite`` and ``create_invite``
+invalidate their token here; other workers pick the change up within
+``SESSION_META_CACHE_TTL_SECONDS``.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app import settings
+from app.models import Session as SessionModel
+
+
+def _aware(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+@dataclass(frozen=True)
+class SessionMeta:
+    """Read-only view of the session fields used before loading anything else.
+
+    Attribute names match :class:`app.models.Session`, so read paths (the
+    aggregator, the share-card renderer) accept either.
+    """
+
+    id: str
+    invite_token: str
+    mode: str
+    expires_at: datetime
+    max_raters: int
+    is_anonymous: bool
+    self_mbti: Optional[str]
+    snapshot_owner_name: Optional[str]
+    snapshot_owner_avatar: Optional[str]
+    updated_at: Optional[datetime]
+
+    def is_expired(self, now: datetime | None = None) -> bool:
+        return self.expires_at <= (now or datetime.now(timezone.utc))
+
+
+_COLUMNS = (
+    SessionModel.id,
+    SessionModel.invite_token,
+    SessionModel.mode,
+    SessionModel.expires_at,
+    SessionModel.max_raters,
+    SessionModel.is_anonymous,
+    SessionModel.self_mbti,
+    SessionModel.snapshot_owner_name,
+    SessionModel.snapshot_owner_avatar,
+    SessionModel.updated_at,
+)
+
+
+def load_session_meta(db: Session, invite_token: str) -> SessionMeta | None:
+    row = db.execute(
+        select(*_COLUMNS).where(SessionModel.invite_token == invite_token)
+    ).one_or_none()
+    if row is None:
+        return None
+    values = row._asdict()
+    values["expires_at"] = _aware(values["expires_at"])
+    # updated_at stays as stored: share-card fingerprints hash it verbatim.
+    return SessionMeta(**values)
+
+
+class SessionMetaCache:
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        negative_ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, SessionMeta | None]]" = OrderedDict()
+        # token -> [loads in flight, generation], only while a load runs;
+        # invalidate() bumps the generation so those loads are not stored.
+        self._loading: Dict[str, List[int]] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, invite_token: str, load: Callable[[], SessionMeta | None]) -> SessionMeta | None:
+        """The cached metadata for ``invite_token``, calling ``load`` on a miss."""
+
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(invite_token)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(invite_token)
+                self._hits += 1
+                return entry[1]
+            self._misses += 1
+            if self.max_entries <= 0:
+                return load()
+            loading = self._loading.setdefault(invite_token, [0, 0])
+            loading[0] += 1
+            generation = loading[1]
+
+        try:
+            meta = load()
+        except BaseException:
+            with self._lock:
+                self._end_load(invite_token)
+            raise
+        expires = now + (self.negative_ttl_seconds if meta is None else self.ttl_seconds)
+        with self._lock:
+            if self._end_load(invite_token) != generation:
+                # Invalidated while loading: what we read may predate the change.
+                return meta
+            self._entries[invite_token] = (expires, meta)
+            self._entries.move_to_end(invite_token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return meta
+
+    def _end_load(self, invite_token: str) -> int:
+        loading = self._loading[invite_token]
+        loading[0] -= 1
+        if not loading[0]:
+            del self._loading[invite_token]
+        return loading[1]
+
+    def invalidate(self, invite_token: str) -> None:
+        with self._lock:
+            self._entries.pop(invite_token, None)
+            loading = self._loading.get(invite_token)
+            if loading is not None:
+                loading[1] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits_total": self._hits,
+                "misses_total": self._misses,
+            }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+_cache: SessionMetaCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_session_meta_cache() -> SessionMetaCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SessionMetaCache(
+                settings.SESSION_META_CACHE_MAX_ENTRIES,
+                settings.SESSION_META_CACHE_TTL_SECONDS,
+                settings.SESSION_META_NEGATIVE_TTL_SECONDS,
+            )
+        return _cache
+
+
+def lookup_session_meta(db: Session, invite_token: str) -> SessionMeta | None:
+    return get_session_meta_cache().get(invite_token, lambda: load_session_meta(db, invite_token))
+
+
+def invalidate_session_meta(invite_token: str) -> None:
+    get_session_meta_cache().invalidate(invite_token)
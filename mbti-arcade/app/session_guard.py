@@ -0,0 +1,225 @@
+"""Request-scoped database session guard and connection-leak detector.
+
+Every pool checkout of a registered engine is tracked with the request
+(method and route) that acquired it and a short stack. Every ORM session
+that begins a transaction inside a request is tracked the same way.
+
+:class:`SessionGuardMiddleware` runs after the whole request, including
+dependency teardown. Sessions that still hold a connection at that point
+are closed, so their connections go back to the pool instead of waiting
+for garbage collection. The leak is logged with the stack that opened it.
+With ``DB_LEAK_DETECTION=raise`` the request fails as well. Raw
+connections that are still checked out cannot be closed safely; they are
+reported only.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+import traceback
+import weakref
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.util import greenlet_spawn
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app import settings
+
+log = logging.getLogger("perception_gap.database")
+
+
+class ConnectionLeakError(RuntimeError):
+    """A database session or connection outlived the request that opened it."""
+
+
+@dataclass(eq=False)
+class _RequestScope:
+    asgi_scope: Scope
+    sessions: Dict[int, "_TrackedSession"] = field(default_factory=dict)
+    checkouts: set = field(default_factory=set)
+
+    @property
+    def label(self) -> str:
+        route = getattr(self.asgi_scope.get("route"), "path", None) or self.asgi_scope.get("path", "")
+        return f"{self.asgi_scope.get('method', '')} {route}".strip()
+
+    @property
+    def request_id(self) -> Optional[str]:
+        # Set on request.state by the request-id middleware.
+        return (self.asgi_scope.get("state") or {}).get("request_id")
+
+
+@dataclass
+class _TrackedSession:
+    session: "weakref.ReferenceType[Session]"
+    is_async: bool
+    stack: str
+
+
+@dataclass
+class _Checkout:
+    engine: str
+    scope: Optional[_RequestScope]
+    stack: str
+    started: float = field(default_factory=time.monotonic)
+
+
+_CURRENT: ContextVar[Optional[_RequestScope]] = ContextVar("db_request_scope", default=None)
+_lock = threading.Lock()
+_checkouts: Dict[int, _Checkout] = {}
+_leaked_sessions = 0
+_leaked_connections = 0
+
+
+def _enabled() -> bool:
+    return settings.DB_LEAK_DETECTION != "off"
+
+
+def _is_internal_frame(filename: str) -> bool:
+    # SQLAlchemy generates some methods at import time; they report "<string>".
+    return "/sqlalchemy/" in filename or filename == __file__ or filename.startswith("<")
+
+
+def _stack() -> str:
+    # A checkout sits under a dozen or more SQLAlchemy frames, so filter
+    # before counting: keep the innermost application frames, no source lookup.
+    lines: List[str] = []
+    for frame, lineno in traceback.walk_stack(None):
+        code = frame.f_code
+        if _is_internal_frame(code.co_filename):
+            continue
+        lines.append(f'  File "{code.co_filename}", line {lineno}, in {code.co_name}\n')
+        if len(lines) == settings.DB_LEAK_STACK_DEPTH:
+            break
+    return "".join(reversed(lines))
+
+
+def track_engine(name: str, engine: Engine) -> None:
+    """Record checkouts and checkins of ``engine``'s pool."""
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+        if not _enabled():
+            return
+        scope = _CURRENT.get()
+        with _lock:
+            _checkouts[id(connection_record)] = _Checkout(name, scope, _stack())
+        if scope is not None:
+            scope.checkouts.add(id(connection_record))
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record) -> None:
+        with _lock:
+            _checkouts.pop(id(connection_record), None)
+
+
+@event.listens_for(Session, "after_begin")
+def _on_session_begin(session, transaction, connection) -> None:
+    scope = _CURRENT.get()
+    if scope is None or not _enabled() or id(session) in scope.sessions:
+        return
+    scope.sessions[id(session)] = _TrackedSession(
+        weakref.ref(session), connection.dialect.is_async, _stack()
+    )
+
+
+async def _close_leaked_sessions(scope: _RequestScope) -> List[str]:
+    stacks = []
+    for tracked in scope.sessions.values():
+        session = tracked.session()
+        if session is None or not session.in_transaction():
+            continue
+        stacks.append(tracked.stack)
+        try:
+            if tracked.is_async:
+                await greenlet_spawn(session.close)
+            else:
+                session.close()
+        except Exception:  # pragma: no cover - best effort cleanup
+            log.warning("Could not close leaked database session", exc_info=True)
+    return stacks
+
+
+def _leaked_checkouts(scope: _RequestScope) -> List[_Checkout]:
+    with _lock:
+        return [
+            checkout
+            for checkout in (_checkouts.get(key) for key in scope.checkouts)
+            if checkout is not None and checkout.scope is scope
+        ]
+
+
+async def _finish(scope: _RequestScope) -> None:
+    global _leaked_sessions, _leaked_connections
+
+    session_stacks = await _close_leaked_sessions(scope)
+    connections = _leaked_checkouts(scope)
+    if not session_stacks and not connections:
+        return
+
+    with _lock:
+        _leaked_sessions += len(session_stacks)
+        _leaked_connections += len(connections)
+    for stack in session_stacks:
+        log.warning(
+            "Database session outlived request %s; closed it",
+            scope.label,
+            extra={"route": scope.label, "request_id": scope.request_id, "stack": stack},
+        )
+    for checkout in connections:
+        log.warning(
+            "Connection from engine %s outlived request %s",
+            checkout.engine,
+            scope.label,
+            extra={"route": scope.label, "request_id": scope.request_id, "stack": checkout.stack},
+        )
+    if settings.DB_LEAK_DETECTION == "raise":
+        raise ConnectionLeakError(
+            f"{len(session_stacks)} session(s) and {len(connections)} connection(s) "
+            f"outlived request {scope.label}:\n" + "\n".join(session_stacks + [c.stack for c in connections])
+        )
+
+
+class SessionGuardMiddleware:
+    """Close and report database sessions that outlive their HTTP request."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not _enabled():
+            await self.app(scope, receive, send)
+            return
+
+        request_scope = _RequestScope(scope)
+        token = _CURRENT.set(request_scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _CURRENT.reset(token)
+            await _finish(request_scope)
+
+
+def leak_metrics() -> Dict[str, Any]:
+    """Currently checked-out connections and leak counters for ``/metricsz``."""
+
+    now = time.monotonic()
+    with _lock:
+        outstanding = list(_checkouts.values())
+        leaked_sessions, leaked_connections = _leaked_sessions, _leaked_connections
+    oldest = min(outstanding, key=lambda checkout: checkout.started, default=None)
+    return {
+        "mode": settings.DB_LEAK_DETECTION,
+        "checked_out": len(outstanding),
+        "oldest_checkout_ms": round((now - oldest.started) * 1000, 3) if oldest else 0.0,
+        "oldest_checkout_route": oldest.scope.label if oldest and oldest.scope else None,
+        "leaked_sessions_total": leaked_sessions,
+        "leaked_connections_total": leaked_connections,
+    }
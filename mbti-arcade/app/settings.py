@@ -70,3 +70,109 @@ ALLOWED_HOSTS = _load_allowed_hosts()
 
 
 CALCULATE_SERVICE_BASE_URL = _resolve_calculate_service_base_url()
+
+
+ANSWER_STORAGE_MODES = ("rows", "dual", "packed")
+
+
+def _resolve_answer_storage_mode() -> str:
+    """Where respondent answers are written: per-question rows, packs or both."""
+
+    declared = os.getenv("ANSWER_STORAGE_MODE", "rows").strip().lower()
+    if declared not in ANSWER_STORAGE_MODES:
+        raise ValueError(
+            f"ANSWER_STORAGE_MODE must be one of {', '.join(ANSWER_STORAGE_MODES)}"
+        )
+    return declared
+
+
+ANSWER_STORAGE_MODE = _resolve_answer_storage_mode()
+
+
+AGGREGATE_RECOMPUTE_MODES = ("inline", "coalesced")
+
+
+def _resolve_aggregate_recompute_mode() -> str:
+    """Recompute aggregates inside each submit or once per burst in the background."""
+
+    declared = os.getenv("AGGREGATE_RECOMPUTE_MODE", "inline").strip().lower()
+    if declared not in AGGREGATE_RECOMPUTE_MODES:
+        raise ValueError(
+            f"AGGREGATE_RECOMPUTE_MODE must be one of {', '.join(AGGREGATE_RECOMPUTE_MODES)}"
+        )
+    return declared
+
+
+AGGREGATE_RECOMPUTE_MODE = _resolve_aggregate_recompute_mode()
+
+AGGREGATE_RECOMPUTE_DEBOUNCE_SECONDS = float(
+    os.getenv("AGGREGATE_RECOMPUTE_DEBOUNCE_MS", "250")
+) / 1000
+
+
+# One entry per card variant (og, twitter, square), so ~256 sessions.
+OG_CACHE_MAX_ENTRIES = int(os.getenv("OG_CACHE_MAX_ENTRIES", "768"))
+
+# Optional directory for rendered share cards shared across processes/restarts.
+OG_CACHE_DIR = os.getenv("OG_CACHE_DIR", "").strip()
+
+# Share-card rendering runs off the event loop in a bounded pool; requests
+# beyond workers + queue get 503 with Retry-After.
+OG_RENDER_WORKERS = int(os.getenv("OG_RENDER_WORKERS", "2"))
+OG_RENDER_QUEUE_LIMIT = int(os.getenv("OG_RENDER_QUEUE_LIMIT", "8"))
+OG_RENDER_RETRY_AFTER_SECONDS = int(os.getenv("OG_RENDER_RETRY_AFTER_SECONDS", "2"))
+
+# Render share cards into the OG cache as soon as a session's aggregate changes.
+OG_PRERENDER = os.getenv("OG_PRERENDER", "1").strip().lower() not in {"0", "false", "no", "off"}
+
+# Connection pools (per registered engine; see app.database). Checkouts wait
+# at most DB_POOL_TIMEOUT_SECONDS before failing instead of hanging a worker.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "10"))
+DB_POOL_RECYCLE_SECONDS = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+
+# Coalesced recomputation shares the sync pool with request handlers, so its
+# workers stay below DB_POOL_SIZE. A failing recomputation is retried with
+# exponential backoff before the session is left to the read-time fallback.
+AGGREGATE_RECOMPUTE_WORKERS = int(
+    os.getenv("AGGREGATE_RECOMPUTE_WORKERS", str(max(1, DB_POOL_SIZE // 2)))
+)
+AGGREGATE_RECOMPUTE_MAX_ATTEMPTS = int(os.getenv("AGGREGATE_RECOMPUTE_MAX_ATTEMPTS", "4"))
+AGGREGATE_RECOMPUTE_RETRY_SECONDS = float(os.getenv("AGGREGATE_RECOMPUTE_RETRY_SECONDS", "1"))
+
+# SQLite pragmas applied on every new connection to a file database.
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_CACHE_SIZE_KIB = int(os.getenv("SQLITE_CACHE_SIZE_KIB", "16384"))
+SQLITE_MMAP_SIZE_BYTES = int(os.getenv("SQLITE_MMAP_SIZE_BYTES", str(128 * 1024 * 1024)))
+
+# Passive WAL checkpoints keep the -wal file from growing between the
+# automatic ones SQLite runs on commit; 0 disables the background task.
+SQLITE_WAL_CHECKPOINT_SECONDS = float(os.getenv("SQLITE_WAL_CHECKPOINT_SECONDS", "300"))
+
+DB_LEAK_DETECTION_MODES = ("off", "log", "raise")
+
+
+def _resolve_db_leak_detection() -> str:
+    """What to do when a DB session or connection outlives its request."""
+
+    declared = os.getenv("DB_LEAK_DETECTION", "log").strip().lower()
+    if declared not in DB_LEAK_DETECTION_MODES:
+        raise ValueError(
+            f"DB_LEAK_DETECTION must be one of {', '.join(DB_LEAK_DETECTION_MODES)}"
+        )
+    return declared
+
+
+# Sessions still open when their request finishes are closed either way;
+# "raise" additionally fails the request (use it in tests and staging).
+DB_LEAK_DETECTION = _resolve_db_leak_detection()
+DB_LEAK_STACK_DEPTH = int(os.getenv("DB_LEAK_STACK_DEPTH", "12"))
+
+# Invite-token -> session metadata cache (app.services.session_meta). Unknown
+# and expired tokens are cached for the longer negative TTL so scrapers
+# cannot hammer the database; update_invite/create_invite invalidate
+# locally, other processes see changes after at most the TTL.
+SESSION_META_CACHE_MAX_ENTRIES = int(os.getenv("SESSION_META_CACHE_MAX_ENTRIES", "4096"))
+SESSION_META_CACHE_TTL_SECONDS = float(os.getenv("SESSION_META_CACHE_TTL_SECONDS", "30"))
+SESSION_META_NEGATIVE_TTL_SECONDS = float(os.getenv("SESSION_META_NEGATIVE_TTL_SECONDS", "120"))
@@ -19,11 +19,12 @@ class ProblemDetailsException(HTTPException):
         type_suffix: str = "generic",
         errors: Optional[Dict[str, List[str]]] = None,
         instance: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
     ) -> None:
         self.errors = errors
         self.type_suffix = type_suffix
         self.instance_value = instance
-        super().__init__(status_code=status_code, detail=detail, headers=None)
+        super().__init__(status_code=status_code, detail=detail, headers=headers)
         self.title = title
 
 
@@ -74,7 +75,7 @@ def from_exception(request: Request, exc: ProblemDetailsException) -> JSONRespon
     }
     if exc.errors:
         body["errors"] = exc.errors
-    return JSONResponse(status_code=exc.status_code, content=body)
+    return JSONResponse(status_code=exc.status_code, content=body, headers=exc.headers)
 
 
 def from_http_exception(request: Request, exc: HTTPException) -> JSONResponse:
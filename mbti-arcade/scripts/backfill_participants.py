@@ -6,20 +6,18 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Dict, Iterable, List
 
-from sqlalchemy.orm import Session
-
-from app.data.loader import seed_questions
+from app.data.loader import ensure_questions_seeded
+from app.data.question_index import QuestionIndex, get_question_index
 from app.database import SessionLocal
 from app.models import (
     OtherResponse,
     Participant,
     ParticipantAnswer,
     ParticipantRelation,
-    Question,
     Session as SessionModel,
 )
+from app.services import answer_store, batch_scoring
 from app.services.aggregator import (
-    build_question_lookup,
     group_other_responses,
     recalculate_aggregate,
     recalculate_relation_aggregates,
@@ -50,9 +48,21 @@ def _participant_answers(rows: Iterable[OtherResponse]) -> List[tuple[int, int]]
     return [(row.question_id, row.value) for row in rows]
 
 
-def _load_questions(db: Session) -> Dict[int, tuple[str, int]]:
-    questions = db.query(Question).all()
-    return build_question_lookup(questions)
+def _score_raters(
+    answer_sets: List[List[tuple[int, int]]],
+    lookup: QuestionIndex,
+    weights: "batch_scoring.QuestionWeights | None",
+) -> List[Dict[str, float] | None]:
+    if weights is not None:
+        return batch_scoring.score_raters(answer_sets, weights).norm_dicts()
+
+    scored: List[Dict[str, float] | None] = []
+    for answers in answer_sets:
+        try:
+            scored.append(compute_norms(answers, lookup))
+        except ScoringError:
+            scored.append(None)
+    return scored
 
 
 def backfill_participants(dry_run: bool = False) -> Dict[str, int]:
@@ -66,8 +76,13 @@ def backfill_participants(dry_run: bool = False) -> Dict[str, int]:
 
     db = SessionLocal()
     try:
-        seed_questions(db)
-        lookup = _load_questions(db)
+        ensure_questions_seeded(db)
+        lookup = get_question_index()
+        weights = (
+            batch_scoring.question_weights(lookup)
+            if batch_scoring.NUMPY_AVAILABLE
+            else None
+        )
 
         sessions = db.query(SessionModel).all()
         for session in sessions:
@@ -85,7 +100,12 @@ def backfill_participants(dry_run: bool = False) -> Dict[str, int]:
 
             summary["sessions_processed"] += 1
 
-            for rater_hash, rows in grouped.items():
+            rater_items = list(grouped.items())
+            rater_norms = _score_raters(
+                [_participant_answers(rows) for _, rows in rater_items], lookup, weights
+            )
+
+            for (rater_hash, rows), norms in zip(rater_items, rater_norms):
                 participant = None
                 if rows and rows[0].participant_id is not None:
                     participant = db.get(Participant, rows[0].participant_id)
@@ -117,10 +137,7 @@ def backfill_participants(dry_run: bool = False) -> Dict[str, int]:
                     )
                     summary["answers_copied"] += 1
 
-                answers = _participant_answers(rows)
-                try:
-                    norms = compute_norms(answers, lookup)
-                except ScoringError:
+                if norms is None:
                     continue
 
                 participant.axes_payload = {dim: round(value, 6) for dim, value in norms.items()}
@@ -139,6 +156,9 @@ def backfill_participants(dry_run: bool = False) -> Dict[str, int]:
                     ).delete()
                     for row in rows:
                         row.rater_hash = new_rater_hash
+                    answer_store.rekey_rater_pack(
+                        db, session.id, rater_hash, new_rater_hash, participant.id
+                    )
 
             try:
                 recalculate_aggregate(db, session)
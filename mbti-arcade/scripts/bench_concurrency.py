@@ -0,0 +1,274 @@
+"""Benchmark concurrent API throughput: route bodies on the event loop vs off it.
+
+Drives the ASGI app in-process with ``--clients`` concurrent clients on one
+event loop, like a single uvicorn worker. Each workload compares:
+
+* ``before``: the pre-async code path, mounted under ``/bench/legacy`` and
+  calling the same handler bodies with the blocking ``get_db`` session on
+  the event loop;
+* ``after``: the real routes, which run those bodies on worker threads
+  through ``app.database.run_in_db_thread``.
+
+Besides throughput and latency it reports the longest event-loop stall seen
+by a 5 ms heartbeat task, which is what other in-flight requests feel.
+
+Every run gets freshly seeded sessions, so both sides see the same data
+sizes, and ``--rounds`` alternates the order of the two sides; each metric
+is the median over the rounds (errors are summed).
+
+The legacy path gets its own sync pool sized to ``--clients``: with the
+default 5 + 10 pool, a request blocked in checkout holds the event loop,
+so the sessions that would release connections never finish and every
+waiter stalls until the 30 s pool timeout.
+
+    PYTHONPATH=. python scripts/bench_concurrency.py --clients 100 --requests 10
+"""
+# No ``from __future__ import annotations``: the legacy routes are defined
+# inside a function and FastAPI must resolve their annotations eagerly.
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+HEARTBEAT_SECONDS = 0.005
+
+
+async def call(app, method: str, path: str, body: Any = None) -> Tuple[int, bytes]:
+    payload = json.dumps(body).encode("utf-8") if body is not None else b""
+    scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "asgi": {"version": "3.0", "spec_version": "2.3"},
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode("latin-1"),
+        "query_string": b"",
+        "headers": [(b"host", b"localhost"), (b"content-type", b"application/json")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("localhost", 80),
+        "root_path": "",
+    }
+    status = 0
+    chunks: List[bytes] = []
+    sent = False
+
+    async def receive() -> Dict[str, Any]:
+        nonlocal sent
+        if sent:
+            await asyncio.sleep(3600)
+        sent = True
+        return {"type": "http.request", "body": payload, "more_body": False}
+
+    async def send(message: Dict[str, Any]) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status, b"".join(chunks)
+
+
+def _answers() -> List[Dict[str, int]]:
+    from app.data.questions import questions_for_mode
+
+    return [{"question_id": item["id"], "value": 1 + item["id"] % 5} for item in questions_for_mode("basic")]
+
+
+async def seed(app, sessions: int, raters: int) -> List[str]:
+    answers = _answers()
+    tokens = []
+    for _ in range(sessions):
+        status, body = await call(app, "POST", "/api/sessions", {"mode": "basic", "max_raters": 500})
+        if status != 201:
+            raise SystemExit(f"Could not create a session: {status} {body[:200]!r}")
+        created = json.loads(body)
+        await call(app, "POST", "/api/self/submit", {"session_id": created["session_id"], "answers": answers})
+        for index in range(raters):
+            await call(
+                app,
+                "POST",
+                "/api/other/submit",
+                {
+                    "invite_token": created["invite_token"],
+                    "relation_tag": "friend",
+                    "rater_key": f"seed-{index}",
+                    "answers": answers,
+                },
+            )
+        tokens.append(created["invite_token"])
+    return tokens
+
+
+def mount_legacy_routes(app, pool_size: int) -> None:
+    from fastapi import APIRouter, Depends, Response
+    from sqlalchemy import create_engine, event
+    from sqlalchemy.orm import Session, sessionmaker
+    from sqlalchemy.pool import QueuePool
+
+    from app.database import DATABASE_URL, PoolStats, _engine_options, _set_sqlite_pragmas
+    from app.routers.responses import _submit_other
+    from app.routers.results import _fetch_result
+    from app.schemas import OtherSubmitRequest, OtherSubmitResponse, ResultDetail
+    from app.session_guard import track_engine
+
+    # Configured like the app's engines (pragmas, pool timing, leak
+    # tracking) so only the execution model differs.
+    engine = create_engine(
+        DATABASE_URL, **_engine_options(DATABASE_URL, PoolStats(), QueuePool, pool_size, 0)
+    )
+    if DATABASE_URL.startswith("sqlite"):
+        event.listen(engine, "connect", _set_sqlite_pragmas)
+    track_engine("bench-legacy", engine)
+    legacy_sessions = sessionmaker(bind=engine, autoflush=False, future=True)
+
+    def get_db():
+        db = legacy_sessions()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    legacy = APIRouter(prefix="/bench/legacy")
+
+    @legacy.get("/result/{invite_token}", response_model=ResultDetail)
+    async def legacy_fetch_result(invite_token: str, response: Response, db: Session = Depends(get_db)):
+        return _fetch_result(db, invite_token, response)
+
+    @legacy.post("/other/submit", response_model=OtherSubmitResponse, status_code=201)
+    async def legacy_submit_other(payload: OtherSubmitRequest, db: Session = Depends(get_db)):
+        return _submit_other(db, payload)
+
+    app.include_router(legacy)
+
+
+async def heartbeat(stop: asyncio.Event, stalls: List[float]) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(HEARTBEAT_SECONDS)
+        stalls.append((time.perf_counter() - started - HEARTBEAT_SECONDS) * 1000)
+
+
+async def run_workload(app, requests: List[Tuple[str, str, Any]], clients: int) -> Dict[str, float]:
+    queue: asyncio.Queue = asyncio.Queue()
+    for item in requests:
+        queue.put_nowait(item)
+    latencies: List[float] = []
+    errors = 0
+
+    async def client() -> None:
+        nonlocal errors
+        while not queue.empty():
+            method, path, body = queue.get_nowait()
+            started = time.perf_counter()
+            status, _ = await call(app, method, path, body)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if status >= 400:
+                errors += 1
+
+    stop = asyncio.Event()
+    stalls: List[float] = []
+    ticker = asyncio.create_task(heartbeat(stop, stalls))
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await ticker
+
+    ordered = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(ordered), 2),
+        "p95_ms": round(ordered[max(0, int(len(ordered) * 0.95) - 1)], 2),
+        "max_loop_stall_ms": round(max(stalls, default=0.0), 2),
+    }
+
+
+def _result_requests(prefix: str, tokens: List[str], count: int) -> List[Tuple[str, str, Any]]:
+    return [("GET", f"{prefix}/result/{tokens[i % len(tokens)]}", None) for i in range(count)]
+
+
+def _submit_requests(prefix: str, tokens: List[str], count: int, label: str) -> List[Tuple[str, str, Any]]:
+    answers = _answers()
+    return [
+        (
+            "POST",
+            f"{prefix}/other/submit",
+            {
+                "invite_token": tokens[i % len(tokens)],
+                "relation_tag": "friend",
+                "rater_key": f"{label}-{i}",
+                "answers": answers,
+            },
+        )
+        for i in range(count)
+    ]
+
+
+def _median_run(runs: List[Dict[str, float]]) -> Dict[str, float]:
+    summary = {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+    summary["errors"] = sum(run["errors"] for run in runs)
+    return summary
+
+
+async def run_benchmark(
+    clients: int, per_client: int, sessions: int, rounds: int
+) -> Dict[str, Dict[str, Dict[str, float]]]:
+    from app.database import async_engine, engine
+    from app.main import app
+
+    await app.router.startup()
+    try:
+        mount_legacy_routes(app, pool_size=clients)
+        total = clients * per_client
+        sides = (("before", "/bench/legacy"), ("after", "/api"))
+        results: Dict[str, Dict[str, Dict[str, float]]] = {}
+        for workload in ("result", "submit"):
+            runs: Dict[str, List[Dict[str, float]]] = {label: [] for label, _ in sides}
+            for round_index in range(rounds):
+                for label, prefix in sides if round_index % 2 == 0 else sides[::-1]:
+                    tokens = await seed(app, sessions, raters=3)
+                    if workload == "result":
+                        requests = _result_requests(prefix, tokens, total)
+                    else:
+                        requests = _submit_requests(prefix, tokens, total, f"{label}-{round_index}")
+                    runs[label].append(await run_workload(app, requests, clients))
+            results[workload] = {label: _median_run(items) for label, items in runs.items()}
+        return results
+    finally:
+        await app.router.shutdown()
+        engine.dispose()
+        await async_engine.dispose()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark concurrent request throughput")
+    parser.add_argument("--clients", type=int, default=100, help="Concurrent clients")
+    parser.add_argument("--requests", type=int, default=10, help="Requests per client per run")
+    parser.add_argument("--sessions", type=int, default=20, help="Sessions to spread requests over")
+    parser.add_argument("--rounds", type=int, default=3, help="Alternating runs per side (median reported)")
+    parser.add_argument("--database-url", help="Database to use (default: a throwaway SQLite file)")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as workdir:
+        # Must be set before app.database is imported.
+        os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{Path(workdir) / 'bench.db'}"
+        os.environ.setdefault("OG_PRERENDER", "0")
+        results = asyncio.run(run_benchmark(args.clients, args.requests, args.sessions, args.rounds))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,372 @@
+"""Benchmark share-card rendering: per-pixel raster loops versus span fills.
+
+Renders the same locked and unlocked cards with a per-pixel reference
+canvas (the original implementation) and with ``app.og.image.Canvas``,
+checks the PNG bytes are identical and reports per-card timings for the
+raster step and the full render including PNG encoding. The ``encoding``
+section compares the RGBA encoder with the palette-indexed canvas the
+renderer uses (latency and PNG size), with and without the template's
+precompressed row bands. The ``polygon`` section times the
+scanline polygon fill against a per-pixel point-in-polygon reference on a
+polygon-heavy card and checks the real radar card against the render
+budget. ``variants`` renders every card size separately versus from one
+shared layout.
+
+    PYTHONPATH=. python scripts/bench_og_render.py --iterations 50
+
+``--check`` instead runs the regression suite: every scenario (locked,
+unlocked, long title, Hangul title when the font atlas covers it) in every
+card variant, reporting p50/p95 render time, PNG size and tracemalloc peak
+per case, compared with ``bench_og_render_baseline.json``. It exits
+non-zero when a metric is worse than the baseline by more than its
+threshold: ``--threshold`` (a ratio, 0.1 = 10%) for PNG size and memory,
+which are near-deterministic, and ``--time-threshold`` for timings.
+Timings also have to exceed the baseline by ``--min-delta-ms`` so jitter on
+small renders never fails a run. A p95 above ``--budget-ms`` fails
+regardless of the baseline.
+
+    PYTHONPATH=. python scripts/bench_og_render.py --check            # compare
+    PYTHONPATH=. python scripts/bench_og_render.py --update-baseline  # re-record
+
+Baselines are machine specific; re-record on the machine that runs the
+comparison (e.g. the CI runner) after an intended change.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Tuple
+
+from app.og import renderer
+from app.og.atlas import get_font_atlas
+from app.og.font import FONT_5X7
+from app.og.image import Canvas
+
+RENDER_BUDGET_MS = 150
+BASELINE_PATH = Path(__file__).resolve().parent / "bench_og_render_baseline.json"
+SUITE_METRICS = ("p50_ms", "p95_ms", "bytes", "peak_kib")
+TIME_METRICS = {"p50_ms", "p95_ms"}
+
+
+class PixelCanvas(Canvas):
+    """The pre-span rasterizer: one slice assignment per pixel."""
+
+    def fill_rect(self, x, y, w, h, color):
+        for yy in range(y, y + h):
+            if yy < 0 or yy >= self.height:
+                continue
+            row = self.rows[yy]
+            for xx in range(max(x, 0), min(x + w, self.width)):
+                row[xx * 4 : xx * 4 + 4] = bytes(color)
+
+    def draw_text(self, x, y, text, color, scale=2, spacing=1):
+        cursor_x = x
+        for char in text.upper():
+            glyph = FONT_5X7.get(char)
+            if glyph is None:
+                cursor_x += (5 * scale) + spacing * scale
+                continue
+            for gy, line in enumerate(glyph):
+                for gx, ch in enumerate(line):
+                    if ch != "#":
+                        continue
+                    for sy in range(scale):
+                        for sx in range(scale):
+                            self.set_pixel(cursor_x + gx * scale + sx, y + gy * scale + sy, color)
+            cursor_x += (len(glyph[0]) * scale) + spacing * scale
+
+    def fill_polygon(self, points, color):
+        # Point-in-polygon test at every pixel centre of the bounding box.
+        xs = [x for x, _ in points]
+        ys = [y for _, y in points]
+        for yy in range(max(math.floor(min(ys)), 0), min(math.ceil(max(ys)), self.height)):
+            for xx in range(max(math.floor(min(xs)), 0), min(math.ceil(max(xs)), self.width)):
+                if _inside(points, xx + 0.5, yy + 0.5):
+                    self.set_pixel(xx, yy, color)
+
+
+def _inside(points, px, py) -> bool:
+    inside = False
+    for index, (x0, y0) in enumerate(points):
+        x1, y1 = points[(index + 1) % len(points)]
+        if y0 == y1:
+            continue
+        if y0 > y1:
+            x0, y0, x1, y1 = x1, y1, x0, y0
+        if y0 <= py < y1 and x0 + (py - y0) * (x1 - x0) / (y1 - y0) <= px:
+            inside = not inside
+    return inside
+
+
+def _card_inputs(gap_score, owner_name=None):
+    session = SimpleNamespace(
+        id="bench-session-0000",
+        mode="friend",
+        updated_at=datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc),
+        snapshot_owner_name=owner_name,
+    )
+    aggregate = SimpleNamespace(
+        n=5 if gap_score is not None else 1,
+        gap_score=gap_score,
+        radar_self={"EI": 72.0, "SN": 41.0, "TF": 63.0, "JP": 28.0},
+        radar_other={"EI": 55.0, "SN": 68.0, "TF": 37.0, "JP": 61.0},
+    )
+    return session, aggregate
+
+
+def _polygon_card(template: Canvas) -> Canvas:
+    # A dozen overlapping radars across the card: far more polygon area
+    # than a share card, so the fill cost dominates.
+    canvas = template.clone()
+    for index in range(12):
+        cx, cy = 150 + (index % 6) * 180, 200 + (index // 6) * 220
+        radius = 90 + index * 3
+        star = [
+            (cx + radius * math.cos(step * 4 * math.pi / 5), cy + radius * math.sin(step * 4 * math.pi / 5))
+            for step in range(5)
+        ]
+        diamond = [(cx, cy - radius), (cx + radius, cy), (cx, cy + radius), (cx - radius, cy)]
+        canvas.fill_polygon(diamond, renderer.ACCENT)
+        canvas.fill_polygon(star, renderer.LOCK_BG)
+        canvas.draw_polygon(diamond, renderer.TEXT_PRIMARY, width=3)
+    return canvas
+
+
+def _draw_card(template: Canvas, gap_score) -> Canvas:
+    # Mirrors render_share_card without encoding, to isolate raster cost.
+    session, aggregate = _card_inputs(gap_score)
+    canvas = template.clone()
+    canvas.draw_text(80, 40, "360ME — PERCEPTION GAP", renderer.TEXT_SECONDARY, scale=3)
+    canvas.draw_text(80, 120, f"SESSION: {session.id[:8]}", renderer.TEXT_PRIMARY, scale=4)
+    renderer._draw_radar(
+        canvas, renderer.build_share_card_layout(session, aggregate), renderer.VARIANTS["og"]
+    )
+    canvas.draw_text(80, 210, "UPDATED: 2024-01-01 12:00", renderer.TEXT_PRIMARY, scale=3)
+    canvas.draw_text(80, 270, f"MODE: {session.mode.upper()}", renderer.TEXT_PRIMARY, scale=3)
+    canvas.draw_text(80, 330, f"K: {aggregate.n}", renderer.TEXT_PRIMARY, scale=3)
+    if gap_score is not None:
+        canvas.draw_text(80, 390, f"GAP SCORE: {gap_score:.1f}", renderer.ACCENT, scale=4)
+    else:
+        canvas.fill_rect(80, 360, 1040, 120, renderer.LOCK_BG)
+        canvas.draw_text(120, 400, "RESULTS LOCKED (K < 3)", renderer.LOCK_TEXT, scale=4)
+    canvas.draw_text(80, 520, "SHARE SAFELY AT 360ME", renderer.TEXT_SECONDARY, scale=2)
+    return canvas
+
+
+def _template(canvas_type, palette=None) -> Canvas:
+    template = canvas_type(1200, 630, renderer.BACKGROUND, palette=palette)
+    template.fill_rect(60, 90, 1080, 360, renderer.CARD)
+    return template
+
+
+def _time(fn: Callable[[], object], iterations: int) -> Dict[str, float]:
+    timings: List[float] = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return {
+        "median_ms": round(statistics.median(timings), 3),
+        "mean_ms": round(statistics.fmean(timings), 3),
+    }
+
+
+def run_benchmark(iterations: int) -> Dict[str, Dict[str, Dict[str, float]]]:
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for label, gap_score in (("locked", None), ("unlocked", 42.5)):
+        pixel_template = _template(PixelCanvas)
+        span_template = _template(Canvas)
+        if _draw_card(pixel_template, gap_score).to_png() != _draw_card(span_template, gap_score).to_png():
+            raise SystemExit(f"{label}: span rasterizer output differs from the per-pixel reference")
+
+        results[label] = {
+            "template_before": _time(lambda: _template(PixelCanvas), max(1, iterations // 10)),
+            "template_after": _time(lambda: _template(Canvas), iterations),
+            "raster_before": _time(lambda: _draw_card(pixel_template, gap_score), iterations),
+            "raster_after": _time(lambda: _draw_card(span_template, gap_score), iterations),
+            "card_before": _time(lambda: _draw_card(pixel_template, gap_score).to_png(), iterations),
+            "card_after": _time(lambda: _draw_card(span_template, gap_score).to_png(), iterations),
+        }
+
+        indexed_template = _template(Canvas, renderer.PALETTE)
+        rgba_card = _draw_card(span_template, gap_score)
+        indexed_card = _draw_card(indexed_template, gap_score)
+        results[label]["encoding"] = {
+            "rgba": {**_time(rgba_card.to_png, iterations), "bytes": len(rgba_card.to_png())},
+            "indexed": {**_time(indexed_card.to_png, iterations), "bytes": len(indexed_card.to_png())},
+            "indexed_card": _time(lambda: _draw_card(indexed_template, gap_score).to_png(), iterations),
+        }
+        banded_template = _template(Canvas, renderer.PALETTE)
+        banded_template.precompress_bands()
+        banded_card = _draw_card(banded_template, gap_score)
+        results[label]["encoding"]["indexed_banded"] = {
+            **_time(banded_card.to_png, iterations),
+            "bytes": len(banded_card.to_png()),
+        }
+
+    pixel_template = _template(PixelCanvas)
+    span_template = _template(Canvas, renderer.PALETTE)
+    if _polygon_card(pixel_template).rows != _polygon_card(_template(Canvas)).rows:
+        raise SystemExit("polygon: scanline fill differs from the per-pixel reference")
+    session, aggregate = _card_inputs(42.5)
+    radar_card = _time(lambda: renderer.render_share_card(session, aggregate), iterations)
+    results["polygon"] = {
+        "fill_before": _time(lambda: _polygon_card(pixel_template), max(1, iterations // 10)),
+        "fill_after": _time(lambda: _polygon_card(span_template), iterations),
+        "radar_card": {**radar_card, "within_budget": radar_card["median_ms"] <= RENDER_BUDGET_MS},
+    }
+    results["variants"] = {
+        "separate": _time(
+            lambda: [renderer.render_share_card(session, aggregate, name) for name in renderer.VARIANTS],
+            iterations,
+        ),
+        "one_layout": _time(lambda: renderer.render_share_cards(session, aggregate), iterations),
+    }
+    return results
+
+
+def scenarios() -> Dict[str, Tuple[SimpleNamespace, SimpleNamespace]]:
+    cases = {
+        "locked": _card_inputs(None),
+        "unlocked": _card_inputs(42.5),
+        "long_text": _card_inputs(42.5, "Alexandria Montgomery-Wellington the Third"),
+    }
+    if "가" in get_font_atlas():
+        cases["hangul"] = _card_inputs(42.5, "김민지와 친구들의 솔직한 평가")
+    return cases
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    return ordered[max(0, int(len(ordered) * fraction + 0.5) - 1)]
+
+
+def measure(session, aggregate, variant: str, iterations: int) -> Dict[str, float]:
+    renderer.render_share_card(session, aggregate, variant)  # warm glyph and template caches
+    timings = []
+    image = b""
+    for _ in range(iterations):
+        started = time.perf_counter()
+        image = renderer.render_share_card(session, aggregate, variant)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    # Separate pass: tracing allocations slows rendering several-fold.
+    tracemalloc.start()
+    try:
+        renderer.render_share_card(session, aggregate, variant)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    ordered = sorted(timings)
+    return {
+        "p50_ms": round(statistics.median(ordered), 3),
+        "p95_ms": round(_percentile(ordered, 0.95), 3),
+        "bytes": len(image),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def run_suite(iterations: int) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for name, (session, aggregate) in scenarios().items():
+        for variant in renderer.VARIANTS:
+            results[f"{name}/{variant}"] = measure(session, aggregate, variant, iterations)
+    return results
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    threshold: float,
+    time_threshold: float,
+    min_delta_ms: float,
+    budget_ms: float,
+) -> List[Dict[str, object]]:
+    """Every metric that is worse than its baseline beyond the allowance."""
+
+    regressions: List[Dict[str, object]] = []
+    for case, metrics in results.items():
+        if metrics["p95_ms"] > budget_ms:
+            regressions.append(
+                {"case": case, "metric": "p95_ms", "budget": budget_ms, "current": metrics["p95_ms"]}
+            )
+        expected = baseline.get(case)
+        if expected is None:
+            continue
+        for metric in SUITE_METRICS:
+            before, after = expected.get(metric), metrics[metric]
+            if not before:
+                continue
+            allowed = time_threshold if metric in TIME_METRICS else threshold
+            if after <= before * (1 + allowed):
+                continue
+            if metric in TIME_METRICS and after - before <= min_delta_ms:
+                continue
+            regressions.append(
+                {
+                    "case": case,
+                    "metric": metric,
+                    "baseline": before,
+                    "current": after,
+                    "change": f"{(after / before - 1) * 100:+.1f}%",
+                }
+            )
+    return regressions
+
+
+def check_suite(args: argparse.Namespace) -> int:
+    results = run_suite(args.iterations)
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(json.dumps({"baseline": str(args.baseline), "cases": results}, ensure_ascii=False, indent=2))
+        return 0
+
+    if not args.baseline.exists():
+        raise SystemExit(f"No baseline at {args.baseline}; run with --update-baseline first")
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    regressions = compare(
+        results, baseline, args.threshold, args.time_threshold, args.min_delta_ms, args.budget_ms
+    )
+    summary = {
+        "threshold": args.threshold,
+        "time_threshold": args.time_threshold,
+        "cases": results,
+        "missing_from_baseline": sorted(set(results) - set(baseline)),
+        "regressions": regressions,
+    }
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    return 1 if regressions else 0
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark OG card rasterization")
+    parser.add_argument("--iterations", type=int, default=50, help="Renders per measurement")
+    parser.add_argument("--check", action="store_true", help="Run the regression suite against the baseline")
+    parser.add_argument("--update-baseline", action="store_true", help="Record the suite as the new baseline")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="Baseline JSON path")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Allowed size/memory regression ratio")
+    parser.add_argument("--time-threshold", type=float, default=0.5, help="Allowed timing regression ratio")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0, help="Ignore timing regressions below this")
+    parser.add_argument("--budget-ms", type=float, default=RENDER_BUDGET_MS, help="Absolute p95 render budget")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    if args.check or args.update_baseline:
+        return check_suite(args)
+    print(json.dumps(run_benchmark(args.iterations), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""Benchmark answer persistence: ORM delete+add versus the bulk upsert writer.
+
+Each iteration persists one rater's answers and commits, alternating new
+raters and resubmissions, against a throwaway SQLite file (or --url).
+Only the persistence step is timed; scoring and aggregation are identical
+on both paths.
+
+    PYTHONPATH=. python scripts/bench_submit.py --iterations 200
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.data.loader import seed_questions
+from app.data.question_index import get_question_index
+from app.database import Base
+from app.models import OtherResponse, Session as SessionModel
+from app.services.bulk_writer import replace_answers
+
+QUESTION_COUNTS = (24, 48, 96)
+
+Writer = Callable[[Session, str, str, Sequence[Tuple[int, int]]], None]
+
+
+def legacy_write(db: Session, session_id: str, rater_hash: str, answers: Sequence[Tuple[int, int]]) -> None:
+    db.query(OtherResponse).filter(
+        OtherResponse.session_id == session_id,
+        OtherResponse.rater_hash == rater_hash,
+    ).delete()
+    for question_id, value in answers:
+        db.add(
+            OtherResponse(
+                session_id=session_id,
+                rater_hash=rater_hash,
+                question_id=question_id,
+                value=value,
+                relation_tag="friend",
+            )
+        )
+    db.flush()
+
+
+def bulk_write(db: Session, session_id: str, rater_hash: str, answers: Sequence[Tuple[int, int]]) -> None:
+    replace_answers(
+        db,
+        OtherResponse,
+        {"session_id": session_id, "rater_hash": rater_hash},
+        answers,
+        extra={"relation_tag": "friend"},
+    )
+
+
+def _create_session(db: Session) -> str:
+    session_id = str(uuid.uuid4())
+    db.add(
+        SessionModel(
+            id=session_id,
+            mode="friend",
+            invite_token=uuid.uuid4().hex,
+            expires_at=datetime.now(timezone.utc) + timedelta(days=1),
+        )
+    )
+    db.commit()
+    return session_id
+
+
+def _run(factory: sessionmaker, writer: Writer, question_ids: Sequence[int], iterations: int, seed: int) -> Dict[str, float]:
+    rng = random.Random(seed)
+    with factory() as db:
+        session_id = _create_session(db)
+
+    timings: List[float] = []
+    for iteration in range(iterations):
+        # Even iterations add a rater, odd ones resubmit the previous rater.
+        rater_hash = f"rater-{iteration - iteration % 2}"
+        answers = [(question_id, rng.randint(1, 5)) for question_id in question_ids]
+        with factory() as db:
+            started = time.perf_counter()
+            writer(db, session_id, rater_hash, answers)
+            db.commit()
+            timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    return {
+        "median_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 3),
+        "mean_ms": round(statistics.fmean(timings), 3),
+    }
+
+
+def run_benchmark(url: str | None, iterations: int) -> Dict[str, Dict[str, Dict[str, float]]]:
+    with tempfile.TemporaryDirectory() as workdir:
+        database_url = url or f"sqlite:///{Path(workdir) / 'bench.db'}"
+        connect_args = {"check_same_thread": False} if database_url.startswith("sqlite") else {}
+        engine = create_engine(database_url, connect_args=connect_args, future=True)
+        Base.metadata.create_all(engine)
+        factory = sessionmaker(bind=engine, autoflush=False, future=True)
+        with factory() as db:
+            seed_questions(db)
+
+        question_ids = get_question_index().question_ids
+        results: Dict[str, Dict[str, Dict[str, float]]] = {}
+        for count in QUESTION_COUNTS:
+            ids = question_ids[:count]
+            results[str(count)] = {
+                "before": _run(factory, legacy_write, ids, iterations, seed=count),
+                "after": _run(factory, bulk_write, ids, iterations, seed=count),
+            }
+        engine.dispose()
+    return results
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark answer persistence paths")
+    parser.add_argument("--iterations", type=int, default=200, help="Submissions per mode and path")
+    parser.add_argument("--url", default=None, help="Database URL (defaults to a temporary SQLite file)")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    results = run_benchmark(args.url, args.iterations)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Compile the share-card font atlas (ASCII 5x7 plus composed Hangul).
+
+Writes ``app/og/fonts/og_font.atlas``; rerun after editing
+``app/og/font.py`` or ``app/og/hangul.py`` and commit the result.
+
+    PYTHONPATH=. python scripts/build_font_atlas.py
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+
+from app.og.atlas import ATLAS_PATH, FontAtlas, ascii_glyphs, encode_atlas
+from app.og.hangul import CELL, hangul_glyphs
+
+
+def build(output: Path) -> dict:
+    glyphs = {**ascii_glyphs(), **hangul_glyphs()}
+    data = encode_atlas(glyphs, cell_height=CELL)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_bytes(data)
+    atlas = FontAtlas(data)
+    return {"path": str(output), "glyphs": atlas.glyph_count, "bytes": len(data)}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Build the OG font atlas")
+    parser.add_argument("--output", type=Path, default=ATLAS_PATH, help="Atlas file to write")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    print(json.dumps(build(args.output), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Convert row-stored answers into answer packs, or back.
+
+Run with ANSWER_STORAGE_MODE=dual before switching to "packed"; rows are
+kept unless --delete-rows is given. To roll back, switch to "dual", run
+with --unpack (packs become rows and are deleted), then switch to "rows".
+
+    PYTHONPATH=. python scripts/pack_answers.py [--dry-run] [--delete-rows | --unpack]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from typing import Dict
+
+from app.database import SessionLocal
+from app.models import OtherResponse, ParticipantAnswer, SelfResponse, Session as SessionModel
+from app.services.answer_store import pack_session_rows, unpack_session_packs
+
+BATCH_SIZE = 200
+
+
+def pack_answers(dry_run: bool = False, delete_rows: bool = False, unpack: bool = False) -> Dict[str, int]:
+    counter = "packs_unpacked" if unpack else "packs_written"
+    summary = {"sessions_processed": 0, counter: 0, "dry_run": dry_run}
+
+    db = SessionLocal()
+    try:
+        last_id = ""
+        while True:
+            session_ids = [
+                session_id
+                for (session_id,) in db.query(SessionModel.id)
+                .filter(SessionModel.id > last_id)
+                .order_by(SessionModel.id)
+                .limit(BATCH_SIZE)
+            ]
+            if not session_ids:
+                break
+            last_id = session_ids[-1]
+
+            for session_id in session_ids:
+                if unpack:
+                    written = unpack_session_packs(db, session_id)
+                else:
+                    written = pack_session_rows(db, session_id)
+                if not written:
+                    continue
+                summary["sessions_processed"] += 1
+                summary[counter] += written
+                if delete_rows:
+                    participant_ids = [
+                        participant_id
+                        for (participant_id,) in db.query(OtherResponse.participant_id)
+                        .filter(
+                            OtherResponse.session_id == session_id,
+                            OtherResponse.participant_id.is_not(None),
+                        )
+                        .distinct()
+                    ]
+                    if participant_ids:
+                        db.query(ParticipantAnswer).filter(
+                            ParticipantAnswer.participant_id.in_(participant_ids)
+                        ).delete(synchronize_session=False)
+                    db.query(OtherResponse).filter(
+                        OtherResponse.session_id == session_id
+                    ).delete(synchronize_session=False)
+                    db.query(SelfResponse).filter(
+                        SelfResponse.session_id == session_id
+                    ).delete(synchronize_session=False)
+
+            if dry_run:
+                db.rollback()
+            else:
+                db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    return summary
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Convert answer rows into answer packs, or back")
+    parser.add_argument("--dry-run", action="store_true", help="Execute without committing database changes")
+    direction = parser.add_mutually_exclusive_group()
+    direction.add_argument("--delete-rows", action="store_true", help="Remove converted rows after packing")
+    direction.add_argument("--unpack", action="store_true", help="Write packs back as rows and delete them")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    summary = pack_answers(dry_run=args.dry_run, delete_rows=args.delete_rows, unpack=args.unpack)
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Pre-render share cards for every non-expired session into the OG disk cache.
+
+The API processes read the same directory (``OG_CACHE_DIR``), so crawlers
+hit the cache even for sessions whose card was never requested. Cards that
+are already cached under their current fingerprint are skipped.
+
+    OG_CACHE_DIR=/var/cache/og PYTHONPATH=. python scripts/prerender_og.py --workers 4
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app import settings
+from app.database import DATABASE_URL
+from app.models import Session as SessionModel
+from app.og.cache import OGImageCache
+from app.og.prerender import prerender_share_card
+from app.services.scoring import ScoringError
+
+_worker_sessions: sessionmaker | None = None
+_worker_cache: OGImageCache | None = None
+
+
+def _init_worker(url: str, cache_dir: str) -> None:
+    global _worker_sessions, _worker_cache
+    connect_args = {"timeout": 60} if url.startswith("sqlite") else {}
+    engine = create_engine(url, connect_args=connect_args, pool_size=1, max_overflow=0)
+    _worker_sessions = sessionmaker(bind=engine, autoflush=False, future=True)
+    # Disk tier only: the worker process never serves the cards itself.
+    _worker_cache = OGImageCache(0, cache_dir)
+
+
+def prerender_chunk(session_ids: List[str]) -> Dict[str, int]:
+    assert _worker_sessions is not None and _worker_cache is not None, "worker not initialised"
+    counts = {"rendered": 0, "cached": 0, "skipped": 0}
+    with _worker_sessions() as db:
+        for session_id in session_ids:
+            session = db.get(SessionModel, session_id)
+            if session is None:
+                counts["skipped"] += 1
+                continue
+            try:
+                rendered = prerender_share_card(db, session, _worker_cache)
+            except ScoringError:
+                counts["skipped"] += 1
+                continue
+            counts["rendered" if rendered else "cached"] += 1
+    return counts
+
+
+def iter_active_session_chunks(url: str, chunk_size: int) -> Iterator[List[str]]:
+    engine = create_engine(url)
+    now = datetime.now(timezone.utc)
+    after = ""
+    try:
+        while True:
+            with engine.connect() as connection:
+                chunk = list(
+                    connection.execute(
+                        select(SessionModel.id)
+                        .where(SessionModel.id > after, SessionModel.expires_at > now)
+                        .order_by(SessionModel.id)
+                        .limit(chunk_size)
+                    ).scalars()
+                )
+            if not chunk:
+                return
+            yield chunk
+            after = chunk[-1]
+    finally:
+        engine.dispose()
+
+
+def prerender_all(url: str, cache_dir: str, workers: int, chunk_size: int) -> Dict[str, object]:
+    totals = {"rendered": 0, "cached": 0, "skipped": 0}
+    started = time.perf_counter()
+    chunks = iter_active_session_chunks(url, chunk_size)
+    if workers <= 1:
+        _init_worker(url, cache_dir)
+        results = map(prerender_chunk, chunks)
+        for counts in results:
+            for key, value in counts.items():
+                totals[key] += value
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(url, cache_dir)
+        ) as pool:
+            for counts in pool.map(prerender_chunk, chunks):
+                for key, value in counts.items():
+                    totals[key] += value
+
+    elapsed = time.perf_counter() - started
+    processed = sum(totals.values())
+    return {
+        **totals,
+        "elapsed_seconds": round(elapsed, 3),
+        "sessions_per_second": round(processed / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Pre-render share cards into the OG disk cache")
+    parser.add_argument("--database-url", default=DATABASE_URL, help="Database to read sessions from")
+    parser.add_argument("--cache-dir", default=settings.OG_CACHE_DIR, help="OG disk cache directory (OG_CACHE_DIR)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--chunk-size", type=int, default=100, help="Sessions per worker task")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if not args.cache_dir:
+        raise SystemExit("Set OG_CACHE_DIR or pass --cache-dir; the memory tier is per process")
+    summary = prerender_all(args.database_url, args.cache_dir, args.workers, args.chunk_size)
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
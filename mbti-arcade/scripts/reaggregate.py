@@ -0,0 +1,203 @@
+"""Recompute every session's aggregate and relation aggregates in parallel.
+
+Session ids are streamed with keyset pagination and handed to worker
+processes in chunks; each worker owns one database connection and commits
+once per chunk. Progress is checkpointed after every chunk so an
+interrupted run resumes where it stopped (use --restart to start over).
+The checkpoint is removed once a run completes, and is ignored when it was
+written for another database or another aggregation version.
+
+    PYTHONPATH=. python scripts/reaggregate.py --workers 8 --chunk-size 200
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Deque, Dict, Iterator, List, Tuple
+
+from sqlalchemy import create_engine, make_url, select
+from sqlalchemy.orm import sessionmaker
+
+from app.data.question_index import get_question_index
+from app.database import DATABASE_URL
+from app.models import Session as SessionModel
+from app.services.aggregator import (
+    AGGREGATION_VERSION,
+    recalculate_aggregate,
+    recalculate_relation_aggregates,
+)
+from app.services.scoring import ScoringError
+
+CHECKPOINT_PATH = Path(__file__).resolve().parents[1] / "logs" / "reaggregate_checkpoint.json"
+
+_worker_sessions: sessionmaker | None = None
+
+
+def _make_engine(url: str):
+    if url.startswith("sqlite"):
+        # Writers from several processes queue on SQLite's lock instead of failing.
+        return create_engine(url, connect_args={"timeout": 60}, pool_size=1, max_overflow=0)
+    return create_engine(url, pool_size=1, max_overflow=0, pool_pre_ping=True)
+
+
+def _init_worker(url: str) -> None:
+    global _worker_sessions
+    _worker_sessions = sessionmaker(bind=_make_engine(url), autoflush=False, future=True)
+
+
+def reaggregate_chunk(session_ids: List[str]) -> Dict[str, int]:
+    """Worker entry point: recompute one chunk and commit it."""
+
+    assert _worker_sessions is not None, "worker not initialised"
+    counts = {"processed": 0, "skipped": 0}
+    with _worker_sessions() as db:
+        for session_id in session_ids:
+            session = db.get(SessionModel, session_id)
+            if session is None:
+                counts["skipped"] += 1
+                continue
+            try:
+                recalculate_aggregate(db, session)
+            except ScoringError:
+                # No usable self answers yet; relation aggregates still apply.
+                counts["skipped"] += 1
+            else:
+                counts["processed"] += 1
+            recalculate_relation_aggregates(session_id, db)
+        db.commit()
+    return counts
+
+
+def iter_session_chunks(url: str, after: str, chunk_size: int) -> Iterator[List[str]]:
+    engine = _make_engine(url)
+    try:
+        while True:
+            with engine.connect() as connection:
+                chunk = list(
+                    connection.execute(
+                        select(SessionModel.id)
+                        .where(SessionModel.id > after)
+                        .order_by(SessionModel.id)
+                        .limit(chunk_size)
+                    ).scalars()
+                )
+            if not chunk:
+                return
+            yield chunk
+            after = chunk[-1]
+    finally:
+        engine.dispose()
+
+
+def checkpoint_key(url: str) -> Dict[str, str]:
+    """What a checkpoint must match to be resumed: the target and the formula."""
+
+    return {
+        "database_url": make_url(url).render_as_string(hide_password=True),
+        "aggregation_version": f"{AGGREGATION_VERSION}:{get_question_index().content_hash}",
+    }
+
+
+def _fresh_state(key: Dict[str, str]) -> Dict[str, object]:
+    return {**key, "last_session_id": "", "processed": 0, "skipped": 0}
+
+
+def load_checkpoint(path: Path, key: Dict[str, str]) -> Dict[str, object]:
+    if not path.exists():
+        return _fresh_state(key)
+    state = json.loads(path.read_text(encoding="utf-8"))
+    if any(state.get(name) != value for name, value in key.items()):
+        print(f"ignoring checkpoint {path}: written for another database or version", flush=True)
+        return _fresh_state(key)
+    return state
+
+
+def save_checkpoint(path: Path, state: Dict[str, object]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(state, indent=2), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def reaggregate(
+    url: str,
+    workers: int,
+    chunk_size: int,
+    checkpoint_path: Path,
+    restart: bool = False,
+) -> Dict[str, object]:
+    key = checkpoint_key(url)
+    state = _fresh_state(key) if restart else load_checkpoint(checkpoint_path, key)
+    started = time.perf_counter()
+    run_processed = 0
+
+    def record(chunk: List[str], counts: Dict[str, int]) -> None:
+        nonlocal run_processed
+        run_processed += counts["processed"]
+        state["processed"] = int(state["processed"]) + counts["processed"]
+        state["skipped"] = int(state["skipped"]) + counts["skipped"]
+        state["last_session_id"] = chunk[-1]
+        save_checkpoint(checkpoint_path, state)
+        elapsed = time.perf_counter() - started
+        print(
+            f"checkpoint {chunk[-1]} processed={state['processed']} "
+            f"rate={run_processed / elapsed if elapsed else 0.0:.1f} sessions/s",
+            flush=True,
+        )
+
+    chunks = iter_session_chunks(url, str(state["last_session_id"]), chunk_size)
+    if workers <= 1:
+        _init_worker(url)
+        for chunk in chunks:
+            record(chunk, reaggregate_chunk(chunk))
+    else:
+        # Chunks finish out of order; the checkpoint only advances past the
+        # oldest outstanding chunk so a resume never skips unfinished work.
+        pending: Deque[Tuple[List[str], Future]] = deque()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(url,)) as pool:
+            for chunk in chunks:
+                pending.append((chunk, pool.submit(reaggregate_chunk, chunk)))
+                while len(pending) >= workers * 2 or (pending and pending[0][1].done()):
+                    done_chunk, future = pending.popleft()
+                    record(done_chunk, future.result())
+            while pending:
+                done_chunk, future = pending.popleft()
+                record(done_chunk, future.result())
+
+    # Finished: the next run (e.g. after a formula change) starts from scratch.
+    checkpoint_path.unlink(missing_ok=True)
+    elapsed = time.perf_counter() - started
+    state["elapsed_seconds"] = round(elapsed, 3)
+    state["sessions_per_second"] = round(run_processed / elapsed, 1) if elapsed else 0.0
+    return state
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Recompute aggregates for every session")
+    parser.add_argument("--database-url", default=DATABASE_URL, help="Database to re-aggregate")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--chunk-size", type=int, default=200, help="Sessions per worker commit")
+    parser.add_argument("--checkpoint", type=Path, default=CHECKPOINT_PATH, help="Resumable checkpoint file")
+    parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    summary = reaggregate(
+        args.database_url,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        checkpoint_path=args.checkpoint,
+        restart=args.restart,
+    )
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+import atexit
 import os
+import shutil
+import tempfile
 
 import pytest
 from fastapi import FastAPI
@@ -9,6 +12,12 @@ os.environ.setdefault(
     "CANONICAL_BASE_URL",
     "https://webservice-production-c039.up.railway.app",
 )
+os.environ.setdefault("DB_LEAK_DETECTION", "raise")
+
+# Tests write sessions and answers: keep them out of the checked-in databases.
+_database_dir = tempfile.mkdtemp(prefix="perception-gap-tests-")
+atexit.register(shutil.rmtree, _database_dir, ignore_errors=True)
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_database_dir}/test.db")
 os.environ.setdefault(
     "ALLOWED_HOSTS",
     "localhost,127.0.0.1,webservice-production-c039.up.railway.app",
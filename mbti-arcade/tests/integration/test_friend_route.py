@@ -13,3 +13,24 @@ def test_untrusted_host_rejected(client):
     body = response.json()
     assert body["type"].startswith("https://")
     assert body["status"] == response.status_code
+
+
+def test_friend_submission_with_invite_registers_participant(client):
+    session = client.post("/api/sessions", json={"mode": "basic"}).json()
+
+    response = client.post(
+        "/mbti/friend",
+        data={
+            "invite_token": session["invite_token"],
+            "friend_name": "민지",
+            "relationship": "friend",
+            "responder_name": "참여자",
+        },
+        headers={"host": "testserver"},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert f'name="invite_token" value="{session["invite_token"]}"' in response.text
+    participants = client.get(f"/v1/participants/{session['invite_token']}/preview").json()["participants"]
+    assert [participant["display_name"] for participant in participants] == ["참여자"]
+    assert f'name="participant_id" value="{participants[0]["participant_id"]}"' in response.text
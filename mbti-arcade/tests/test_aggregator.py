@@ -1,18 +1,40 @@
 import math
+import tempfile
 import unittest
 from datetime import UTC, datetime, timedelta
 
 try:
-    from sqlalchemy import create_engine
+    from sqlalchemy import create_engine, event
     from sqlalchemy.orm import sessionmaker
 except ImportError:  # pragma: no cover - optional dependency guard
     SQLALCHEMY_AVAILABLE = False
 else:
     SQLALCHEMY_AVAILABLE = True
 
+from app.data.question_index import get_question_index
 from app.database import Base
-from app.models import Aggregate, OtherResponse, Question, Session, SelfResponse
-from app.services.aggregator import recalculate_aggregate
+from app.models import (
+    Aggregate,
+    AggregateState,
+    OtherResponse,
+    Participant,
+    ParticipantRelation,
+    Question,
+    RelationAggregate,
+    Session,
+    SelfResponse,
+)
+from app.services.aggregator import (
+    compute_relation_aggregates,
+    load_aggregate,
+    load_rater_contribution,
+    mark_responses_changed,
+    rater_contribution,
+    recalculate_aggregate,
+    recalculate_relation_aggregates,
+    remove_rater,
+    update_aggregate_incrementally,
+)
 from app.services.scoring import ScoringError, compute_gap_metrics, compute_norms, weight_for_relation
 
 
@@ -24,15 +46,18 @@ def _make_session():
     return session, engine
 
 
+# One positively keyed seed question per dimension (EI, SN, TF, JP).
+QUESTION_IDS = (1, 101, 201, 301)
+
+
 def _insert_questions(db_session):
-    db_session.add_all(
-        [
-            Question(id=1, code="Q1", dim="EI", sign=1, context="common", prompt_self="", prompt_other="", theme="", scenario=""),
-            Question(id=2, code="Q2", dim="SN", sign=1, context="common", prompt_self="", prompt_other="", theme="", scenario=""),
-            Question(id=3, code="Q3", dim="TF", sign=1, context="common", prompt_self="", prompt_other="", theme="", scenario=""),
-            Question(id=4, code="Q4", dim="JP", sign=1, context="common", prompt_self="", prompt_other="", theme="", scenario=""),
-        ]
-    )
+    index = get_question_index()
+    for qid in QUESTION_IDS:
+        dim, sign = index[qid]
+        assert sign == 1
+        db_session.add(
+            Question(id=qid, code=f"Q{qid}", dim=dim, sign=sign, context="common", prompt_self="", prompt_other="", theme="", scenario="")
+        )
     db_session.commit()
 
 
@@ -106,22 +131,22 @@ class AggregateRecalculationTest(unittest.TestCase):
             session.add_all(
                 [
                     SelfResponse(session_id="sess-1", question_id=1, value=5),
-                    SelfResponse(session_id="sess-1", question_id=2, value=3),
-                    SelfResponse(session_id="sess-1", question_id=3, value=1),
-                    SelfResponse(session_id="sess-1", question_id=4, value=4),
+                    SelfResponse(session_id="sess-1", question_id=101, value=3),
+                    SelfResponse(session_id="sess-1", question_id=201, value=1),
+                    SelfResponse(session_id="sess-1", question_id=301, value=4),
                 ]
             )
 
             session.add_all(
                 [
                     OtherResponse(session_id="sess-1", rater_hash="r1", question_id=1, value=1, relation_tag="friend"),
-                    OtherResponse(session_id="sess-1", rater_hash="r1", question_id=2, value=5, relation_tag="friend"),
-                    OtherResponse(session_id="sess-1", rater_hash="r1", question_id=3, value=5, relation_tag="friend"),
-                    OtherResponse(session_id="sess-1", rater_hash="r1", question_id=4, value=1, relation_tag="friend"),
+                    OtherResponse(session_id="sess-1", rater_hash="r1", question_id=101, value=5, relation_tag="friend"),
+                    OtherResponse(session_id="sess-1", rater_hash="r1", question_id=201, value=5, relation_tag="friend"),
+                    OtherResponse(session_id="sess-1", rater_hash="r1", question_id=301, value=1, relation_tag="friend"),
                     OtherResponse(session_id="sess-1", rater_hash="r2", question_id=1, value=3, relation_tag="couple"),
-                    OtherResponse(session_id="sess-1", rater_hash="r2", question_id=2, value=4, relation_tag="couple"),
-                    OtherResponse(session_id="sess-1", rater_hash="r2", question_id=3, value=2, relation_tag="couple"),
-                    OtherResponse(session_id="sess-1", rater_hash="r2", question_id=4, value=3, relation_tag="couple"),
+                    OtherResponse(session_id="sess-1", rater_hash="r2", question_id=101, value=4, relation_tag="couple"),
+                    OtherResponse(session_id="sess-1", rater_hash="r2", question_id=201, value=2, relation_tag="couple"),
+                    OtherResponse(session_id="sess-1", rater_hash="r2", question_id=301, value=3, relation_tag="couple"),
                 ]
             )
 
@@ -162,5 +187,292 @@ class AggregateRecalculationTest(unittest.TestCase):
             engine.dispose()
 
 
+@unittest.skipUnless(SQLALCHEMY_AVAILABLE, "sqlalchemy not installed")
+class IncrementalAggregateTest(unittest.TestCase):
+    def setUp(self):
+        # A file database, so that two sessions can hold separate connections.
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.engine = create_engine(f"sqlite:///{tmp.name}/aggregates.db", future=True)
+        Base.metadata.create_all(self.engine)
+        self.SessionLocal = sessionmaker(bind=self.engine, autoflush=False, autocommit=False, future=True)
+        self.db = self.SessionLocal()
+        _insert_questions(self.db)
+        self.record = Session(
+            id="sess-inc",
+            owner_id=None,
+            mode="basic",
+            invite_token="token-inc",
+            is_anonymous=True,
+            expires_at=datetime.now(UTC) + timedelta(hours=1),
+            max_raters=10,
+        )
+        self.db.add(self.record)
+        self.db.add_all(
+            [
+                SelfResponse(session_id="sess-inc", question_id=qid, value=value)
+                for qid, value in zip(QUESTION_IDS, (5, 3, 1, 4))
+            ]
+        )
+        self.db.commit()
+        self.lookup = get_question_index()
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+
+    def _submit(self, rater_hash, values, relation_tag="friend", db=None):
+        db = db or self.db
+        previous = load_rater_contribution(db, "sess-inc", rater_hash, self.lookup)
+        db.query(OtherResponse).filter(
+            OtherResponse.session_id == "sess-inc",
+            OtherResponse.rater_hash == rater_hash,
+        ).delete()
+        answers = list(zip(QUESTION_IDS, values))
+        db.add_all(
+            [
+                OtherResponse(
+                    session_id="sess-inc",
+                    rater_hash=rater_hash,
+                    question_id=qid,
+                    value=value,
+                    relation_tag=relation_tag,
+                )
+                for qid, value in answers
+            ]
+        )
+        db.flush()
+        current = rater_contribution(answers, relation_tag, self.lookup)
+        return update_aggregate_incrementally(
+            db, db.get(Session, "sess-inc"), previous=previous, current=current, lookup=self.lookup
+        )
+
+    def _assert_matches_full_rebuild(self, incremental):
+        full = recalculate_aggregate(self.db, self.record)
+        self.assertEqual(incremental.n, full.n)
+        if full.other_norm is None:
+            self.assertIsNone(incremental.other_norm)
+            return
+        for dim in ("EI", "SN", "TF", "JP"):
+            self.assertTrue(math.isclose(incremental.other_norm[dim], full.other_norm[dim], abs_tol=1e-9))
+            self.assertTrue(math.isclose(incremental.sigma[dim], full.sigma[dim], abs_tol=1e-9))
+            self.assertTrue(math.isclose(incremental.gap[dim], full.gap[dim], abs_tol=1e-9))
+        self.assertTrue(math.isclose(incremental.gap_score, full.gap_score, abs_tol=1e-7))
+
+    def test_add_replace_and_remove_match_full_rebuild(self):
+        self._submit("r1", (1, 5, 5, 1))
+        self._submit("r2", (3, 4, 2, 3), relation_tag="couple")
+        result = self._submit("r3", (5, 2, 4, 2), relation_tag="family")
+        self._assert_matches_full_rebuild(result)
+
+        result = self._submit("r2", (2, 2, 5, 5), relation_tag="couple")
+        self._assert_matches_full_rebuild(result)
+
+        result = remove_rater(self.db, self.record, "r1")
+        self.assertEqual(result.n, 2)
+        self._assert_matches_full_rebuild(result)
+
+        remove_rater(self.db, self.record, "r2")
+        result = remove_rater(self.db, self.record, "r3")
+        self.assertEqual(result.n, 0)
+        self.assertIsNone(result.gap_score)
+
+    def test_interleaved_submits_keep_every_rater(self):
+        self._submit("r1", (1, 5, 5, 1))
+        self.db.commit()
+
+        # A second request reads (and holds) the running state before the first writes.
+        other = self.SessionLocal()
+        self.addCleanup(other.close)
+        stale = other.get(AggregateState, "sess-inc")
+        self.assertEqual(stale.n, 1)
+
+        self._submit("r2", (3, 4, 2, 3), relation_tag="couple")
+        self.db.commit()
+        result = self._submit("r3", (5, 2, 4, 2), relation_tag="family", db=other)
+        other.commit()
+
+        self.assertEqual(result.n, 3)
+        self._assert_matches_full_rebuild(result)
+
+    def test_conflicting_resubmit_of_the_same_rater_is_not_double_removed(self):
+        self._submit("r1", (1, 5, 5, 1))
+        self._submit("r2", (3, 4, 2, 3), relation_tag="couple")
+        self.db.commit()
+
+        # A second request for r1 reads the state and r1's answers first...
+        other = self.SessionLocal()
+        self.addCleanup(other.close)
+        stale = other.get(AggregateState, "sess-inc")
+        previous = load_rater_contribution(other, "sess-inc", "r1", self.lookup)
+
+        # ...then r1 resubmits through another request, which commits first.
+        self._submit("r1", (5, 1, 1, 5))
+        self.db.commit()
+
+        other.query(OtherResponse).filter(
+            OtherResponse.session_id == "sess-inc", OtherResponse.rater_hash == "r1"
+        ).delete()
+        answers = list(zip(QUESTION_IDS, (2, 2, 4, 4)))
+        other.add_all(
+            [
+                OtherResponse(
+                    session_id="sess-inc",
+                    rater_hash="r1",
+                    question_id=qid,
+                    value=value,
+                    relation_tag="friend",
+                )
+                for qid, value in answers
+            ]
+        )
+        other.flush()
+        result = update_aggregate_incrementally(
+            other,
+            other.get(Session, "sess-inc"),
+            previous=previous,
+            current=rater_contribution(answers, "friend", self.lookup),
+            lookup=self.lookup,
+        )
+        other.commit()
+
+        self.assertEqual(stale.n, 2)
+        self.assertEqual(result.n, 2)
+        self.db.expire_all()
+        self._assert_matches_full_rebuild(result)
+
+    def test_missing_state_is_rebuilt_from_stored_rows(self):
+        self.db.add_all(
+            [
+                OtherResponse(session_id="sess-inc", rater_hash="legacy", question_id=qid, value=4)
+                for qid in QUESTION_IDS
+            ]
+        )
+        self.db.flush()
+        self.assertIsNone(self.db.get(AggregateState, "sess-inc"))
+
+        result = self._submit("r1", (1, 5, 5, 1))
+
+        self.assertEqual(result.n, 2)
+        self.assertEqual(self.db.get(AggregateState, "sess-inc").n, 2)
+        self._assert_matches_full_rebuild(result)
+
+    def test_load_aggregate_serves_fresh_row_and_recomputes_stale_without_writing(self):
+        self._submit("r1", (1, 5, 5, 1))
+        stored = self._submit("r2", (3, 4, 2, 3), relation_tag="couple")
+        self.db.commit()
+
+        fresh = load_aggregate(self.db, self.record)
+        self.assertFalse(self.db.dirty or self.db.new)
+        self.assertEqual(fresh.n, stored.n)
+        self.assertEqual(fresh.other_norm, stored.other_norm)
+        self.assertEqual(fresh.gap_score, stored.gap_score)
+
+        self.db.add_all(
+            [
+                OtherResponse(session_id="sess-inc", rater_hash="late", question_id=qid, value=2)
+                for qid in QUESTION_IDS
+            ]
+        )
+        mark_responses_changed(self.db, "sess-inc")
+        self.db.commit()
+
+        stale = load_aggregate(self.db, self.record)
+        self.assertEqual(stale.n, 3)
+        self.assertFalse(self.db.dirty or self.db.new)
+        row = self.db.get(Aggregate, "sess-inc")
+        self.assertEqual(row.n, 2)
+        self.assertNotEqual(row.computed_version, row.responses_version)
+
+
+@unittest.skipUnless(SQLALCHEMY_AVAILABLE, "sqlalchemy not installed")
+class RelationAggregateTest(unittest.TestCase):
+    def setUp(self):
+        self.db, self.engine = _make_session()
+        self.db.add(
+            Session(
+                id="sess-rel",
+                mode="friend",
+                invite_token="token-rel",
+                is_anonymous=True,
+                expires_at=datetime.now(UTC) + timedelta(hours=1),
+                max_raters=10,
+            )
+        )
+        self.db.commit()
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+
+    def _participant(self, relation, perceived_type=None, axes=None):
+        submitted = datetime.now(UTC) if perceived_type else None
+        self.db.add(
+            Participant(
+                session_id="sess-rel",
+                invite_token="token-rel",
+                relation=relation,
+                perceived_type=perceived_type,
+                axes_payload=axes,
+                answers_submitted_at=submitted,
+            )
+        )
+
+    def test_groups_relations_and_breaks_type_ties_by_first_seen(self):
+        axes = {"EI": 0.5, "SN": -0.25, "TF": 0.0, "JP": 0.25}
+        for mbti in ("INTP", "ENFJ", "ENFJ", "INTP", "ISTJ"):
+            self._participant(ParticipantRelation.FRIEND, mbti, axes)
+        self._participant(ParticipantRelation.FRIEND)
+        self._participant(ParticipantRelation.FAMILY, "ESTP", axes)
+        self.db.commit()
+
+        summary = recalculate_relation_aggregates("sess-rel", self.db)
+        self.db.commit()
+
+        family, friend = summary.relations
+        self.assertEqual(family.respondent_count, 1)
+        self.assertIsNone(family.top_type)
+        self.assertEqual(friend.respondent_count, 5)
+        self.assertEqual((friend.top_type, friend.second_type), ("INTP", "ENFJ"))
+        self.assertEqual((friend.top_fraction, friend.consensus), (0.4, 0.0))
+        self.assertEqual(friend.axes_payload, axes)
+
+        stored = {row.relation: row for row in self.db.query(RelationAggregate).all()}
+        self.assertEqual(stored[ParticipantRelation.FRIEND].top_type, "INTP")
+        self.assertEqual(stored[ParticipantRelation.FAMILY].respondent_count, 1)
+
+        self._participant(ParticipantRelation.FAMILY, "ESTP", axes)
+        self.db.commit()
+        recalculate_relation_aggregates("sess-rel", self.db)
+        self.db.commit()
+        self.assertEqual(self.db.query(RelationAggregate).count(), 2)
+        self.assertEqual(stored[ParticipantRelation.FAMILY].respondent_count, 2)
+
+    def test_query_count_does_not_grow_with_relations(self):
+        def count_queries():
+            statements = []
+
+            def listener(conn, cursor, statement, *args):
+                statements.append(statement)
+
+            event.listen(self.engine, "before_cursor_execute", listener)
+            try:
+                compute_relation_aggregates("sess-rel", self.db)
+            finally:
+                event.remove(self.engine, "before_cursor_execute", listener)
+            self.db.expire_all()
+            return len(statements)
+
+        self._participant(ParticipantRelation.FRIEND, "INTP", {"EI": 0.1})
+        self.db.commit()
+        baseline = count_queries()
+
+        for relation in ParticipantRelation:
+            for _ in range(3):
+                self._participant(relation, "ENFJ", {"EI": 0.2})
+        self.db.commit()
+        self.assertEqual(count_queries(), baseline)
+
+
 if __name__ == "__main__":
     unittest.main()
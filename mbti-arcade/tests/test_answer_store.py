@@ -0,0 +1,149 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app import settings
+from app.data.question_index import get_question_index
+from app.database import Base
+from app.models import AnswerPack, OtherResponse, QuestionnaireVersion, Session as SessionModel
+from app.services import answer_store
+from app.services.aggregator import recalculate_aggregate
+
+FRIEND_IDS = get_question_index().ids_for_context("common") + get_question_index().ids_for_context("friend")
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite:///:memory:", future=True)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine, autoflush=False, future=True)()
+    session.add(
+        SessionModel(
+            id="sess-pack",
+            mode="friend",
+            invite_token="token-pack",
+            expires_at=datetime.now(timezone.utc) + timedelta(hours=1),
+        )
+    )
+    session.commit()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+def _answers(offset):
+    return [(question_id, (question_id + offset) % 5 + 1) for question_id in FRIEND_IDS]
+
+
+def _submit_all(db):
+    answer_store.save_self_answers(db, "sess-pack", _answers(0))
+    for offset, tag in ((1, "friend"), (2, "family"), (3, None)):
+        answer_store.save_rater_answers(db, "sess-pack", f"r{offset}", _answers(offset), tag)
+    db.commit()
+
+
+def test_encode_decode_round_trip_is_compact():
+    index = get_question_index()
+    answers = _answers(4)
+
+    blob = answer_store.encode_answers(answers, index)
+
+    assert len(blob) < len(index)
+    assert answer_store.decode_answers(blob, index.question_ids) == sorted(answers)
+    with pytest.raises(ValueError):
+        answer_store.encode_answers([(99999, 3)], index)
+    with pytest.raises(ValueError):
+        answer_store.encode_answers([(FRIEND_IDS[0], 6)], index)
+
+
+@pytest.mark.parametrize("mode", ["dual", "packed"])
+def test_packed_modes_score_like_row_storage(db, monkeypatch, mode):
+    monkeypatch.setattr(settings, "ANSWER_STORAGE_MODE", "rows")
+    _submit_all(db)
+    expected = recalculate_aggregate(db, db.get(SessionModel, "sess-pack"))
+    db.query(OtherResponse).delete()
+    db.commit()
+
+    monkeypatch.setattr(settings, "ANSWER_STORAGE_MODE", mode)
+    _submit_all(db)
+    result = recalculate_aggregate(db, db.get(SessionModel, "sess-pack"))
+
+    assert db.query(AnswerPack).count() == 4
+    assert (db.query(OtherResponse).count() > 0) == (mode == "dual")
+    assert answer_store.count_raters(db, "sess-pack") == 3
+    assert result.n == expected.n == 3
+    assert result.other_norm == pytest.approx(expected.other_norm)
+    assert result.gap_score == pytest.approx(expected.gap_score)
+
+
+def test_dual_mode_reads_unconverted_rows_and_old_versions(db, monkeypatch):
+    monkeypatch.setattr(settings, "ANSWER_STORAGE_MODE", "rows")
+    answer_store.save_rater_answers(db, "sess-pack", "legacy", _answers(1), "friend")
+    db.commit()
+
+    monkeypatch.setattr(settings, "ANSWER_STORAGE_MODE", "dual")
+    assert answer_store.rater_exists(db, "sess-pack", "legacy")
+    assert sorted(answer_store.load_rater_answers(db, "sess-pack", "legacy").answers) == sorted(_answers(1))
+
+    old_ids = list(reversed(FRIEND_IDS))
+    db.add(QuestionnaireVersion(version="old", question_ids=json.dumps(old_ids)))
+    db.add(
+        AnswerPack(
+            session_id="sess-pack",
+            owner="old-rater",
+            questionnaire_version="old",
+            answer_values=bytes([2] * len(old_ids)),
+        )
+    )
+    db.commit()
+
+    raters = {item.rater_hash: item for item in answer_store.load_session_raters(db, "sess-pack")}
+    assert set(raters) == {"legacy", "old-rater"}
+    assert sorted(raters["old-rater"].answers) == [(question_id, 2) for question_id in sorted(FRIEND_IDS)]
+
+
+def test_rolling_back_to_rows_through_dual_and_unpack(db, monkeypatch):
+    monkeypatch.setattr(settings, "ANSWER_STORAGE_MODE", "packed")
+    _submit_all(db)
+    expected = recalculate_aggregate(db, db.get(SessionModel, "sess-pack"))
+    assert db.query(OtherResponse).count() == 0
+    assert answer_store.count_raters(db, "sess-pack") == 3
+
+    monkeypatch.setattr(settings, "ANSWER_STORAGE_MODE", "dual")
+    assert answer_store.count_raters(db, "sess-pack") == 3
+    assert answer_store.unpack_session_packs(db, "sess-pack") == 4
+    db.commit()
+    assert db.query(AnswerPack).count() == 0
+
+    monkeypatch.setattr(settings, "ANSWER_STORAGE_MODE", "rows")
+    assert answer_store.count_raters(db, "sess-pack") == 3
+    assert answer_store.rater_exists(db, "sess-pack", "r1")
+    result = recalculate_aggregate(db, db.get(SessionModel, "sess-pack"))
+    assert result.n == expected.n == 3
+    assert result.gap_score == pytest.approx(expected.gap_score)
+
+
+def test_rows_mode_never_touches_packs(db, monkeypatch):
+    monkeypatch.setattr(settings, "ANSWER_STORAGE_MODE", "rows")
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.get_bind(), "before_cursor_execute", record)
+    try:
+        _submit_all(db)
+        answer_store.count_raters(db, "sess-pack")
+        answer_store.rater_exists(db, "sess-pack", "r1")
+        answer_store.load_session_raters(db, "sess-pack")
+        answer_store.delete_rater_answers(db, "sess-pack", "r1")
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", record)
+
+    assert statements
+    assert not [statement for statement in statements if "answer_packs" in statement]
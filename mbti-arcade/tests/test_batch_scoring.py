@@ -0,0 +1,76 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app.data.questionnaire_loader import get_question_seeds
+from app.services.batch_scoring import (
+    build_answer_matrix,
+    compute_norms_batch,
+    norms_to_mbti_batch,
+    score_session,
+    seed_question_weights,
+)
+from app.services.scoring import (
+    ScoringError,
+    compute_gap_metrics,
+    compute_norms,
+    norms_to_mbti,
+    weight_for_relation,
+)
+
+SEED_LOOKUP = {seed.id: (seed.dim, seed.sign) for seed in get_question_seeds()}
+FRIEND_IDS = sorted(seed.id for seed in get_question_seeds() if seed.context in {"common", "friend"})
+
+
+def _random_answers(rng: random.Random) -> list[tuple[int, int]]:
+    return [(question_id, rng.randint(1, 5)) for question_id in FRIEND_IDS]
+
+
+def test_batch_norms_and_types_match_scalar_path_exactly():
+    rng = random.Random(7)
+    raters = [_random_answers(rng) for _ in range(200)]
+
+    matrix, accepted = build_answer_matrix(raters, seed_question_weights())
+    scores = compute_norms_batch(matrix, seed_question_weights(), accepted)
+
+    expected = [compute_norms(answers, SEED_LOOKUP) for answers in raters]
+    assert scores.norm_dicts() == expected
+    assert norms_to_mbti_batch(scores.norms) == [norms_to_mbti(norms) for norms in expected]
+
+
+def test_batch_session_metrics_match_scalar_path_exactly():
+    rng = random.Random(11)
+    raters = [_random_answers(rng) for _ in range(500)]
+    tags = [rng.choice(["friend", "couple", "family", None]) for _ in raters]
+    self_norm = compute_norms(_random_answers(rng), SEED_LOOKUP)
+
+    batch = score_session(self_norm, raters, [weight_for_relation(tag) for tag in tags])
+
+    other_norms = [compute_norms(answers, SEED_LOOKUP) for answers in raters]
+    weights = [weight_for_relation(tag) for tag in tags]
+    agg_other, sigma, gap, gap_score = compute_gap_metrics(self_norm, other_norms, weights)
+
+    assert batch.n == len(raters)
+    assert batch.other_norm == agg_other
+    assert batch.sigma == sigma
+    assert batch.gap == gap
+    assert batch.gap_score == gap_score
+
+
+def test_batch_marks_raters_rejected_by_scalar_path_invalid():
+    rng = random.Random(3)
+    good = _random_answers(rng)
+    unknown_question = good + [(99999, 3)]
+    missing_dimension = [(qid, value) for qid, value in good if SEED_LOOKUP[qid][0] != "JP"]
+
+    for answers in (unknown_question, missing_dimension):
+        with pytest.raises(ScoringError):
+            compute_norms(answers, SEED_LOOKUP)
+
+    batch = score_session(None, [good, unknown_question, missing_dimension], [1.0, 1.0, 1.0])
+
+    assert batch.scores.valid.tolist() == [True, False, False]
+    assert batch.scores.norm_dicts()[1:] == [None, None]
+    assert batch.other_norm is None
@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import OtherResponse, Session as SessionModel
+from app.services.bulk_writer import replace_answers
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite:///:memory:", future=True)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine, autoflush=False, future=True)()
+    session.add(
+        SessionModel(
+            id="sess-bulk",
+            mode="friend",
+            invite_token="token-bulk",
+            expires_at=datetime.now(timezone.utc) + timedelta(hours=1),
+        )
+    )
+    session.commit()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+def _rows(db, rater_hash):
+    return {
+        row.question_id: (row.value, row.relation_tag)
+        for row in db.query(OtherResponse)
+        .filter(OtherResponse.session_id == "sess-bulk", OtherResponse.rater_hash == rater_hash)
+        .all()
+    }
+
+
+def test_replace_answers_upserts_and_drops_stale_questions(db):
+    scope = {"session_id": "sess-bulk", "rater_hash": "r1"}
+    replace_answers(db, OtherResponse, scope, [(1, 5), (2, 4), (3, 1)], extra={"relation_tag": "friend"})
+    replace_answers(db, OtherResponse, {**scope, "rater_hash": "r2"}, [(1, 2)])
+    db.commit()
+    assert _rows(db, "r1") == {1: (5, "friend"), 2: (4, "friend"), 3: (1, "friend")}
+
+    replace_answers(db, OtherResponse, scope, [(1, 1), (2, 4)], extra={"relation_tag": "family"})
+    db.commit()
+
+    assert _rows(db, "r1") == {1: (1, "family"), 2: (4, "family")}
+    assert _rows(db, "r2") == {1: (2, None)}
+
+
+def test_replace_answers_refreshes_rows_loaded_in_the_session(db):
+    scope = {"session_id": "sess-bulk", "rater_hash": "r1"}
+    replace_answers(db, OtherResponse, scope, [(1, 5)])
+    loaded = db.get(OtherResponse, ("sess-bulk", "r1", 1))
+    assert loaded.value == 5
+
+    replace_answers(db, OtherResponse, scope, [(1, 2)])
+
+    assert loaded.value == 2
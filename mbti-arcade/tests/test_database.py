@@ -0,0 +1,46 @@
+import pytest
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app import database, settings
+
+
+def test_sqlite_engine_gets_pragmas_and_shared_by_url(tmp_path):
+    url = f"sqlite:///{tmp_path / 'registry.db'}"
+    engine = database.register_engine("test-registry", url)
+    try:
+        assert database.register_engine("test-registry-alias", url) is engine
+
+        with engine.connect() as connection:
+            pragma = lambda name: connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+            assert pragma("journal_mode") == "wal"
+            assert pragma("synchronous") == 1  # NORMAL
+            assert pragma("busy_timeout") == settings.SQLITE_BUSY_TIMEOUT_MS
+            assert pragma("cache_size") == -settings.SQLITE_CACHE_SIZE_KIB
+
+        checkpoints = database.checkpoint_wal()
+        assert checkpoints["test-registry"]["busy"] == 0
+    finally:
+        engine.dispose()
+
+
+def test_pool_metrics_count_in_use_and_timeouts(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_TIMEOUT_SECONDS", 0.05)
+    url = f"sqlite:///{tmp_path / 'pool.db'}"
+    engine = database.register_engine("test-pool", url, pool_size=1, max_overflow=0)
+    try:
+        held = engine.connect()
+        metrics = database.pool_metrics()["test-pool"]
+        assert metrics["size"] == 1
+        assert metrics["in_use"] == 1
+        assert metrics["checkouts_total"] == 1
+
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+        held.close()
+
+        metrics = database.pool_metrics()["test-pool"]
+        assert metrics["in_use"] == 0
+        assert metrics["timeouts_total"] == 1
+        assert metrics["checkout_wait"]["max_ms"] >= 50
+    finally:
+        engine.dispose()
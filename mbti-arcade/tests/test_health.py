@@ -46,3 +46,23 @@ def test_readyz_succeeds_when_dependencies_are_healthy(client, monkeypatch):
     assert payload["status"] == "ready"
     assert payload["checks"]["redis"]["status"] == "ok"
     assert payload["checks"]["database"]["status"] == "ok"
+
+
+def test_metricsz_reports_og_render_pool(client):
+    from app.data.questions import questions_for_mode
+    from app.og import get_og_cache
+
+    session = client.post("/api/sessions", json={"mode": "basic"}).json()
+    answers = [{"question_id": q["id"], "value": 3} for q in questions_for_mode("basic")]
+    client.post("/api/self/submit", json={"session_id": session["session_id"], "answers": answers})
+    get_og_cache().clear()
+    assert client.get(f"/share/og/{session['invite_token']}.png").status_code == 200
+
+    response = client.get("/metricsz")
+    assert response.status_code == 200
+    pool = response.json()["og_render_pool"]
+    assert pool is not None
+    assert {"utilization", "queue_wait", "render", "rejected_total"} <= set(pool)
+
+    pools = response.json()["database_pools"]
+    assert {"in_use", "checkouts_total", "timeouts_total", "checkout_wait"} <= set(pools["default"])
@@ -73,3 +73,497 @@ def test_og_image_after_unlock_includes_headers(client):
     assert response.headers["Cache-Control"].startswith("public")
     width, height = _extract_dimensions(response.content)
     assert (width, height) == (1200, 630)
+
+
+def _reference_canvas(width, height, bg, rects, texts):
+    # Per-pixel rasterization the span-based Canvas must match byte for byte.
+    from app.og.font import FONT_5X7
+
+    rows = [bytearray(bytes(bg) * width) for _ in range(height)]
+
+    def put(x, y, color):
+        if 0 <= x < width and 0 <= y < height:
+            rows[y][x * 4 : x * 4 + 4] = bytes(color)
+
+    for x, y, w, h, color in rects:
+        for yy in range(y, y + h):
+            for xx in range(x, x + w):
+                put(xx, yy, color)
+    for x, y, text, color, scale in texts:
+        cursor = x
+        for char in text.upper():
+            glyph = FONT_5X7.get(char)
+            if glyph is None:
+                cursor += 6 * scale
+                continue
+            for gy, line in enumerate(glyph):
+                for gx, cell in enumerate(line):
+                    if cell == "#":
+                        for sy in range(scale):
+                            for sx in range(scale):
+                                put(cursor + gx * scale + sx, y + gy * scale + sy, color)
+            cursor += (len(glyph[0]) + 1) * scale
+    return rows
+
+
+def test_span_rasterizer_matches_per_pixel_reference():
+    from app.og.image import Canvas
+
+    bg = (15, 23, 42, 255)
+    rects = [
+        (-5, -3, 40, 12, (17, 99, 255, 255)),
+        (70, 50, 100, 30, (71, 85, 105, 255)),
+        (150, 10, 0, 10, (1, 2, 3, 255)),
+    ]
+    texts = [
+        (-7, -4, "Gap 99% (k)", (236, 252, 255, 255), 3),
+        (10, 30, "360me — ok?", (18, 184, 166, 255), 2),
+        (140, 70, "edge", (148, 163, 184, 255), 4),
+    ]
+
+    canvas = Canvas(160, 90, bg)
+    for x, y, w, h, color in rects:
+        canvas.fill_rect(x, y, w, h, color)
+    for x, y, text, color, scale in texts:
+        canvas.draw_text(x, y, text, color, scale=scale)
+
+    expected = Canvas(160, 90, rows=_reference_canvas(160, 90, bg, rects, texts))
+    assert canvas.rows == expected.rows
+    assert canvas.to_png() == expected.to_png()
+
+
+def _inside_even_odd(points, px, py):
+    inside = False
+    for index, (x0, y0) in enumerate(points):
+        x1, y1 = points[(index + 1) % len(points)]
+        if y0 == y1:
+            continue
+        if y0 > y1:
+            x0, y0, x1, y1 = x1, y1, x0, y0
+        if y0 <= py < y1 and x0 + (py - y0) * (x1 - x0) / (y1 - y0) <= px:
+            inside = not inside
+    return inside
+
+
+def _bresenham(x0, y0, x1, y1):
+    dx, dy = abs(x1 - x0), -abs(y1 - y0)
+    sx, sy = (1 if x0 < x1 else -1), (1 if y0 < y1 else -1)
+    error = dx + dy
+    while True:
+        yield x0, y0
+        if (x0, y0) == (x1, y1):
+            return
+        doubled = 2 * error
+        if doubled >= dy:
+            error += dy
+            x0 += sx
+        if doubled <= dx:
+            error += dx
+            y0 += sy
+
+
+def test_polygon_fill_and_lines_match_per_pixel_reference():
+    from app.og.image import Canvas
+
+    bg = (15, 23, 42, 255)
+    fill = (18, 184, 166, 255)
+    line = (236, 252, 255, 255)
+    polygons = [
+        [(40.0, 5.0), (75.5, 40.0), (40.0, 70.25), (4.5, 40.0)],
+        [(-10.0, -10.0), (30.0, 0.0), (12.0, 25.0)],
+        # Self-intersecting star exercises the even-odd rule.
+        [(100.0, 2.0), (112.0, 60.0), (82.0, 22.0), (118.0, 22.0), (88.0, 60.0)],
+        [(130.0, 50.0), (170.0, 50.0), (170.0, 50.0)],
+    ]
+    lines = [(0, 0, 159, 89), (150, 5, 120, 80), (5, 85, 60, 85), (70, 10, 70, 45), (140, 88, 10, 60)]
+
+    canvas = Canvas(160, 90, bg)
+    expected = [bytearray(bytes(bg) * 160) for _ in range(90)]
+    for points in polygons:
+        canvas.fill_polygon(points, fill)
+        for y in range(90):
+            for x in range(160):
+                if _inside_even_odd(points, x + 0.5, y + 0.5):
+                    expected[y][x * 4 : x * 4 + 4] = bytes(fill)
+    for x0, y0, x1, y1 in lines:
+        canvas.draw_line(x0, y0, x1, y1, line)
+        for x, y in _bresenham(x0, y0, x1, y1):
+            if 0 <= x < 160 and 0 <= y < 90:
+                expected[y][x * 4 : x * 4 + 4] = bytes(line)
+
+    assert canvas.rows == expected
+
+
+def test_share_card_draws_radar_from_aggregate():
+    from types import SimpleNamespace
+
+    from app.og import render_share_card, share_card_fingerprint
+
+    session = SimpleNamespace(id="session-radar", mode="friend", updated_at=None, snapshot_owner_name=None)
+
+    def aggregate(other_ei):
+        return SimpleNamespace(
+            n=4,
+            gap_score=20.0,
+            radar_self={"EI": 80.0, "SN": 40.0, "TF": 65.0, "JP": 30.0},
+            radar_other={"EI": other_ei, "SN": 70.0, "TF": 35.0, "JP": 60.0},
+        )
+
+    assert share_card_fingerprint(session, aggregate(55.0)) != share_card_fingerprint(session, aggregate(75.0))
+    # Sub-unit noise does not change the card or its fingerprint.
+    assert share_card_fingerprint(session, aggregate(55.0)) == share_card_fingerprint(session, aggregate(55.2))
+    assert render_share_card(session, aggregate(55.0)) != render_share_card(session, aggregate(75.0))
+
+
+def _decode_indexed_png(png: bytes):
+    import zlib
+
+    chunks = {}
+    offset = 8
+    while offset < len(png):
+        length = int.from_bytes(png[offset : offset + 4], "big")
+        chunk_type = png[offset + 4 : offset + 8]
+        chunks[chunk_type] = png[offset + 8 : offset + 8 + length]
+        offset += 12 + length
+
+    header = chunks[b"IHDR"]
+    width = int.from_bytes(header[0:4], "big")
+    height = int.from_bytes(header[4:8], "big")
+    bit_depth, color_type = header[8], header[9]
+    assert color_type == 3
+    plte = chunks[b"PLTE"]
+    alphas = chunks.get(b"tRNS", b"")
+    palette = [
+        bytes(plte[i * 3 : i * 3 + 3]) + (alphas[i : i + 1] or b"\xff")
+        for i in range(len(plte) // 3)
+    ]
+
+    raw = zlib.decompress(chunks[b"IDAT"])
+    stride = (width * bit_depth + 7) // 8
+    rows = []
+    for y in range(height):
+        line = raw[y * (stride + 1) : (y + 1) * (stride + 1)]
+        assert line[0] == 0
+        if bit_depth == 4:
+            indices = [nibble for byte in line[1:] for nibble in (byte >> 4, byte & 0x0F)][:width]
+        else:
+            indices = list(line[1:])
+        rows.append(bytearray(b"".join(palette[index] for index in indices)))
+    return bit_depth, rows
+
+
+def test_indexed_canvas_decodes_to_same_pixels_as_rgba():
+    from app.og.image import Canvas
+
+    colors = [(15, 23, 42, 255), (17, 99, 255, 255), (18, 184, 166, 128)]
+    for width, extra_colors in ((33, 0), (32, 20)):
+        rgba = Canvas(width, 12, colors[0])
+        indexed = Canvas(width, 12, colors[0], palette=colors[:1])
+        for canvas in (rgba, indexed):
+            canvas.fill_rect(3, 2, 20, 5, colors[1])
+            canvas.draw_text(1, 4, "K3", colors[2], scale=1)
+            for shade in range(extra_colors):
+                canvas.set_pixel(shade, 11, (shade, shade, shade, 255))
+
+        bit_depth, rows = _decode_indexed_png(indexed.to_png())
+        assert bit_depth == (4 if extra_colors == 0 else 8)
+        assert rows == rgba.rows
+        assert len(indexed.rows[0]) == width
+
+
+def test_precompressed_bands_stitch_into_valid_png():
+    import zlib
+
+    from app.og.image import Canvas, _adler32_combine
+
+    assert _adler32_combine(zlib.adler32(b"static"), zlib.adler32(b"dynamic"), 7) == zlib.adler32(
+        b"staticdynamic"
+    )
+
+    for palette in ([(15, 23, 42, 255), (17, 99, 255, 255)], None):
+        template = Canvas(90, 70, (15, 23, 42, 255), palette=palette)
+        template.fill_rect(5, 5, 80, 60, (17, 99, 255, 255))
+        template.draw_text(8, 8, "HEADER", (148, 163, 184, 255), scale=1)
+        template.precompress_bands(band_height=8)
+
+        untouched = template.clone()
+        drawn = template.clone()
+        drawn.draw_text(8, 30, "GAP 12.5", (236, 252, 255, 255), scale=2)
+        drawn.fill_polygon([(60.0, 20.0), (85.0, 45.0), (60.0, 69.0)], (18, 184, 166, 255))
+        for canvas in (untouched, drawn):
+            png = canvas.to_png()
+            plain = Canvas(90, 70, rows=canvas.rows, palette=canvas.palette).to_png()
+            assert png != plain
+            if palette is None:
+                assert zlib.decompress(png[png.index(b"IDAT") + 4 :]) == zlib.decompress(
+                    plain[plain.index(b"IDAT") + 4 :]
+                )
+            else:
+                assert _decode_indexed_png(png) == _decode_indexed_png(plain)
+
+
+def test_share_card_uses_indexed_png(client):
+    session = _create_session(client)
+    _submit_self(client, session["session_id"])
+
+    response = client.get(f"/share/og/{session['invite_token']}.png")
+    assert response.status_code == 200
+    header = response.content[16:29]
+    assert (header[8], header[9]) == (4, 3)
+
+
+def _wait_for_render_pool(timeout: float = 5.0) -> None:
+    import time
+
+    from app.og.pool import get_render_pool
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        snapshot = get_render_pool().snapshot()
+        if snapshot["active"] == 0 and snapshot["queued"] == 0:
+            return
+        time.sleep(0.01)
+    raise AssertionError("render pool did not drain")
+
+
+def _submit_other_with_key(client, token: str, rater_key: str) -> None:
+    response = client.post(
+        "/api/other/submit",
+        json={
+            "invite_token": token,
+            "relation_tag": "friend",
+            "rater_key": rater_key,
+            "answers": _answers("basic"),
+        },
+    )
+    assert response.status_code == 201
+
+
+def test_og_image_conditional_get_skips_rendering(client, monkeypatch):
+    from app.og import get_og_cache
+    from app.routers import og as og_router
+
+    session = _create_session(client)
+    _submit_self(client, session["session_id"])
+    _wait_for_render_pool()
+    get_og_cache().clear()
+
+    renders = []
+    real_render = og_router.render_share_card
+
+    def counting_render(*args, **kwargs):
+        renders.append(args)
+        return real_render(*args, **kwargs)
+
+    monkeypatch.setattr(og_router, "render_share_card", counting_render)
+    url = f"/share/og/{session['invite_token']}.png"
+
+    first = client.get(url)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+
+    cached = client.get(url)
+    assert cached.content == first.content
+    assert cached.headers["ETag"] == etag
+
+    not_modified = client.get(url, headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["ETag"] == etag
+    assert not_modified.headers["X-Robots-Tag"] == NOINDEX_VALUE
+    assert len(renders) == 1
+
+    for suffix in range(3):
+        _submit_other_with_key(client, session["invite_token"], f"r{suffix}")
+    _wait_for_render_pool()
+
+    # The submissions prerendered the new card, so the route still renders nothing.
+    changed = client.get(url, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert len(renders) == 1
+
+
+def test_og_cache_evicts_least_recently_used_and_reads_disk_tier(tmp_path):
+    from app.og import OGImageCache
+
+    cache = OGImageCache(max_entries=2, disk_dir=tmp_path)
+    cache.put("a", b"A")
+    cache.put("b", b"B")
+    assert cache.get("a") == b"A"
+    cache.put("c", b"C")
+    assert len(cache) == 2
+
+    memory_only = OGImageCache(max_entries=2)
+    memory_only.put("a", b"A")
+    memory_only.put("b", b"B")
+    memory_only.get("a")
+    memory_only.put("c", b"C")
+    assert memory_only.get("b") is None
+    assert memory_only.get("a") == b"A"
+
+    restarted = OGImageCache(max_entries=2, disk_dir=tmp_path)
+    assert restarted.get("b") == b"B"
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["a.png", "b.png", "c.png"]
+
+
+def test_render_pool_rejects_beyond_queue_limit_and_reports_metrics():
+    import asyncio
+    import threading
+
+    import pytest
+
+    from app.og.pool import RenderPool, RenderPoolSaturated
+
+    pool = RenderPool(workers=1, queue_limit=1)
+    release = threading.Event()
+
+    async def scenario():
+        blocked = asyncio.ensure_future(pool.run(release.wait, 5))
+        queued = asyncio.ensure_future(pool.run(lambda: "queued"))
+        await asyncio.sleep(0.05)
+        with pytest.raises(RenderPoolSaturated):
+            await pool.run(lambda: "rejected")
+        busy = pool.snapshot()
+        release.set()
+        return busy, await blocked, await queued
+
+    try:
+        busy, first, second = asyncio.run(scenario())
+    finally:
+        release.set()
+        pool.shutdown()
+
+    assert (first, second) == (True, "queued")
+    assert (busy["active"], busy["queued"], busy["utilization"]) == (1, 1, 1.0)
+    assert busy["rejected_total"] == 1
+    idle = pool.snapshot()
+    assert (idle["active"], idle["queued"], idle["completed_total"]) == (0, 0, 2)
+    assert idle["queue_wait"]["max_ms"] >= 0
+
+
+def test_og_image_returns_503_when_render_pool_saturated(client, monkeypatch):
+    from app.og import get_og_cache
+    from app.og.pool import RenderPoolSaturated
+    from app.routers import og as og_router
+
+    class SaturatedPool:
+        async def run(self, fn, *args):
+            raise RenderPoolSaturated("busy")
+
+    session = _create_session(client)
+    _submit_self(client, session["session_id"])
+    _wait_for_render_pool()
+    get_og_cache().clear()
+    monkeypatch.setattr(og_router, "get_render_pool", lambda: SaturatedPool())
+
+    response = client.get(f"/share/og/{session['invite_token']}.png")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "2"
+    assert response.json()["type"].endswith("/og-render-busy")
+
+
+def test_submissions_prerender_share_card(client, monkeypatch):
+    from app.og import get_og_cache
+    from app.routers import og as og_router
+
+    get_og_cache().clear()
+    session = _create_session(client)
+    _submit_self(client, session["session_id"])
+    _submit_other_with_key(client, session["invite_token"], "prerender")
+    _wait_for_render_pool()
+    assert len(get_og_cache()) >= 1
+
+    def fail_render(*args, **kwargs):
+        raise AssertionError("card should have been prerendered")
+
+    monkeypatch.setattr(og_router, "render_share_card", fail_render)
+    for suffix in ("png", "twitter.png", "square.png"):
+        response = client.get(f"/share/og/{session['invite_token']}.{suffix}")
+        assert response.status_code == 200
+        assert response.content.startswith(b"\x89PNG\r\n\x1a\n")
+
+
+def test_og_image_variants_have_own_size_and_etag(client):
+    session = _create_session(client)
+    _submit_self(client, session["session_id"])
+    base = f"/share/og/{session['invite_token']}"
+
+    etags = set()
+    for suffix, size in (
+        ("png", (1200, 630)),
+        ("og.png", (1200, 630)),
+        ("twitter.png", (1200, 600)),
+        ("square.png", (1080, 1080)),
+    ):
+        response = client.get(f"{base}.{suffix}")
+        assert response.status_code == 200
+        assert _extract_dimensions(response.content) == size
+        assert response.headers["X-Robots-Tag"] == NOINDEX_VALUE
+        etags.add(response.headers["ETag"])
+    # ".png" and ".og.png" are the same card.
+    assert len(etags) == 3
+
+    unknown = client.get(f"{base}.banner.png")
+    assert unknown.status_code == 404
+    assert unknown.json()["type"].endswith("/og-variant-not-found")
+
+
+def test_font_atlas_covers_ascii_and_hangul_syllables():
+    from app.og.atlas import ATLAS_PATH, FontAtlas, get_font_atlas
+    from app.og.font import FONT_5X7
+
+    atlas = get_font_atlas()
+    assert ATLAS_PATH.stat().st_size < 400_000
+    assert all(chr(codepoint) in atlas for codepoint in range(0xAC00, 0xD7A4))
+    assert "ㅋ" in atlas and "😀" not in atlas
+
+    for char, rows in FONT_5X7.items():
+        advance, bits = atlas.glyph(char)
+        assert advance == len(rows[0])
+        decoded = ["".join("#" if value & (1 << (15 - i)) else " " for i in range(len(row))) for value, row in zip(bits, rows)]
+        assert decoded == list(rows)
+
+    reopened = FontAtlas.open(ATLAS_PATH)
+    assert reopened.glyph("한") == atlas.glyph("한")
+    assert any(atlas.glyph("한")[1])
+
+
+def test_canvas_draws_hangul_text():
+    from app.og.image import Canvas
+
+    bg = (0, 0, 0, 255)
+    blank = Canvas(120, 20, bg)
+    korean = Canvas(120, 20, bg)
+    unknown = Canvas(120, 20, bg)
+    korean.draw_text(0, 0, "친구 가족", (255, 255, 255, 255), scale=1)
+    unknown.draw_text(0, 0, "😀😀", (255, 255, 255, 255), scale=1)
+
+    assert korean.rows != blank.rows
+    assert unknown.rows == blank.rows
+
+
+def test_share_card_renders_korean_owner_name():
+    from types import SimpleNamespace
+
+    from app.og import render_share_card, share_card_fingerprint
+
+    def card(owner_name):
+        session = SimpleNamespace(
+            id="session-hangul",
+            mode="friend",
+            updated_at=None,
+            snapshot_owner_name=owner_name,
+        )
+        aggregate = SimpleNamespace(
+            n=3,
+            gap_score=12.5,
+            radar_self={"EI": 70.0, "SN": 40.0, "TF": 55.0, "JP": 30.0},
+            radar_other={"EI": 50.0, "SN": 65.0, "TF": 35.0, "JP": 60.0},
+        )
+        return share_card_fingerprint(session, aggregate), render_share_card(session, aggregate)
+
+    named_fingerprint, named = card("김민지")
+    anonymous_fingerprint, anonymous = card(None)
+    assert named_fingerprint != anonymous_fingerprint
+    assert named != anonymous
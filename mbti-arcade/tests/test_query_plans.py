@@ -0,0 +1,168 @@
+"""EXPLAIN QUERY PLAN guard for the hot statements.
+
+Each statement mirrors a query on a request path. The test fails when
+SQLite would answer one of them with a full table scan (``SCAN <table>``
+without an index), or, for the ordered ones, with a temp B-tree sort.
+"""
+
+import re
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+import app.couple.models  # noqa: F401 - registers the couple tables
+from app.couple.models import AuditEvent, CoupleParticipant, CoupleResponse, CoupleSession
+from app.database import Base
+from app.models import (
+    Aggregate,
+    AnswerPack,
+    OtherResponse,
+    Participant,
+    ParticipantRelation,
+    Session as SessionModel,
+)
+
+_FULL_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)(?: AS \w+)?$")
+
+NOW = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture(scope="module")
+def db(tmp_path_factory):
+    engine = create_engine(f"sqlite:///{tmp_path_factory.mktemp('plans') / 'plans.db'}", future=True)
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        for index in range(40):
+            session_id = f"s-{index:04d}"
+            session.add(
+                SessionModel(
+                    id=session_id,
+                    mode="basic",
+                    invite_token=f"invite-{index}",
+                    expires_at=NOW + timedelta(days=7),
+                    updated_at=NOW + timedelta(minutes=index),
+                )
+            )
+            session.add(Aggregate(session_id=session_id, n=index % 6))
+            for rater in range(5):
+                session.add(
+                    Participant(
+                        session_id=session_id,
+                        invite_token=f"invite-{index}",
+                        relation=ParticipantRelation.FRIEND,
+                    )
+                )
+                session.add(
+                    OtherResponse(
+                        session_id=session_id,
+                        rater_hash=f"rater-{rater}",
+                        question_id=1,
+                        value=3,
+                        relation_tag="friend",
+                    )
+                )
+            couple = CoupleSession(id=f"c-{index:04d}")
+            session.add(couple)
+            for role in ("A", "B"):
+                session.add(CoupleParticipant(session=couple, role=role))
+            for event in range(5):
+                session.add(
+                    AuditEvent(
+                        session_id=couple.id,
+                        event_type="test",
+                        hash=f"{index}-{event}",
+                        created_at=NOW + timedelta(seconds=event),
+                    )
+                )
+        session.commit()
+        yield session
+    engine.dispose()
+
+
+HOT_STATEMENTS = {
+    "participants capacity count": (
+        select(func.count(Participant.id)).where(Participant.session_id == "s-0001"),
+        False,
+    ),
+    "relation aggregates": (
+        select(Participant.relation, Participant.perceived_type)
+        .where(Participant.session_id == "s-0001")
+        .order_by(Participant.id),
+        True,
+    ),
+    "participant preview": (
+        select(Participant).where(Participant.session_id == "s-0001").order_by(Participant.created_at),
+        False,
+    ),
+    "result preview": (
+        select(SessionModel)
+        .join(Aggregate, Aggregate.session_id == SessionModel.id)
+        .where(Aggregate.n >= 3)
+        .order_by(SessionModel.updated_at.desc())
+        .limit(1),
+        True,
+    ),
+    "session by invite token": (
+        select(SessionModel).where(SessionModel.invite_token == "invite-1"),
+        False,
+    ),
+    "rater count": (
+        select(func.count(func.distinct(OtherResponse.rater_hash))).where(
+            OtherResponse.session_id == "s-0001"
+        ),
+        False,
+    ),
+    "packed rater count": (
+        select(func.count()).where(
+            AnswerPack.session_id == "s-0001", AnswerPack.owner != "self"
+        ),
+        False,
+    ),
+    "rater exists": (
+        select(OtherResponse.rater_hash)
+        .where(OtherResponse.session_id == "s-0001", OtherResponse.rater_hash == "rater-1")
+        .limit(1),
+        False,
+    ),
+    "audit chain head": (
+        select(AuditEvent)
+        .where(AuditEvent.session_id == "c-0001")
+        .order_by(AuditEvent.created_at.desc(), AuditEvent.id.desc())
+        .limit(1),
+        True,
+    ),
+    "couple responses of participant": (
+        select(CoupleResponse).where(
+            CoupleResponse.session_id == "c-0001",
+            CoupleResponse.participant_id == 1,
+            CoupleResponse.kind == "self",
+        ),
+        False,
+    ),
+    "couple participant by token": (
+        select(CoupleParticipant).where(
+            CoupleParticipant.session_id == "c-0001",
+            CoupleParticipant.access_token == "token",
+        ),
+        False,
+    ),
+}
+
+
+def _plan(db: Session, statement) -> list[str]:
+    compiled = statement.compile(db.get_bind(), compile_kwargs={"literal_binds": True})
+    rows = db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}").all()
+    return [row[-1] for row in rows]
+
+
+@pytest.mark.parametrize("name", sorted(HOT_STATEMENTS))
+def test_hot_statement_uses_an_index(db, name):
+    statement, ordered = HOT_STATEMENTS[name]
+    plan = _plan(db, statement)
+
+    full_scans = [detail for detail in plan if _FULL_SCAN.match(detail)]
+    assert not full_scans, f"{name}: full table scan in {plan}"
+    if ordered:
+        assert not any("TEMP B-TREE" in detail for detail in plan), f"{name}: sorts in {plan}"
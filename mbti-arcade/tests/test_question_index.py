@@ -0,0 +1,24 @@
+from app.data.question_index import get_question_index
+from app.data.questionnaire_loader import get_question_seeds
+
+
+def test_index_matches_seed_dim_sign_and_context():
+    index = get_question_index()
+    seeds = list(get_question_seeds())
+
+    assert len(index) == len(seeds)
+    assert list(index) == sorted(seed.id for seed in seeds)
+    for seed in seeds:
+        assert index[seed.id] == (seed.dim, seed.sign)
+        assert index.context_of(seed.id) == seed.context
+        assert index.question_ids[index.ordinals[seed.id]] == seed.id
+
+
+def test_index_rejects_unknown_ids_and_is_shared():
+    index = get_question_index()
+
+    assert 0 not in index
+    assert -1 not in index
+    assert 99999 not in index
+    assert index.get(99999) is None
+    assert get_question_index() is index
@@ -0,0 +1,76 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.data.questions import questions_for_mode
+from app.database import Base
+from app.models import Session as SessionModel
+from app.services import answer_store
+from scripts import reaggregate as script
+
+SESSION_IDS = ("sess-a", "sess-b", "sess-c")
+# Sorts last and has no self answers, so it is skipped, not processed.
+UNANSWERED_ID = "sess-d"
+
+
+@pytest.fixture
+def database_url(tmp_path):
+    url = f"sqlite:///{tmp_path / 'reaggregate.db'}"
+    engine = create_engine(url, future=True)
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine, future=True)() as db:
+        for session_id in SESSION_IDS + (UNANSWERED_ID,):
+            db.add(
+                SessionModel(
+                    id=session_id,
+                    mode="basic",
+                    invite_token=f"token-{session_id}",
+                    expires_at=datetime.now(timezone.utc) + timedelta(hours=1),
+                )
+            )
+        answers = [(question["id"], 3) for question in questions_for_mode("basic")]
+        for session_id in SESSION_IDS:
+            answer_store.save_self_answers(db, session_id, answers)
+        db.commit()
+    engine.dispose()
+    return url
+
+
+def _run(url, checkpoint):
+    return script.reaggregate(url, workers=1, chunk_size=2, checkpoint_path=checkpoint)
+
+
+def test_completed_run_clears_its_checkpoint(database_url, tmp_path):
+    checkpoint = tmp_path / "checkpoint.json"
+
+    summary = _run(database_url, checkpoint)
+    assert (summary["processed"], summary["skipped"]) == (len(SESSION_IDS), 1)
+    assert not checkpoint.exists()
+    # A second full run (e.g. after a formula change) does the work again.
+    assert _run(database_url, checkpoint)["processed"] == len(SESSION_IDS)
+
+
+def test_resumes_only_a_matching_checkpoint(database_url, tmp_path):
+    checkpoint = tmp_path / "checkpoint.json"
+    key = script.checkpoint_key(database_url)
+    script.save_checkpoint(
+        checkpoint, {**key, "last_session_id": "sess-a", "processed": 1, "skipped": 0}
+    )
+
+    summary = _run(database_url, checkpoint)
+    assert summary["processed"] == len(SESSION_IDS)  # 1 carried over + 2 resumed
+
+    for stale in ({"database_url": "sqlite:///elsewhere.db"}, {"aggregation_version": "0:old"}):
+        script.save_checkpoint(
+            checkpoint, {**key, **stale, "last_session_id": "sess-c", "processed": 3, "skipped": 0}
+        )
+        assert _run(database_url, checkpoint)["processed"] == len(SESSION_IDS)
+        assert not checkpoint.exists()
+
+
+def test_checkpoint_hides_database_password():
+    key = script.checkpoint_key("postgresql://app:secret@db/perception")
+    assert "secret" not in json.dumps(key)
@@ -0,0 +1,137 @@
+import threading
+
+import pytest
+
+from app import settings
+from app.services import recompute
+from app.services.recompute import RecomputeCoalescer
+
+from .test_responses_api import _build_answers, _create_session
+
+
+def test_coalescer_runs_once_per_burst():
+    calls = []
+    coalescer = RecomputeCoalescer(calls.append, debounce_seconds=0.05)
+
+    for _ in range(50):
+        coalescer.schedule("burst")
+    assert coalescer.is_pending("burst")
+
+    assert coalescer.flush(timeout=5)
+    assert calls == ["burst"]
+    assert not coalescer.is_pending("burst")
+
+
+def test_coalescer_reruns_once_for_submissions_during_recompute():
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow_recompute(session_id):
+        calls.append(session_id)
+        if len(calls) == 1:
+            started.set()
+            release.wait(5)
+
+    coalescer = RecomputeCoalescer(slow_recompute, debounce_seconds=0.01)
+    coalescer.schedule("busy")
+    assert started.wait(5)
+    for _ in range(10):
+        coalescer.schedule("busy")
+    release.set()
+
+    assert coalescer.flush(timeout=5)
+    assert calls == ["busy", "busy"]
+
+
+@pytest.fixture
+def coalesced(monkeypatch):
+    coalescer = RecomputeCoalescer(recompute.recompute_session, debounce_seconds=0.05)
+    monkeypatch.setattr(settings, "AGGREGATE_RECOMPUTE_MODE", "coalesced")
+    monkeypatch.setattr(recompute, "_coalescer", coalescer)
+    yield coalescer
+    coalescer.flush(timeout=5)
+
+
+def test_coalesced_submissions_report_pending_until_recomputed(client, coalesced):
+    session = _create_session(client)
+    answers = _build_answers("basic")
+
+    response = client.post(
+        "/api/self/submit",
+        json={"session_id": session["session_id"], "answers": answers},
+    )
+    assert response.status_code == 200
+    assert set(response.json()["self_radar"]) == {"EI", "SN", "TF", "JP"}
+
+    for index in range(3):
+        response = client.post(
+            "/api/other/submit",
+            json={
+                "invite_token": session["invite_token"],
+                "answers": answers,
+                "relation_tag": "friend",
+                "rater_key": f"rater-{index}",
+            },
+        )
+        assert response.status_code == 201
+        assert response.json()["respondents"] == index + 1
+        assert response.json()["aggregate_status"] == "pending"
+
+    assert coalesced.flush(timeout=5)
+
+    result = client.get(f"/api/result/{session['invite_token']}")
+    assert result.status_code == 200
+    body = result.json()
+    assert body["aggregate_status"] == "fresh"
+    assert body["n"] == 3
+    assert body["unlocked"] is True
+
+
+def test_coalescer_runs_on_a_bounded_pool():
+    lock = threading.Lock()
+    running = []
+    peak = []
+
+    def recompute_one(session_id):
+        with lock:
+            running.append(session_id)
+            peak.append(len(running))
+        threading.Event().wait(0.01)
+        with lock:
+            running.remove(session_id)
+
+    coalescer = RecomputeCoalescer(recompute_one, debounce_seconds=0.0, max_workers=2)
+    for index in range(20):
+        coalescer.schedule(f"session-{index}")
+
+    assert coalescer.flush(timeout=5)
+    assert len(peak) == 20
+    assert max(peak) <= 2
+
+
+def test_coalescer_retries_failures_with_backoff_then_gives_up():
+    calls = []
+
+    def flaky(session_id):
+        calls.append(session_id)
+        if session_id == "broken" or len(calls) == 1:
+            raise RuntimeError("database unavailable")
+
+    coalescer = RecomputeCoalescer(
+        flaky, debounce_seconds=0.0, max_attempts=3, retry_seconds=0.01
+    )
+    coalescer.schedule("flaky")
+    assert coalescer.flush(timeout=5)
+    assert calls == ["flaky", "flaky"]
+
+    coalescer.schedule("broken")
+    assert coalescer.is_pending("broken")
+    assert coalescer.flush(timeout=5)
+    assert calls.count("broken") == 3
+    assert not coalescer.is_pending("broken")
+
+    # A later submission starts a fresh series of attempts.
+    coalescer.schedule("broken")
+    assert coalescer.flush(timeout=5)
+    assert calls.count("broken") == 6
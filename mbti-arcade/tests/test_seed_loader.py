@@ -0,0 +1,64 @@
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.data import loader
+from app.data.questionnaire_loader import get_question_seeds, get_questionnaire_hash
+from app.database import Base
+from app.models import AppMetadata, Question, QuestionnaireVersion
+
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setattr(loader, "_SEEDED", set())
+    engine = create_engine("sqlite:///:memory:", future=True)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine, future=True)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+def _count_statements(db):
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return statements
+
+
+def test_first_call_seeds_and_records_hash(db):
+    assert loader.ensure_questions_seeded(db) is True
+
+    assert db.query(Question).count() == len(get_question_seeds())
+    assert db.get(AppMetadata, loader.QUESTIONNAIRE_HASH_KEY).value == get_questionnaire_hash()
+    assert db.get(QuestionnaireVersion, get_questionnaire_hash()) is not None
+
+
+def test_later_calls_skip_the_database(db):
+    loader.ensure_questions_seeded(db)
+    statements = _count_statements(db)
+
+    assert loader.ensure_questions_seeded(db) is False
+    assert statements == []
+
+
+def test_matching_stored_hash_skips_resync(db, monkeypatch):
+    loader.ensure_questions_seeded(db)
+    monkeypatch.setattr(loader, "_SEEDED", set())
+    statements = _count_statements(db)
+
+    assert loader.ensure_questions_seeded(db) is False
+    assert statements
+    assert all(statement.lstrip().upper().startswith("SELECT") for statement in statements)
+
+
+def test_changed_hash_triggers_resync(db, monkeypatch):
+    loader.ensure_questions_seeded(db)
+    marker = db.get(AppMetadata, loader.QUESTIONNAIRE_HASH_KEY)
+    marker.value = "stale"
+    db.commit()
+    monkeypatch.setattr(loader, "_SEEDED", set())
+
+    assert loader.ensure_questions_seeded(db) is True
+    assert db.get(AppMetadata, loader.QUESTIONNAIRE_HASH_KEY).value == get_questionnaire_hash()
@@ -0,0 +1,83 @@
+import logging
+
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from app import database, session_guard, settings
+from app.session_guard import ConnectionLeakError, SessionGuardMiddleware, leak_metrics
+
+from .client import create_client
+
+
+@pytest.fixture
+def leaky_app(tmp_path):
+    engine = database.register_engine("test-guard", f"sqlite:///{tmp_path / 'guard.db'}")
+    factory = sessionmaker(bind=engine, future=True)
+
+    def session_generator():
+        with factory() as session:
+            yield session
+
+    app = FastAPI()
+    app.add_middleware(SessionGuardMiddleware)
+
+    @app.get("/leak")
+    def leak():
+        # The pattern the guard exists for: the generator is never closed.
+        session = next(session_generator())
+        return {"value": session.execute(text("SELECT 1")).scalar()}
+
+    @app.get("/clean")
+    def clean():
+        with factory() as session:
+            return {"value": session.execute(text("SELECT 1")).scalar()}
+
+    yield app, engine
+    engine.dispose()
+
+
+def test_guard_raises_on_session_outliving_request(leaky_app, monkeypatch):
+    app, engine = leaky_app
+    monkeypatch.setattr(settings, "DB_LEAK_DETECTION", "raise")
+    client = create_client(app)
+    try:
+        assert client.get("/clean").json() == {"value": 1}
+        with pytest.raises(ConnectionLeakError, match="GET /leak"):
+            client.get("/leak")
+    finally:
+        client.close()
+
+    # The leaked session was closed, so its connection is back in the pool.
+    assert engine.pool.checkedout() == 0
+
+
+def test_guard_logs_and_counts_leaks(leaky_app, monkeypatch, caplog):
+    app, engine = leaky_app
+    monkeypatch.setattr(settings, "DB_LEAK_DETECTION", "log")
+    before = leak_metrics()["leaked_sessions_total"]
+    client = create_client(app)
+    try:
+        with caplog.at_level(logging.WARNING, logger="perception_gap.database"):
+            assert client.get("/leak").json() == {"value": 1}
+    finally:
+        client.close()
+
+    assert engine.pool.checkedout() == 0
+    assert leak_metrics()["leaked_sessions_total"] == before + 1
+    record = next(r for r in caplog.records if "outlived request GET /leak" in r.getMessage())
+    assert "test_session_guard.py" in record.stack
+
+
+def test_checkout_stack_reaches_application_frames(leaky_app, monkeypatch):
+    _, engine = leaky_app
+    monkeypatch.setattr(settings, "DB_LEAK_DETECTION", "log")
+    with sessionmaker(bind=engine, future=True)() as session:
+        session.execute(text("SELECT 1"))
+        with session_guard._lock:
+            (checkout,) = [c for c in session_guard._checkouts.values() if c.engine == "test-guard"]
+
+    assert "in test_checkout_stack_reaches_application_frames" in checkout.stack
+    assert "/sqlalchemy/" not in checkout.stack
+    assert '"<string>"' not in checkout.stack
@@ -0,0 +1,163 @@
+from datetime import datetime, timedelta, timezone
+
+from app.database import session_scope
+from app.models import Session as SessionModel
+from app.services.session_meta import (
+    SessionMeta,
+    SessionMetaCache,
+    get_session_meta_cache,
+    lookup_session_meta,
+)
+
+from .test_responses_api import _build_answers, _create_session
+
+
+def _meta(expires_in: timedelta) -> SessionMeta:
+    return SessionMeta(
+        id="session-1",
+        invite_token="token-1",
+        mode="basic",
+        expires_at=datetime.now(timezone.utc) + expires_in,
+        max_raters=10,
+        is_anonymous=True,
+        self_mbti=None,
+        snapshot_owner_name=None,
+        snapshot_owner_avatar=None,
+        updated_at=None,
+    )
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_cache_ttls_and_lru_bound():
+    clock = _Clock()
+    cache = SessionMetaCache(max_entries=2, ttl_seconds=10, negative_ttl_seconds=60, clock=clock)
+    loads = []
+
+    def loader(result):
+        def load():
+            loads.append(result)
+            return result
+
+        return load
+
+    active, expired = _meta(timedelta(hours=1)), _meta(-timedelta(hours=1))
+    assert cache.get("active", loader(active)) is active
+    assert cache.get("expired", loader(expired)) is expired
+    assert cache.get("active", loader(active)) is active
+    assert len(loads) == 2
+
+    clock.now = 30  # past the TTL: expired sessions reload too, they can be extended
+    cache.get("active", loader(active))
+    cache.get("expired", loader(expired))
+    assert len(loads) == 4
+
+    cache.get("unknown", loader(None))  # evicts "active", the least recently used
+    assert len(cache) == 2
+    cache.get("expired", loader(expired))
+    assert len(loads) == 5
+    cache.get("active", loader(active))
+    assert len(loads) == 6
+
+
+def test_invalidate_during_load_is_not_overwritten():
+    cache = SessionMetaCache(max_entries=4, ttl_seconds=10, negative_ttl_seconds=60, clock=_Clock())
+    stale, fresh = _meta(timedelta(hours=1)), _meta(timedelta(hours=2))
+
+    def load_racing_an_update():
+        # update_invite commits and invalidates while this read is in flight.
+        cache.invalidate("token-1")
+        return stale
+
+    assert cache.get("token-1", load_racing_an_update) is stale
+    assert cache.get("token-1", lambda: fresh) is fresh
+    assert cache.get("token-1", lambda: stale) is fresh
+
+
+def test_unknown_tokens_use_the_negative_ttl():
+    clock = _Clock()
+    cache = SessionMetaCache(max_entries=4, ttl_seconds=10, negative_ttl_seconds=60, clock=clock)
+    loads = []
+
+    def load():
+        loads.append(None)
+        return None
+
+    cache.get("unknown", load)
+    clock.now = 30
+    cache.get("unknown", load)
+    assert len(loads) == 1
+    clock.now = 61
+    cache.get("unknown", load)
+    assert len(loads) == 2
+
+
+def test_unknown_tokens_are_negatively_cached(client):
+    cache = get_session_meta_cache()
+    before = cache.snapshot()
+
+    for _ in range(3):
+        assert client.get("/api/result/no-such-token").status_code == 404
+
+    after = cache.snapshot()
+    assert after["misses_total"] - before["misses_total"] == 1
+    assert after["hits_total"] - before["hits_total"] == 2
+
+
+def test_submit_to_deleted_session_returns_not_found(client):
+    session = _create_session(client)
+    with session_scope() as db:
+        assert lookup_session_meta(db, session["invite_token"]) is not None
+        db.query(SessionModel).filter_by(id=session["session_id"]).delete()
+
+    payload = {
+        "invite_token": session["invite_token"],
+        "relation_tag": "friend",
+        "rater_key": "late",
+        "answers": _build_answers("basic"),
+    }
+    response = client.post("/api/other/submit", json=payload)
+    assert response.status_code == 404
+    assert response.json()["type"].endswith("invite-not-found")
+
+    # The stale entry was dropped, so the next request reads the row again.
+    before = get_session_meta_cache().snapshot()
+    assert client.post("/api/other/submit", json=payload).status_code == 404
+    assert get_session_meta_cache().snapshot()["misses_total"] - before["misses_total"] == 1
+
+
+def test_update_invite_invalidates_cached_metadata(client):
+    session = _create_session(client)
+    answers = _build_answers("basic")
+    client.post("/api/self/submit", json={"session_id": session["session_id"], "answers": answers})
+
+    def submit(rater_key):
+        return client.post(
+            "/api/other/submit",
+            json={
+                "invite_token": session["invite_token"],
+                "relation_tag": "friend",
+                "rater_key": rater_key,
+                "answers": answers,
+            },
+        )
+
+    assert submit("first").status_code == 201  # caches max_raters=50
+    update = client.post(
+        "/api/invite/create", json={"session_id": session["session_id"], "max_raters": 1}
+    )
+    assert update.status_code == 200
+    # The stale cached limit would accept this one.
+    assert submit("second").status_code == 429
+
+    update = client.post(
+        "/api/invite/create", json={"session_id": session["session_id"], "max_raters": 5}
+    )
+    assert update.status_code == 200
+    assert submit("second").status_code == 201